@@ -1,5 +1,25 @@
+import argparse
+
+from src.api.app import load_serving_config
+from src.api.server import serve
+
+
 def main():
-    print("Hello from ai-rag-assistant-v3!")
+    cfg = load_serving_config()
+
+    parser = argparse.ArgumentParser(description="Serve the RAG API")
+    parser.add_argument("--host", default=cfg["host"])
+    parser.add_argument("--port", type=int, default=cfg["port"])
+    parser.add_argument("--workers", type=int, default=cfg["workers"])
+    parser.add_argument(
+        "--preload",
+        action=argparse.BooleanOptionalAction,
+        default=cfg["preload"],
+        help="Load models and indexes once in the parent before forking workers",
+    )
+    args = parser.parse_args()
+
+    serve(args.host, args.port, workers=args.workers, preload=args.preload)
 
 
 if __name__ == "__main__":
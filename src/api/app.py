@@ -0,0 +1,227 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import orjson
+import yaml
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+from src.api.admission import AdmissionController, Overloaded
+from src.rag.schema import RAGResponse
+from src.utils.logging import setup_logging
+from src.utils.metrics import METRICS
+from src.utils.procstats import memory_usage
+
+logger = setup_logging("API")
+
+
+class AskRequest(BaseModel):
+    query: str
+    session_id: Optional[str] = None
+
+
+def load_serving_config() -> dict:
+    with open("configs/serving.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def dumps(payload) -> bytes:
+    # Responses are plain dicts/lists/floats (plus numpy scalars from the
+    # models), so they are written directly instead of through
+    # jsonable_encoder.
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _default_service_factory():
+    from src.services.rag_Service import RagService
+
+    return RagService()
+
+
+def create_app(service_factory=_default_service_factory, serving_cfg=None) -> FastAPI:
+    cfg = serving_cfg or load_serving_config()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Load models in the background so liveness answers while we warm up;
+        # readiness stays false until the service exists.
+        app.state.service = None
+        app.state.startup_seconds = None
+        app.state.warmup = None
+
+        async def load():
+            start = time.perf_counter()
+            try:
+                service = await asyncio.to_thread(service_factory)
+                if cfg.get("warmup") and hasattr(service, "warm_up"):
+                    await asyncio.to_thread(service.warm_up)
+                warmup_cfg = cfg.get("query_warmup", {})
+                if warmup_cfg.get("enabled") and hasattr(service, "cache_stats"):
+                    from src.services.warmup import warm_up_from_log
+
+                    app.state.warmup = await warm_up_from_log(service, warmup_cfg)
+                app.state.service = service
+            except Exception:
+                logger.exception("Failed to initialise RagService")
+                return
+            app.state.startup_seconds = round(time.perf_counter() - start, 3)
+            logger.info(
+                f"RagService ready in pid {os.getpid()} after "
+                f"{app.state.startup_seconds}s, memory: {memory_usage()}"
+            )
+
+        async def watch(interval):
+            # Each worker polls the published bundle version on its own, so a
+            # new bundle reaches every process without routing admin calls.
+            while True:
+                await asyncio.sleep(interval)
+                service = app.state.service
+                if service is None or not hasattr(service, "reload"):
+                    continue
+                try:
+                    await asyncio.to_thread(service.reload)
+                except Exception:
+                    # Logged by the service; keep serving the current version.
+                    pass
+
+        app.state.loader = asyncio.create_task(load())
+        watch_interval = cfg.get("reload", {}).get("watch_interval")
+        app.state.watcher = asyncio.create_task(watch(watch_interval)) if watch_interval else None
+        yield
+        app.state.loader.cancel()
+        if app.state.watcher is not None:
+            app.state.watcher.cancel()
+
+        service = app.state.service
+        if service is not None and hasattr(service, "aclose"):
+            await service.aclose()
+
+    app = FastAPI(title="AI Medical RAG Assistant", lifespan=lifespan)
+    app.state.admission = AdmissionController(**cfg["admission"])
+    validate_responses = cfg.get("validate_responses", False)
+
+    def check(result):
+        # The request path builds responses without pydantic; this is the
+        # one place they can be checked against the schema.
+        if validate_responses and "response" in result:
+            RAGResponse.model_validate(result["response"])
+        return result
+
+    def get_service(request: Request):
+        service = request.app.state.service
+        if service is None:
+            raise HTTPException(status_code=503, detail="Service is starting up")
+        return service
+
+    @app.exception_handler(Overloaded)
+    async def overloaded_handler(request: Request, exc: Overloaded):
+        logger.warning(f"Shedding request: {exc}")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(exc)},
+            headers={"Retry-After": "1"},
+        )
+
+    @app.exception_handler(TimeoutError)
+    async def timeout_handler(request: Request, exc: TimeoutError):
+        return JSONResponse(status_code=504, content={"detail": "LLM generation timed out"})
+
+    @app.get("/health/live")
+    async def live():
+        return {"status": "ok"}
+
+    @app.get("/health/ready")
+    async def ready(request: Request):
+        admission = request.app.state.admission
+        service = request.app.state.service
+        if service is None:
+            return JSONResponse(status_code=503, content={"status": "starting"})
+        return {
+            "status": "ready",
+            "pid": os.getpid(),
+            "startup_seconds": request.app.state.startup_seconds,
+            "memory": memory_usage(),
+            "warmup": request.app.state.warmup,
+            "index_version": service.index_version() if hasattr(service, "index_version") else None,
+            **admission.stats(),
+        }
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics(request: Request):
+        stats = request.app.state.admission.stats()
+        lines = [
+            "# TYPE rag_requests_in_flight gauge",
+            f"rag_requests_in_flight {stats['in_flight']}",
+            "# TYPE rag_requests_waiting gauge",
+            f"rag_requests_waiting {stats['waiting']}",
+            "# TYPE rag_requests_rejected_total counter",
+            f"rag_requests_rejected_total {stats['rejected']}",
+        ]
+        service = request.app.state.service
+        if service is not None and hasattr(service, "cache_stats"):
+            caches = service.cache_stats()
+            for name, kind in (("size", "gauge"), ("hits", "counter"), ("misses", "counter")):
+                metric = "rag_cache_entries" if name == "size" else f"rag_cache_{name}_total"
+                lines.append(f"# TYPE {metric} {kind}")
+                lines.extend(f'{metric}{{cache="{cache}"}} {values[name]}' for cache, values in caches.items())
+        return METRICS.render_prometheus() + "\n".join(lines) + "\n"
+
+    @app.post("/admin/reload")
+    async def reload(request: Request):
+        # Only ever loads the published bundle: the version is not taken
+        # from the request.
+        service = get_service(request)
+        if not hasattr(service, "reload"):
+            raise HTTPException(status_code=404, detail="Service does not support reloading")
+        try:
+            version = await asyncio.to_thread(service.reload)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=f"Reload failed: {exc}")
+        return {"reloaded": version is not None, "index_version": service.index_version()}
+
+    @app.post("/ask")
+    async def ask(body: AskRequest, request: Request):
+        service = get_service(request)
+        async with request.app.state.admission.slot():
+            result = await service.aask(body.query, body.session_id)
+        return Response(dumps(check(result)), media_type="application/json")
+
+    @app.post("/ask/stream")
+    async def ask_stream(body: AskRequest, request: Request):
+        service = get_service(request)
+        admission = request.app.state.admission
+
+        # Admit before the response starts so overload still maps to a 429.
+        await admission.acquire()
+        released = False
+
+        def release_once():
+            nonlocal released
+            if not released:
+                released = True
+                admission.release()
+
+        async def events():
+            try:
+                async for event in service.astream(body.query, body.session_id):
+                    yield dumps(check(event)) + b"\n"
+            finally:
+                release_once()
+
+        # The background task covers clients that disconnect before the
+        # generator is ever started.
+        return StreamingResponse(
+            events(),
+            media_type="application/x-ndjson",
+            background=BackgroundTask(release_once),
+        )
+
+    return app
+
+
+app = create_app()
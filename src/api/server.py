@@ -0,0 +1,85 @@
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from src.utils.logging import setup_logging
+from src.utils.procstats import memory_usage
+
+logger = setup_logging("Server")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, worker_id: int):
+    # Default signal handling in the child; uvicorn installs its own.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    logger.info(f"Worker {worker_id} (pid {os.getpid()}) starting")
+    config = uvicorn.Config("src.api.app:app", lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host: str, port: int, workers: int = 1, preload: bool = False):
+    """Run ``workers`` uvicorn processes on one shared listening socket.
+
+    With ``preload`` the parent loads RagService's read-only assets first, so
+    every forked worker shares model weights, the BM25 arrays and chunk text
+    copy-on-write instead of loading its own copy.
+    """
+    if workers <= 1 and not preload:
+        uvicorn.run("src.api.app:app", host=host, port=port)
+        return
+
+    sock = _bind(host, port)
+
+    if preload:
+        from src.services.rag_Service import RagService
+
+        start = time.perf_counter()
+        RagService.preload()
+        logger.info(
+            f"Preloaded RagService in {time.perf_counter() - start:.2f}s, "
+            f"parent memory: {memory_usage()}"
+        )
+
+    children = []
+    for worker_id in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(sock, worker_id)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def forward(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    for pid in children:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+    sock.close()
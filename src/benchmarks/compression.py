@@ -0,0 +1,98 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.benchmarks.retrieval import format_table, load_config
+from src.embeddings.compress import CompressedVectors, shortlist_and_rescore
+from src.utils.logging import setup_logging
+
+logger = setup_logging("CompressionBenchmark")
+
+
+def make_queries(embeddings, n_queries, noise, seed=0):
+    """Perturbed corpus vectors as stand-in queries, normalized like real ones."""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(embeddings), size=min(n_queries, len(embeddings)), replace=False)
+    queries = np.asarray(embeddings[np.sort(rows)], dtype=np.float32)
+    queries = queries + rng.normal(scale=noise, size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(embeddings, queries, k):
+    scores = queries @ np.asarray(embeddings, dtype=np.float32).T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def evaluate_variant(embeddings, queries, truth, variant, k, rescore_factor):
+    label = variant["precision"] + (f"+{variant['projection']}{variant['dim']}" if variant.get("projection") else "")
+    fit_start = time.perf_counter()
+    compressed = CompressedVectors.from_config(embeddings, variant)
+    fit_seconds = time.perf_counter() - fit_start
+
+    approx_hits, rescored_hits, latencies = [], [], []
+    for q, expected in zip(queries, truth):
+        expected = set(expected.tolist())
+
+        approx = np.argsort(-compressed.scores(q), kind="stable")[:k]
+        approx_hits.append(len(expected & set(approx.tolist())) / k)
+
+        start = time.perf_counter()
+        idx, _ = shortlist_and_rescore(compressed, embeddings, q, k, rescore_factor)
+        latencies.append(time.perf_counter() - start)
+        rescored_hits.append(len(expected & set(idx.tolist())) / k)
+
+    full_bytes = embeddings.shape[0] * embeddings.shape[1] * 4
+    per_vector = compressed.codes.itemsize * compressed.codes.shape[1] + (4 if compressed.scales is not None else 0)
+    return {
+        "variant": label,
+        "dims": int(compressed.codes.shape[1]),
+        "bytes_per_vector": per_vector,
+        "memory_mb": compressed.nbytes / 1e6,
+        "ratio": full_bytes / compressed.nbytes,
+        f"recall@{k}": float(np.mean(approx_hits)),
+        f"recall@{k}_rescored": float(np.mean(rescored_hits)),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "fit_s": fit_seconds,
+    }
+
+
+def run(embeddings, cfg) -> list:
+    queries = make_queries(embeddings, cfg["n_queries"], cfg["query_noise"])
+    truth = exact_top_k(embeddings, queries, cfg["k"])
+    rows = []
+    for variant in cfg["variants"]:
+        rows.append(evaluate_variant(embeddings, queries, truth, variant, cfg["k"], cfg["rescore_factor"]))
+        logger.info(rows[-1])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs memory of compressed embedding storage")
+    parser.add_argument("--config", default="configs/benchmark.yaml")
+    parser.add_argument("--embeddings", default="data/embeddings/embeddings.npy")
+    parser.add_argument("--synthetic", action="store_true", help="Use hashing-embedder vectors of the synthetic corpus")
+    parser.add_argument("--output", help="Write result rows to this JSON file")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+
+    if args.synthetic:
+        from src.benchmarks.synthetic import HashingEmbedder, make_synthetic_corpus
+
+        records, _ = make_synthetic_corpus(**cfg["synthetic"])
+        embeddings = HashingEmbedder(dim=384).encode([r["text"] for r in records])
+    else:
+        embeddings = np.load(args.embeddings, mmap_mode="r")
+
+    rows = run(embeddings, cfg["compression"])
+    print(format_table(rows))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
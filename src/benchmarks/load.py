@@ -0,0 +1,392 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import yaml
+
+from src.services.warmup import load_query_log
+from src.utils.logging import setup_logging
+from src.utils.procstats import cpu_seconds, memory_usage, process_cpu_seconds
+
+logger = setup_logging("LoadTest")
+
+
+@dataclass
+class RequestResult:
+    start: float
+    latency: float
+    status: str  # ok | error | shed | timeout
+    refusal: bool | None = None
+
+
+# Targets
+
+class ServiceTarget:
+    """Drives ``RagService.aask`` in-process."""
+
+    def __init__(self, service, timeout):
+        self.service = service
+        self.timeout = timeout
+
+    async def send(self, query) -> RequestResult:
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                result = await self.service.aask(query)
+            status, refusal = "ok", result["response"]["refusal"]
+        except TimeoutError:
+            status, refusal = "timeout", None
+        except Exception as e:
+            logger.debug(f"Request failed: {e!r}")
+            status, refusal = "error", None
+        return RequestResult(start, time.perf_counter() - start, status, refusal)
+
+    async def aclose(self):
+        await self.service.aclose()
+
+
+class HttpTarget:
+    """Drives ``POST /ask`` of a running API server."""
+
+    def __init__(self, url, timeout, max_connections=1000):
+        import httpx
+
+        self.client = httpx.AsyncClient(
+            base_url=url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections),
+        )
+
+    async def send(self, query) -> RequestResult:
+        import httpx
+
+        start = time.perf_counter()
+        refusal = None
+        try:
+            response = await self.client.post("/ask", json={"query": query})
+            if response.status_code == 200:
+                status = "ok"
+                refusal = response.json()["response"]["refusal"]
+            elif response.status_code == 429:
+                status = "shed"
+            elif response.status_code == 504:
+                status = "timeout"
+            else:
+                status = "error"
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.HTTPError:
+            status = "error"
+        return RequestResult(start, time.perf_counter() - start, status, refusal)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# Resource sampling
+
+class ResourceSampler:
+    """Samples CPU utilisation and RSS of a process at a fixed interval."""
+
+    def __init__(self, pid=None, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    def _cpu(self):
+        if self.pid is None:
+            return cpu_seconds()
+        return process_cpu_seconds(self.pid)
+
+    async def _run(self):
+        start = time.perf_counter()
+        last_wall, last_cpu = start, self._cpu()
+        while True:
+            await asyncio.sleep(self.interval)
+            now, cpu = time.perf_counter(), self._cpu()
+            sample = {"t": round(now - start, 3)}
+            if cpu is not None and last_cpu is not None:
+                sample["cpu_percent"] = round(100 * (cpu - last_cpu) / (now - last_wall), 1)
+            sample["rss_mb"] = memory_usage(self.pid).get("rss_mb")
+            self.samples.append(sample)
+            last_wall, last_cpu = now, cpu
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return self.samples
+
+
+# Load patterns
+
+async def run_open_loop(target, queries, qps, duration, arrival="poisson", seed=0):
+    """Fire requests on a fixed schedule regardless of completions (offered load)."""
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    offset = 0.0
+    i = 0
+
+    while offset < duration:
+        delay = start + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(target.send(queries[i % len(queries)])))
+        i += 1
+        offset += rng.expovariate(qps) if arrival == "poisson" else 1.0 / qps
+
+    return await asyncio.gather(*tasks)
+
+
+async def run_closed_loop(target, queries, users, duration, think_time=0.0, seed=0):
+    """``users`` clients each send, wait for the answer, think, and repeat."""
+    rng = random.Random(seed)
+    deadline = asyncio.get_running_loop().time() + duration
+    results = []
+
+    async def user(offset):
+        i = offset
+        while asyncio.get_running_loop().time() < deadline:
+            results.append(await target.send(queries[i % len(queries)]))
+            i += users
+            if think_time:
+                await asyncio.sleep(rng.expovariate(1.0 / think_time))
+
+    await asyncio.gather(*(user(u) for u in range(users)))
+    return results
+
+
+def summarize(results, wall_seconds, samples, offered_qps=None, duration=None) -> dict:
+    n = len(results)
+    statuses = [r.status for r in results]
+    ok = [r for r in results if r.status == "ok"]
+    latencies = np.asarray([r.latency for r in ok]) * 1000 if ok else np.zeros(1)
+
+    summary = {
+        "requests": n,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(ok) / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": float(np.percentile(latencies, 50)),
+            "p90": float(np.percentile(latencies, 90)),
+            "p95": float(np.percentile(latencies, 95)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+        },
+        "error_rate": statuses.count("error") / n if n else 0.0,
+        "shed_rate": statuses.count("shed") / n if n else 0.0,
+        "timeout_rate": statuses.count("timeout") / n if n else 0.0,
+        "refusal_rate": sum(1 for r in ok if r.refusal) / len(ok) if ok else 0.0,
+        "cpu_percent": _series_stats([s.get("cpu_percent") for s in samples]),
+        "rss_mb": _series_stats([s.get("rss_mb") for s in samples]),
+        "samples": samples,
+    }
+    if offered_qps is not None:
+        # Poisson arrivals deviate from the target, so compare against what
+        # was actually sent; wall time also includes draining the backlog.
+        sent_qps = n / duration if duration else offered_qps
+        summary["offered_qps"] = offered_qps
+        summary["sent_qps"] = round(sent_qps, 3)
+        summary["saturated"] = summary["throughput_rps"] < 0.9 * sent_qps
+    return summary
+
+
+def _series_stats(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return {}
+    return {"mean": round(float(np.mean(values)), 1), "max": float(np.max(values))}
+
+
+async def run_level(target, queries, mode, level, duration, args, pid=None) -> dict:
+    sampler = ResourceSampler(pid=pid, interval=args.sample_interval)
+    sampler.start()
+    start = time.perf_counter()
+
+    if mode == "open":
+        results = await run_open_loop(target, queries, level, duration, args.arrival, args.seed)
+    else:
+        results = await run_closed_loop(target, queries, level, duration, args.think_time, args.seed)
+
+    wall = time.perf_counter() - start
+    samples = await sampler.stop()
+    summary = summarize(
+        results,
+        wall,
+        samples,
+        offered_qps=level if mode == "open" else None,
+        duration=duration,
+    )
+    summary["mode"] = mode
+    summary["level"] = level
+    return summary
+
+
+# Setup
+
+def build_service(synthetic: bool, llm_host: str | None):
+    from src.services.rag_Service import RagService
+
+    if not synthetic:
+        service = RagService()
+    else:
+        from src.benchmarks.retrieval import build_synthetic_stack
+        from src.benchmarks.synthetic import make_synthetic_corpus
+
+        with open("configs/retrieval.yaml") as f:
+            retrieval_cfg = yaml.safe_load(f)
+        with open("configs/guardrails.yaml") as f:
+            guardrail_cfg = yaml.safe_load(f)
+
+        records, _ = make_synthetic_corpus()
+        stack = build_synthetic_stack(records)
+
+        expander = None
+        if retrieval_cfg["expansion"]["enabled"]:
+            from src.retrieval.neighbors import NeighborExpander, NeighborIndex
+
+            expander = NeighborExpander(
+                NeighborIndex.build([r["metadata"] for r in records]),
+                stack.sparse.texts,
+                window=retrieval_cfg["expansion"]["window"],
+                max_section_chunks=retrieval_cfg["expansion"]["max_section_chunks"],
+            )
+
+        service = RagService.from_components(
+            retrieval_cfg,
+            guardrail_cfg,
+            embedder=stack.embedder,
+            dense=stack.dense,
+            sparse=stack.sparse,
+            reranker=stack.reranker,
+            expander=expander,
+        )
+
+    if llm_host:
+        service.chain.llm_client.host = llm_host
+    return service
+
+
+def format_levels(summaries) -> str:
+    header = (
+        f"{'level':>6}  {'rps':>8}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'err':>6}  "
+        f"{'shed':>6}  {'tmo':>6}  {'refuse':>6}  {'cpu%':>6}  {'rss MB':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for s in summaries:
+        lat = s["latency_ms"]
+        lines.append(
+            f"{s['level']:>6}  {s['throughput_rps']:>8.2f}  {lat['p50']:>9.1f}  {lat['p95']:>9.1f}  "
+            f"{lat['p99']:>9.1f}  {s['error_rate']:>6.2%}  {s['shed_rate']:>6.2%}  {s['timeout_rate']:>6.2%}  "
+            f"{s['refusal_rate']:>6.2%}  {s['cpu_percent'].get('mean', 0):>6.1f}  {s['rss_mb'].get('max', 0) or 0:>8.1f}"
+            + ("  SATURATED" if s.get("saturated") else "")
+        )
+    return "\n".join(lines)
+
+
+async def main_async(args):
+    from src.benchmarks.stub_llm import StubLLMConfig, StubLLMServer
+
+    queries = load_query_log(args.queries) if args.queries else None
+    if queries is None:
+        from src.benchmarks.synthetic import make_synthetic_corpus
+
+        _, synthetic_queries = make_synthetic_corpus()
+        queries = [q["query"] for q in synthetic_queries]
+
+    stub = None
+    llm_host = None
+    if args.stub_llm:
+        stub = StubLLMServer(
+            StubLLMConfig(
+                load_ms=args.stub_load_ms,
+                prefill_ms_per_token=args.stub_prefill_ms_per_token,
+                tokens_per_second=args.stub_tokens_per_second,
+                output_tokens=args.stub_output_tokens,
+                max_parallel=args.stub_max_parallel,
+            )
+        )
+        llm_host = stub.start()
+
+    if args.target == "http":
+        target = HttpTarget(args.url, timeout=args.timeout)
+        pid = args.server_pid
+    else:
+        service = await asyncio.to_thread(build_service, args.synthetic, llm_host)
+        if not args.cache:
+            # Repeated queries would otherwise measure cache hits, not the pipeline.
+            service.caches = {}
+        target = ServiceTarget(service, timeout=args.timeout)
+        pid = None
+
+    levels = args.qps if args.mode == "open" else args.users
+    summaries = []
+    try:
+        for level in levels:
+            logger.info(f"Running {args.mode}-loop level {level} for {args.duration}s")
+            summaries.append(await run_level(target, queries, args.mode, level, args.duration, args, pid))
+    finally:
+        await target.aclose()
+        if stub is not None:
+            stub.stop()
+
+    return summaries
+
+
+def _numbers(cast):
+    return lambda value: [cast(v) for v in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open/closed-loop load generator for RagService")
+    parser.add_argument("--target", choices=["service", "http"], default="service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--server-pid", type=int, help="Sample CPU/RSS of this process (http target)")
+    parser.add_argument("--queries", help="Query log: JSONL with a 'query' field, or one query per line")
+    parser.add_argument("--synthetic", action="store_true", help="Serve a synthetic corpus with stub models")
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Keep the service's result caches (service target only)",
+    )
+    parser.add_argument("--mode", choices=["open", "closed"], default="open")
+    parser.add_argument("--qps", type=_numbers(float), default=[1.0, 2.0, 4.0, 8.0])
+    parser.add_argument("--users", type=_numbers(int), default=[1, 4, 16])
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--think-time", type=float, default=0.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-llm", action="store_true", help="Start a local stand-in for ollama")
+    parser.add_argument("--stub-load-ms", type=float, default=5.0)
+    parser.add_argument("--stub-prefill-ms-per-token", type=float, default=0.2)
+    parser.add_argument("--stub-tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--stub-output-tokens", type=int, default=60)
+    parser.add_argument("--stub-max-parallel", type=int, default=4)
+    parser.add_argument("--output", help="Write per-level summaries (with samples) to this JSON file")
+    args = parser.parse_args()
+
+    summaries = asyncio.run(main_async(args))
+    print(format_levels(summaries))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
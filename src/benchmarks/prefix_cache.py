@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import json
+
+import numpy as np
+
+from src.benchmarks.load import build_service
+from src.benchmarks.retrieval import format_table
+from src.benchmarks.stub_llm import StubLLMConfig, StubLLMServer
+from src.benchmarks.synthetic import make_synthetic_corpus
+from src.utils.logging import setup_logging
+
+logger = setup_logging("PrefixCacheBenchmark")
+
+LAYOUTS = ("single", "messages")
+
+
+async def _run_sessions(service, queries, sessions, turns):
+    ttfts = {"first": [], "follow_up": []}
+    for s in range(sessions):
+        session_id = f"bench-{s}"
+        for t in range(turns):
+            query = queries[(s * turns + t) % len(queries)]
+            result = await service.aask(query, session_id=session_id)
+            ttft = result["timing"]["stages"].get("llm_ttft")
+            if ttft is not None:
+                ttfts["first" if t == 0 else "follow_up"].append(ttft)
+    await service.aclose()
+    return ttfts
+
+
+def run_layout(layout, queries, sessions, turns, stub_cfg) -> dict:
+    """Run multi-turn sessions through the service against a fresh stub server."""
+    server = StubLLMServer(stub_cfg)
+    url = server.start()
+    try:
+        service = build_service(synthetic=True, llm_host=url)
+        service.prompt_layout = layout
+        ttfts = asyncio.run(_run_sessions(service, queries, sessions, turns))
+        stats = server.stats
+    finally:
+        server.stop()
+
+    prompt_tokens = stats["prompt_tokens"]
+    reused = stats["reused_prompt_tokens"]
+    return {
+        "layout": layout,
+        "requests": stats["requests"],
+        "prompt_tokens": prompt_tokens,
+        "reused_tokens": reused,
+        "prefill_tokens": prompt_tokens - reused,
+        "reuse_ratio": reused / prompt_tokens if prompt_tokens else 0.0,
+        "ttft_first_ms": float(np.median(ttfts["first"]) * 1000) if ttfts["first"] else None,
+        "ttft_follow_up_ms": float(np.median(ttfts["follow_up"]) * 1000) if ttfts["follow_up"] else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare prompt layouts by the prompt prefix a caching LLM server can reuse"
+    )
+    parser.add_argument("--layouts", default=",".join(LAYOUTS))
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--prefill-ms-per-token", type=float, default=0.5)
+    parser.add_argument("--output-tokens", type=int, default=20)
+    parser.add_argument("--output", help="Write result rows to this JSON file")
+    args = parser.parse_args()
+
+    _, queries = make_synthetic_corpus()
+    queries = [q["query"] for q in queries]
+    stub_cfg = StubLLMConfig(
+        prefill_ms_per_token=args.prefill_ms_per_token,
+        tokens_per_second=1000.0,
+        output_tokens=args.output_tokens,
+        max_parallel=1,
+        cache_slots=1,
+    )
+
+    rows = []
+    for layout in args.layouts.split(","):
+        rows.append(run_layout(layout, queries, args.sessions, args.turns, stub_cfg))
+        logger.info(f"{layout} -> {rows[-1]}")
+    print(format_table(rows))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import itertools
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from src.retrieval.adaptive import AdaptiveRetriever
+from src.retrieval.dense import DenseRetriever
+from src.retrieval.hybrid import HybridRetriever
+from src.retrieval.reranker import Reranker
+from src.retrieval.sparse import SparseRetriever
+from src.utils.logging import setup_logging
+
+logger = setup_logging("RetrievalBenchmark")
+
+PIPELINES = ("dense", "sparse", "sparse_expanded", "hybrid", "hybrid_rerank", "adaptive_rerank")
+SPARSE_PIPELINES = ("sparse", "sparse_expanded")
+RERANK_PIPELINES = ("hybrid_rerank", "adaptive_rerank")
+
+
+# Quality metrics
+
+def recall_at_k(retrieved, relevant, k):
+    if not relevant:
+        return 0.0
+    return len(set(retrieved[:k]) & set(relevant)) / len(relevant)
+
+
+def reciprocal_rank(retrieved, relevant):
+    relevant = set(relevant)
+    for rank, doc_id in enumerate(retrieved, start=1):
+        if doc_id in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(retrieved, relevant, k):
+    relevant = set(relevant)
+    dcg = sum(
+        1.0 / math.log2(rank + 1)
+        for rank, doc_id in enumerate(retrieved[:k], start=1)
+        if doc_id in relevant
+    )
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+# Retrieval stacks
+
+class RetrievalStack:
+    def __init__(self, embedder, dense, sparse, reranker, expanded_sparse=None):
+        self.embedder = embedder
+        self.dense = dense
+        self.sparse = sparse
+        self.reranker = reranker
+        # BM25 over the chunks plus their document-side expansion terms.
+        self.expanded_sparse = expanded_sparse
+
+
+def load_config(path="configs/benchmark.yaml") -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def load_queries(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_synthetic_stack(records, dim=256):
+    from src.benchmarks.synthetic import HashingEmbedder, InMemoryCollection, LexicalCrossEncoder
+
+    embedder = HashingEmbedder(dim=dim)
+    texts = [r["text"] for r in records]
+    collection = InMemoryCollection(
+        ids=[r["id"] for r in records],
+        embeddings=embedder.encode(texts),
+        documents=texts,
+        metadatas=[r["metadata"] for r in records],
+    )
+    return RetrievalStack(
+        embedder=embedder,
+        dense=DenseRetriever(collection),
+        sparse=SparseRetriever(texts=texts),
+        reranker=Reranker("lexical-overlap", model=LexicalCrossEncoder()),
+    )
+
+
+def build_real_stack():
+    import chromadb
+    from chromadb.config import Settings
+    from src.embeddings.encoders import load_embedder, load_embedding_config
+
+    with open("configs/retrieval.yaml") as f:
+        retrieval_cfg = yaml.safe_load(f)
+
+    client = chromadb.PersistentClient(
+        path=retrieval_cfg["dense"]["persist_directory"],
+        settings=Settings(anonymized_telemetry=False),
+    )
+    collection = client.get_collection(name=retrieval_cfg["dense"]["collection_name"])
+
+    sparse_cfg = retrieval_cfg["sparse"]
+    expansion_path = Path(sparse_cfg["expansion"]["path"])
+    return RetrievalStack(
+        embedder=load_embedder(load_embedding_config()),
+        dense=DenseRetriever(collection),
+        sparse=SparseRetriever(sparse_cfg["chunks_path"]),
+        reranker=Reranker(retrieval_cfg["reranker"]["model_name"]),
+        expanded_sparse=(
+            SparseRetriever(sparse_cfg["chunks_path"], expansion_path=expansion_path)
+            if expansion_path.exists()
+            else None
+        ),
+    )
+
+
+# Sweep
+
+def expand_sweep(cfg) -> list:
+    runs = []
+    seen = set()
+    for pipeline, top_k, alpha, rerank_top_k in itertools.product(
+        cfg["pipelines"], cfg["top_k"], cfg["alpha"], cfg["rerank_top_k"]
+    ):
+        # Parameters a pipeline ignores would only produce duplicate rows.
+        if pipeline == "dense" or pipeline in SPARSE_PIPELINES:
+            alpha = None
+        if pipeline not in RERANK_PIPELINES:
+            rerank_top_k = None
+
+        run = {"pipeline": pipeline, "top_k": top_k, "alpha": alpha, "rerank_top_k": rerank_top_k}
+        key = tuple(run.values())
+        if key not in seen:
+            seen.add(key)
+            runs.append(run)
+    return runs
+
+
+def make_pipeline(stack, pipeline, top_k, alpha=None, rerank_top_k=None, adaptive_cfg=None):
+    def dense(query):
+        embedding = stack.embedder.encode(query, normalize_embeddings=True)
+        return stack.dense.retrieve(embedding, top_k)
+
+    def sparse(query):
+        return stack.sparse.retrieve(query, top_k)
+
+    def sparse_expanded(query):
+        return stack.expanded_sparse.retrieve(query, top_k)
+
+    hybrid_retriever = HybridRetriever(stack.dense, stack.sparse, alpha=alpha or 0.0)
+
+    def hybrid(query):
+        embedding = stack.embedder.encode(query, normalize_embeddings=True)
+        return hybrid_retriever.retrieve(query, embedding, top_k, top_k)
+
+    reranked = []
+
+    def rerank(query, docs):
+        reranked.append(len(docs))
+        return stack.reranker.rerank(query, docs, rerank_top_k)
+
+    def hybrid_rerank(query):
+        return rerank(query, hybrid(query))
+
+    adaptive_retriever = AdaptiveRetriever.from_config(hybrid_retriever, adaptive_cfg or {
+        "initial_k": 6, "initial_candidates": 6, "min_gap": 0.1, "min_agreement": 2,
+    })
+
+    def adaptive_rerank(query):
+        embedding = stack.embedder.encode(query, normalize_embeddings=True)
+        return rerank(query, adaptive_retriever.retrieve(query, embedding, top_k, top_k))
+
+    pipeline_fn = {
+        "dense": dense,
+        "sparse": sparse,
+        "sparse_expanded": sparse_expanded,
+        "hybrid": hybrid,
+        "hybrid_rerank": hybrid_rerank,
+        "adaptive_rerank": adaptive_rerank,
+    }[pipeline]
+    if pipeline in RERANK_PIPELINES:
+        # Docs sent to the cross-encoder per query, the main cost of reranking.
+        pipeline_fn.reranked = reranked
+    return pipeline_fn
+
+
+def evaluate(pipeline_fn, queries, eval_k) -> dict:
+    latencies = []
+    recalls, rrs, ndcgs = [], [], []
+
+    for q in queries:
+        start = time.perf_counter()
+        docs = pipeline_fn(q["query"])
+        latencies.append(time.perf_counter() - start)
+
+        retrieved = [d["id"] for d in docs]
+        recalls.append(recall_at_k(retrieved, q["relevant_ids"], eval_k))
+        rrs.append(reciprocal_rank(retrieved, q["relevant_ids"]))
+        ndcgs.append(ndcg_at_k(retrieved, q["relevant_ids"], eval_k))
+
+    latencies = np.asarray(latencies)
+    reranked = getattr(pipeline_fn, "reranked", None)
+    return {
+        f"recall@{eval_k}": float(np.mean(recalls)),
+        "mrr": float(np.mean(rrs)),
+        f"ndcg@{eval_k}": float(np.mean(ndcgs)),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "qps": float(len(latencies) / latencies.sum()) if latencies.sum() else 0.0,
+        "rerank_docs": float(np.mean(reranked)) if reranked else None,
+    }
+
+
+def run_sweep(stack, queries, cfg) -> list:
+    rows = []
+    for run in expand_sweep(cfg):
+        if run["pipeline"] not in PIPELINES:
+            raise ValueError(f"Unknown pipeline: {run['pipeline']}")
+        if run["pipeline"] == "sparse_expanded" and stack.expanded_sparse is None:
+            logger.warning("No document expansion built (doc_expansion DVC stage); skipping sparse_expanded")
+            continue
+        pipeline_fn = make_pipeline(stack, **run, adaptive_cfg=cfg.get("adaptive"))
+        rows.append({**run, **evaluate(pipeline_fn, queries, cfg["eval_k"])})
+        logger.info(f"{run} -> {rows[-1]}")
+    return rows
+
+
+def format_table(rows) -> str:
+    if not rows:
+        return ""
+    columns = list(rows[0])
+    cells = [[_fmt(r[c]) for c in columns] for r in rows]
+    widths = [max(len(c), *(len(row[i]) for row in cells)) for i, c in enumerate(columns)]
+    lines = [
+        "  ".join(c.ljust(w) for c, w in zip(columns, widths)),
+        "  ".join("-" * w for w in widths),
+    ]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in cells]
+    return "\n".join(lines)
+
+
+def _fmt(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.4f}" if value < 100 else f"{value:.1f}"
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval quality and latency benchmark")
+    parser.add_argument("--config", default="configs/benchmark.yaml")
+    parser.add_argument("--queries", help="JSONL with {'query', 'relevant_ids'} per line")
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="Use a generated corpus with a hashing embedder and lexical reranker (offline)",
+    )
+    parser.add_argument("--output", help="Write result rows to this JSON file")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+
+    if args.synthetic:
+        from src.benchmarks.synthetic import make_synthetic_corpus
+
+        records, queries = make_synthetic_corpus(**cfg["synthetic"])
+        stack = build_synthetic_stack(records)
+        if args.queries:
+            queries = load_queries(args.queries)
+    else:
+        if not args.queries:
+            parser.error("--queries is required unless --synthetic is set")
+        queries = load_queries(args.queries)
+        stack = build_real_stack()
+
+    rows = run_sweep(stack, queries, cfg)
+    print(format_table(rows))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
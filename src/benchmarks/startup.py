@@ -0,0 +1,99 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from src.utils.startup import HEAVY_MODULES
+
+SERVING_MODULES = [
+    "src.api.app",
+    "src.services.rag_Service",
+]
+
+
+def _import_time(module: str) -> float | None:
+    # Each module is timed in a fresh interpreter, so the figure is the cost
+    # of importing it cold, including everything it pulls in.
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return None
+
+    for line in reversed(proc.stderr.splitlines()):
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            return round(int(cumulative) / 1e6, 4)
+    return None
+
+
+def _eager_heavy_imports(module: str) -> list:
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return [m for m in proc.stdout.strip().split(",") if m]
+
+
+def profile_imports() -> dict:
+    return {
+        "import_seconds": {
+            m: _import_time(m) for m in SERVING_MODULES + HEAVY_MODULES
+        },
+        "eager_heavy_imports": {m: _eager_heavy_imports(m) for m in SERVING_MODULES},
+    }
+
+
+def profile_initialization() -> dict:
+    from src.services.rag_Service import RagService
+
+    start = time.perf_counter()
+    service = RagService()
+    total = time.perf_counter() - start
+    service.warm_up()
+
+    return {
+        "init_seconds": dict(service.init_timings),
+        "init_total_seconds": round(total, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report cold-start import and initialization time of the serving path"
+    )
+    parser.add_argument(
+        "--skip-init",
+        action="store_true",
+        help="Only profile imports (no models, vector store or LLM required)",
+    )
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    parser.add_argument(
+        "--fail-on-eager-imports",
+        action="store_true",
+        help="Exit non-zero if a serving module imports a heavy dependency eagerly",
+    )
+    args = parser.parse_args()
+
+    report = profile_imports()
+    if not args.skip_init:
+        report.update(profile_initialization())
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.fail_on_eager_imports and any(report["eager_heavy_imports"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from src.utils.logging import setup_logging
+
+logger = setup_logging("StubLLM")
+
+ANSWER = (
+    "According to the retrieved context [1], the condition is described in the "
+    "encyclopedia and patients should consult a clinician for diagnosis and "
+    "treatment options [2]."
+).split()
+
+
+@dataclass
+class StubLLMConfig:
+    load_ms: float = 5.0  # fixed overhead before prefill
+    prefill_ms_per_token: float = 0.2  # prompt processing cost -> time to first token
+    tokens_per_second: float = 50.0  # decode throughput of one sequence
+    output_tokens: int = 60
+    max_parallel: int = 4  # like OLLAMA_NUM_PARALLEL; extra requests wait
+    cache_slots: int = 4  # prompt caches kept for prefix reuse (0 disables)
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English BPE vocabularies.
+    return max(1, len(text) // 4)
+
+
+def render_messages(messages) -> str:
+    """Flatten chat messages the way a chat template would."""
+    return "".join(f"<|{m.get('role', 'user')}|>{m.get('content', '')}<|end|>" for m in messages) + "<|assistant|>"
+
+
+def create_stub_app(cfg: StubLLMConfig):
+    """ASGI app speaking enough of ollama's /api/chat for the ollama client."""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI()
+    slots = asyncio.Semaphore(cfg.max_parallel)
+    app.state.stats = {
+        "requests": 0,
+        "prompt_tokens": 0,
+        "reused_prompt_tokens": 0,
+        "output_tokens": 0,
+        "peak_active": 0,
+    }
+    # Like ollama, keep the token sequence (prompt + answer) of recent
+    # requests and skip prefill for the longest matching prefix.
+    cache = deque(maxlen=cfg.cache_slots)
+    active = 0
+
+    def reused_tokens(rendered):
+        best = max((len(os.path.commonprefix([rendered, seq])) for seq in cache), default=0)
+        return estimate_tokens(rendered[:best]) if best else 0
+
+    def part(model, content, done=False, **extra):
+        return {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+            **extra,
+        }
+
+    async def generate(model, rendered, prompt_tokens, reused):
+        nonlocal active
+        async with slots:
+            active += 1
+            stats = app.state.stats
+            stats["peak_active"] = max(stats["peak_active"], active)
+            try:
+                start = time.perf_counter_ns()
+                prefill_tokens = prompt_tokens - reused
+                await asyncio.sleep((cfg.load_ms + cfg.prefill_ms_per_token * prefill_tokens) / 1000)
+                prefill_ns = time.perf_counter_ns() - start
+
+                answer = []
+                for i in range(cfg.output_tokens):
+                    if i:
+                        await asyncio.sleep(1 / cfg.tokens_per_second)
+                    token = ANSWER[i % len(ANSWER)]
+                    answer.append(token if i == 0 else " " + token)
+                    yield part(model, answer[-1])
+
+                stats["output_tokens"] += cfg.output_tokens
+                if cfg.cache_slots:
+                    cache.append(rendered + "".join(answer) + "<|end|>")
+                yield part(
+                    model,
+                    "",
+                    done=True,
+                    done_reason="stop",
+                    prompt_eval_count=prefill_tokens,
+                    prompt_eval_duration=prefill_ns,
+                    eval_count=cfg.output_tokens,
+                    total_duration=time.perf_counter_ns() - start,
+                )
+            finally:
+                active -= 1
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        rendered = render_messages(body.get("messages", []))
+        prompt_tokens = estimate_tokens(rendered)
+        reused = reused_tokens(rendered)
+
+        app.state.stats["requests"] += 1
+        app.state.stats["prompt_tokens"] += prompt_tokens
+        app.state.stats["reused_prompt_tokens"] += reused
+
+        if body.get("stream", True):
+            async def lines():
+                async for p in generate(model, rendered, prompt_tokens, reused):
+                    yield json.dumps(p) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        content = []
+        final = None
+        async for p in generate(model, rendered, prompt_tokens, reused):
+            content.append(p["message"]["content"])
+            final = p
+        final["message"]["content"] = "".join(content)
+        return JSONResponse(final)
+
+    @app.get("/api/stats")
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubLLMServer:
+    """Runs the stub on a background thread: ``with StubLLMServer(cfg) as url: ...``."""
+
+    def __init__(self, cfg: StubLLMConfig | None = None, port: int | None = None):
+        self.cfg = cfg or StubLLMConfig()
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.app = create_stub_app(self.cfg)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        import uvicorn
+
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="stub-llm", daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        logger.info(f"Stub LLM listening on {self.url} with {self.cfg}")
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+    @property
+    def stats(self):
+        return dict(self.app.state.stats)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the ollama chat API")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--load-ms", type=float, default=StubLLMConfig.load_ms)
+    parser.add_argument("--prefill-ms-per-token", type=float, default=StubLLMConfig.prefill_ms_per_token)
+    parser.add_argument("--tokens-per-second", type=float, default=StubLLMConfig.tokens_per_second)
+    parser.add_argument("--output-tokens", type=int, default=StubLLMConfig.output_tokens)
+    parser.add_argument("--max-parallel", type=int, default=StubLLMConfig.max_parallel)
+    parser.add_argument("--cache-slots", type=int, default=StubLLMConfig.cache_slots)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    cfg = StubLLMConfig(
+        load_ms=args.load_ms,
+        prefill_ms_per_token=args.prefill_ms_per_token,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        max_parallel=args.max_parallel,
+        cache_slots=args.cache_slots,
+    )
+    uvicorn.run(create_stub_app(cfg), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import random
+import re
+import zlib
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+SECTIONS = ["definition", "causes", "symptoms", "diagnosis", "treatment", "prognosis"]
+
+FILLER = (
+    "patients may present with a wide range of findings and the clinical course "
+    "varies between individuals depending on age general health and other factors"
+).split()
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder with a SentenceTransformer-style ``encode``.
+
+    Stands in for the real bi-encoder so benchmarks and tests run offline.
+    """
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def _embed_one(self, text):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in TOKEN_RE.findall(text.lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vec[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, **kwargs):
+        if isinstance(texts, str):
+            return self._embed_one(texts)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._embed_one(t) for t in texts])
+
+
+class InMemoryCollection:
+    """Brute-force cosine search exposing the subset of Chroma's ``query`` API we use."""
+
+    def __init__(self, ids, embeddings, documents, metadatas):
+        self.ids = list(ids)
+        self.embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+
+    def count(self):
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results, where=None, **kwargs):
+        q = np.asarray(query_embeddings[0], dtype=np.float32)
+        distances = 1.0 - self.embeddings @ q
+
+        candidates = np.arange(len(self.ids))
+        if where:
+            candidates = np.array(
+                [i for i in candidates if _matches(self.metadatas[i], where)],
+                dtype=np.int64,
+            )
+
+        order = candidates[np.argsort(distances[candidates], kind="stable")][:n_results]
+        return {
+            "ids": [[self.ids[i] for i in order]],
+            "documents": [[self.documents[i] for i in order]],
+            "metadatas": [[self.metadatas[i] for i in order]],
+            "distances": [[float(distances[i]) for i in order]],
+        }
+
+
+def _matches(metadata, where):
+    for key, cond in where.items():
+        if isinstance(cond, dict) and "$in" in cond:
+            if metadata.get(key) not in cond["$in"]:
+                return False
+        elif metadata.get(key) != cond:
+            return False
+    return True
+
+
+class LexicalCrossEncoder:
+    """Token-overlap scorer with CrossEncoder's ``predict(pairs)`` signature."""
+
+    def predict(self, pairs):
+        scores = []
+        for query, text in pairs:
+            q = set(TOKEN_RE.findall(query.lower()))
+            t = set(TOKEN_RE.findall(text.lower()))
+            scores.append(len(q & t) / (len(q) or 1))
+        return np.asarray(scores, dtype=np.float32)
+
+
+def _pseudo_word(rng, syllables=("ra", "to", "mi", "ne", "lo", "ka", "su", "vi", "de", "po")):
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(3, 5)))
+
+
+def make_synthetic_corpus(n_topics=50, chunks_per_section=2, n_queries=100, seed=0):
+    """Build encyclopedia-like chunks plus queries with known relevant chunk ids.
+
+    Every topic gets a few sections, each section a few chunks sharing a
+    section-specific vocabulary, so a query naming topic and section has a
+    well-defined set of relevant chunks.
+    """
+    rng = random.Random(seed)
+
+    records = []
+    groups = {}
+    for _ in range(n_topics):
+        topic = _pseudo_word(rng)
+        for section in SECTIONS:
+            keywords = [_pseudo_word(rng) for _ in range(4)]
+            for _ in range(chunks_per_section):
+                words = [topic, section] + rng.sample(keywords, 3) + rng.sample(FILLER, 12)
+                rng.shuffle(words)
+                chunk_id = f"id_{len(records)}"
+                records.append(
+                    {
+                        "id": chunk_id,
+                        "text": " ".join(words),
+                        "metadata": {
+                            "topic": topic,
+                            "section": section,
+                            "pdf": "synthetic.pdf",
+                            "page": len(records) // 4 + 1,
+                        },
+                    }
+                )
+                group = groups.setdefault((topic, section), {"keywords": keywords, "ids": []})
+                group["ids"].append(chunk_id)
+
+    queries = []
+    keys = list(groups)
+    for _ in range(n_queries):
+        topic, section = rng.choice(keys)
+        group = groups[(topic, section)]
+        queries.append(
+            {
+                "query": f"{section} of {topic} {rng.choice(group['keywords'])}",
+                "relevant_ids": list(group["ids"]),
+            }
+        )
+
+    return records, queries
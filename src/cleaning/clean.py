@@ -1,11 +1,12 @@
 import json
 import yaml
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from src.rag.explainability import chunk_preview
 from src.utils.logging import setup_logging
 
 logger = setup_logging("Cleaning")
@@ -163,11 +164,14 @@ def _emit_chunks(chunks: List[Document], buffers: Dict[str, List[str]], topic: s
                         "section": section,
                         "pdf": page_meta["pdf"],
                         "page": page_meta["page"],
+                        # Shown by explainability without slicing per request.
+                        "preview": chunk_preview(chunk),
                     },
                 )
             )
 
-def clean_and_chunk(pages: List[Document]) -> List[Document]:
+def iter_chunks(pages: Iterable[Document]) -> Iterator[Document]:
+    """Yield chunks page by page; topic and section state carry across pages."""
     cfg = load_cleaning_config()
     logger.info(f"Initialized splitter with chunk_size={cfg['chunk_size']}, overlap={cfg['chunk_overlap']}")
     
@@ -177,6 +181,7 @@ def clean_and_chunk(pages: List[Document]) -> List[Document]:
     )
 
     chunks: List[Document] = []
+    total_chunks = 0
     current_topic = None
     current_section = None
     section_buffers: Dict[str, List[str]] = {}
@@ -269,8 +274,15 @@ def clean_and_chunk(pages: List[Document]) -> List[Document]:
         # Reset buffers but keep current topic
         section_buffers = {k: [] for k in section_buffers}
 
-    logger.info(f"Cleaning complete. Generated {len(chunks)} hierarchical chunks total.")
-    return chunks
+        total_chunks += len(chunks)
+        yield from chunks
+        chunks = []
+
+    logger.info(f"Cleaning complete. Generated {total_chunks} hierarchical chunks total.")
+
+
+def clean_and_chunk(pages: List[Document]) -> List[Document]:
+    return list(iter_chunks(pages))
 
 
 # Main execution
@@ -301,7 +313,8 @@ if __name__ == "__main__":
         logger.info(f"Loaded {len(pages)} pages for processing.")
         chunks = clean_and_chunk(pages)
 
-        out_file = out_dir / "chunks.jsonl"
+        # Near-duplicates are collapsed into chunks.jsonl by src.cleaning.dedup.
+        out_file = out_dir / "chunks_raw.jsonl"
         logger.info(f"Writing chunks to {out_file}")
         with open(out_file, "w", encoding="utf-8") as f:
             for chunk in chunks:
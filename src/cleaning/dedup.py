@@ -0,0 +1,250 @@
+import json
+import re
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Dedup")
+
+WORD_RE = re.compile(r"\w+")
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def load_dedup_config() -> dict:
+    logger.info("Loading dedup configuration from configs/dedup.yaml")
+    with open("configs/dedup.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def shingles(text: str, size: int = 3) -> set:
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures from word shingles with ``num_perm`` hash functions."""
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Kept below 2**32 so a * hash + b cannot overflow uint64.
+        self.a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams)
+        )
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1)
+
+    def signatures(self, texts) -> np.ndarray:
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            out[i] = self.signature(text)
+        return out
+
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = np.arange(n)
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # The lower index stays root, so the canonical chunk is the first one.
+            lo, hi = min(ri, rj), max(ri, rj)
+            self.parent[hi] = lo
+
+
+def cluster_near_duplicates(signatures, bands=16, threshold=0.8) -> UnionFind:
+    """Cluster rows whose estimated Jaccard similarity reaches ``threshold``.
+
+    Candidates come from LSH banding: rows sharing all values of any band
+    land in the same bucket. Each bucket member is checked against the
+    bucket's first row only, which keeps huge boilerplate buckets linear.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    uf = UnionFind(n)
+
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        buckets = {}
+        for i in range(n):
+            head = buckets.setdefault(block[i].tobytes(), i)
+            if head == i or uf.find(head) == uf.find(i):
+                continue
+            if np.mean(signatures[head] == signatures[i]) >= threshold:
+                uf.union(head, i)
+
+    return uf
+
+
+def dedup_records(records, cfg):
+    """Return canonical records (input order), their provenance and a report."""
+    start = time.perf_counter()
+    hasher = MinHasher(cfg["num_perm"], cfg["shingle_size"], cfg["seed"])
+    signatures = hasher.signatures([r["text"] for r in records])
+    uf = cluster_near_duplicates(signatures, cfg["bands"], cfg["threshold"])
+    return collect_clusters(records, uf, start)
+
+
+def collect_clusters(records, uf, start):
+    members = {}
+    for i in range(len(records)):
+        members.setdefault(uf.find(i), []).append(i)
+
+    canonical = []
+    provenance = []
+    for i, record in enumerate(records):
+        group = members.get(i)
+        if group is None:
+            continue
+        metadata = {**record["metadata"], "dup_count": len(group)}
+        canonical.append({"text": record["text"], "metadata": metadata})
+        provenance.append(
+            {
+                "id": f"id_{len(canonical) - 1}",
+                "members": [{"raw_index": j, **records[j]["metadata"]} for j in group],
+            }
+        )
+
+    raw_chars = sum(len(r["text"]) for r in records)
+    kept_chars = sum(len(r["text"]) for r in canonical)
+    sizes = [len(g) for g in members.values()]
+    report = {
+        "raw_chunks": len(records),
+        "canonical_chunks": len(canonical),
+        "removed_chunks": len(records) - len(canonical),
+        "chunk_reduction": 1 - len(canonical) / len(records) if records else 0.0,
+        "raw_chars": raw_chars,
+        "canonical_chars": kept_chars,
+        "char_reduction": 1 - kept_chars / raw_chars if raw_chars else 0.0,
+        "duplicate_clusters": sum(1 for s in sizes if s > 1),
+        "largest_cluster": max(sizes, default=0),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return canonical, provenance, report
+
+
+def passthrough_records(records):
+    """Outputs of a disabled dedup stage: every chunk is its own cluster."""
+    provenance = [
+        {"id": f"id_{i}", "members": [{"raw_index": i, **r["metadata"]}]}
+        for i, r in enumerate(records)
+    ]
+    report = {"raw_chunks": len(records), "canonical_chunks": len(records), "removed_chunks": 0}
+    return records, provenance, report
+
+
+class StreamingDeduper:
+    """Incremental form of ``dedup_records`` for chunks arriving one at a time.
+
+    Each chunk is compared with the head of its LSH buckets as it arrives,
+    which yields the same comparisons as the batch pass. ``add`` returns
+    False for chunks that are already known duplicates of an earlier one;
+    a chunk accepted now can still be merged by a later one, so the final
+    clusters come from ``finish``.
+    """
+
+    def __init__(self, cfg):
+        self.enabled = cfg["enabled"]
+        self.hasher = MinHasher(cfg["num_perm"], cfg["shingle_size"], cfg["seed"])
+        self.bands = cfg["bands"]
+        self.rows = cfg["num_perm"] // cfg["bands"]
+        self.threshold = cfg["threshold"]
+        self.buckets = [{} for _ in range(self.bands)]
+        self.records = []
+        self.signatures = []
+        self.edges = []
+        self.elapsed = 0.0
+
+    def add(self, record) -> bool:
+        i = len(self.records)
+        self.records.append(record)
+        if not self.enabled:
+            return True
+
+        start = time.perf_counter()
+        signature = self.hasher.signature(record["text"])
+        self.signatures.append(signature)
+        duplicate = False
+        for band in range(self.bands):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            head = self.buckets[band].setdefault(key, i)
+            if head != i and np.mean(self.signatures[head] == signature) >= self.threshold:
+                self.edges.append((head, i))
+                duplicate = True
+        self.elapsed += time.perf_counter() - start
+        return not duplicate
+
+    def finish(self):
+        if not self.enabled:
+            return passthrough_records(self.records)
+        uf = UnionFind(len(self.records))
+        for head, i in self.edges:
+            uf.union(head, i)
+        # Report the time spent deduplicating, not the time chunks took to arrive.
+        return collect_clusters(self.records, uf, time.perf_counter() - self.elapsed)
+
+
+def _read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def run_dedup(
+    raw_path=Path("data/processed/chunks/chunks_raw.jsonl"),
+    out_dir=Path("data/processed/chunks"),
+):
+    cfg = load_dedup_config()
+    records = _read_jsonl(raw_path)
+    logger.info(f"Loaded {len(records)} raw chunks from {raw_path}")
+
+    if cfg["enabled"]:
+        canonical, provenance, report = dedup_records(records, cfg)
+    else:
+        canonical, provenance, report = passthrough_records(records)
+
+    write_dedup_outputs(out_dir, canonical, provenance, report)
+    return report
+
+
+def write_dedup_outputs(out_dir, canonical, provenance, report):
+    _write_jsonl(out_dir / "chunks.jsonl", canonical)
+    _write_jsonl(out_dir / "provenance.jsonl", provenance)
+    with open(out_dir / "dedup_report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    logger.info(f"Dedup report: {report}")
+
+
+if __name__ == "__main__":
+    run_dedup()
@@ -0,0 +1,88 @@
+import json
+import re
+from pathlib import Path
+
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Topics")
+
+CHUNKS_PATH = Path("data/processed/chunks/chunks.jsonl")
+INDEX_PATH = Path("data/processed/chunks/topics.json")
+
+NON_WORD_RE = re.compile(r"[\W_]+")
+PARENTHETICAL_RE = re.compile(r"\(([^)]*)\)")
+POSSESSIVE_RE = re.compile(r"['’]s\b")
+
+
+def normalize_topic(text: str) -> str:
+    """Case-fold, drop apostrophes and turn any other punctuation into spaces."""
+    text = text.casefold().replace("'", "").replace("’", "")
+    return NON_WORD_RE.sub(" ", text).strip()
+
+
+def topic_aliases(topic: str, min_chars: int = 4) -> set:
+    """Normalized names a query may use for ``topic``.
+
+    Covers the title itself, the title without a parenthetical and the
+    parenthetical alone ("Acquired immune deficiency syndrome (AIDS)"),
+    inverted comma titles ("Anemia, iron deficiency") and possessives
+    without the "s" ("Alzheimer's disease" -> "alzheimer disease").
+    """
+    variants = {topic}
+
+    inner = PARENTHETICAL_RE.findall(topic)
+    base = PARENTHETICAL_RE.sub(" ", topic)
+    variants.add(base)
+    variants.update(inner)
+
+    if "," in base:
+        head, _, tail = base.partition(",")
+        variants.add(f"{tail} {head}")
+
+    variants.update(POSSESSIVE_RE.sub("", v) for v in list(variants))
+
+    aliases = {normalize_topic(v) for v in variants}
+    return {a for a in aliases if len(a) >= min_chars}
+
+
+def topic_ranges(metadatas) -> dict:
+    """Topic -> ``[start, end)`` chunk ranges; chunks of a topic are contiguous per volume."""
+    ranges = {}
+    start = 0
+    for i in range(1, len(metadatas) + 1):
+        current = metadatas[start].get("topic")
+        if i < len(metadatas) and metadatas[i].get("topic") == current:
+            continue
+        if current:
+            ranges.setdefault(current, []).append([start, i])
+        start = i
+    return ranges
+
+
+def build_topic_index(metadatas, min_chars: int = 4) -> dict:
+    ranges = topic_ranges(metadatas)
+    aliases = {}
+    for topic in ranges:
+        for alias in topic_aliases(topic, min_chars):
+            aliases.setdefault(alias, []).append(topic)
+    return {"topics": ranges, "aliases": {a: sorted(t) for a, t in sorted(aliases.items())}}
+
+
+def run_topic_index(chunks_path=CHUNKS_PATH, out_path=INDEX_PATH):
+    metadatas = []
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        for line in f:
+            metadatas.append(json.loads(line)["metadata"])
+
+    index = build_topic_index(metadatas)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    logger.info(
+        f"Saved topic index with {len(index['topics'])} topics and "
+        f"{len(index['aliases'])} aliases to {out_path}"
+    )
+    return index
+
+
+if __name__ == "__main__":
+    run_topic_index()
@@ -0,0 +1,178 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+PROJECTIONS = (None, "pca", "truncate")
+
+# Rows scored per block, so int8 codes are upcast a slice at a time.
+SCORE_BLOCK = 65536
+
+
+def _normalize(x):
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1, norms)
+
+
+class Projection:
+    """Linear map to fewer dimensions: ``(x - mean) @ components.T``.
+
+    ``pca`` fits the components on the corpus; ``truncate`` keeps the
+    leading dimensions, which only preserves quality for Matryoshka-trained
+    embedders.
+    """
+
+    def __init__(self, mean, components):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+
+    @property
+    def dim(self):
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, embeddings, method, dim, sample=50000, seed=0):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if method == "truncate":
+            return cls(np.zeros(embeddings.shape[1]), np.eye(embeddings.shape[1])[:dim])
+        if method != "pca":
+            raise ValueError(f"Unknown projection: {method}")
+
+        rng = np.random.default_rng(seed)
+        if len(embeddings) > sample:
+            embeddings = embeddings[rng.choice(len(embeddings), sample, replace=False)]
+        mean = embeddings.mean(axis=0)
+        _, _, vt = np.linalg.svd(embeddings - mean, full_matrices=False)
+        return cls(mean, vt[:dim])
+
+    def apply(self, x):
+        return _normalize((np.asarray(x, dtype=np.float32) - self.mean) @ self.components.T)
+
+
+def quantize(x, precision):
+    """Return ``(codes, scales)``; ``scales`` is None unless int8."""
+    x = np.asarray(x, dtype=np.float32)
+    if precision == "float32":
+        return x, None
+    if precision == "float16":
+        return x.astype(np.float16), None
+    if precision == "int8":
+        # Symmetric per-vector scale: the largest component maps to +/-127.
+        scales = np.abs(x).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(x / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unknown precision: {precision}")
+
+
+class CompressedVectors:
+    """Reduced-precision (and optionally projected) copy of the corpus vectors.
+
+    Only used to shortlist candidates; exact scores come from rescoring the
+    shortlist against the full-precision vectors.
+    """
+
+    def __init__(self, codes, scales=None, projection=None, precision="float32"):
+        self.codes = codes
+        self.scales = scales
+        self.projection = projection
+        self.precision = precision
+
+    @classmethod
+    def compress(cls, embeddings, precision="int8", projection=None):
+        x = projection.apply(embeddings) if projection is not None else embeddings
+        codes, scales = quantize(x, precision)
+        return cls(codes, scales, projection, precision)
+
+    @classmethod
+    def from_config(cls, embeddings, cfg):
+        projection = None
+        if cfg.get("projection"):
+            projection = Projection.fit(embeddings, cfg["projection"], cfg["dim"])
+        return cls.compress(embeddings, cfg["precision"], projection)
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self):
+        total = self.codes.nbytes
+        if self.scales is not None:
+            total += self.scales.nbytes
+        if self.projection is not None:
+            total += self.projection.mean.nbytes + self.projection.components.nbytes
+        return total
+
+    def scores(self, query, rows=None):
+        """Approximate inner products of ``query`` with every stored vector, or with ``rows``."""
+        q = np.asarray(query, dtype=np.float32)
+        if self.projection is not None:
+            q = self.projection.apply(q)
+
+        n = len(self) if rows is None else len(rows)
+        out = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SCORE_BLOCK):
+            if rows is None:
+                block = self.codes[start:start + SCORE_BLOCK]
+            else:
+                block = self.codes[rows[start:start + SCORE_BLOCK]]
+            out[start:start + len(block)] = block.astype(np.float32) @ q
+        if self.scales is not None:
+            out *= self.scales if rows is None else self.scales[rows]
+        return out
+
+    def save(self, out_dir):
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        np.save(out_dir / "codes.npy", self.codes)
+        if self.scales is not None:
+            np.save(out_dir / "scales.npy", self.scales)
+        if self.projection is not None:
+            np.savez(out_dir / "projection.npz", mean=self.projection.mean, components=self.projection.components)
+        with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "precision": self.precision,
+                    "rows": len(self),
+                    "dim": int(self.codes.shape[1]),
+                    "projection": self.projection is not None,
+                    "nbytes": self.nbytes,
+                },
+                f,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, out_dir, mmap=True):
+        out_dir = Path(out_dir)
+        with open(out_dir / "manifest.json", "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        mode = "r" if mmap else None
+        codes = np.load(out_dir / "codes.npy", mmap_mode=mode)
+        scales = np.load(out_dir / "scales.npy") if (out_dir / "scales.npy").exists() else None
+        projection = None
+        if manifest["projection"]:
+            data = np.load(out_dir / "projection.npz")
+            projection = Projection(data["mean"], data["components"])
+        return cls(codes, scales, projection, manifest["precision"])
+
+
+def shortlist_and_rescore(compressed, full, query, top_k, rescore_factor=4, rows=None):
+    """Top-k indices and exact scores: approximate shortlist, then full precision.
+
+    ``rows`` (ascending) restricts the search to those vectors.
+    """
+    approx = compressed.scores(query, rows)
+    n_candidates = min(len(approx), top_k * rescore_factor)
+    if n_candidates <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    candidates = np.argpartition(-approx, n_candidates - 1)[:n_candidates]
+    if rows is not None:
+        candidates = np.asarray(rows)[candidates]
+    candidates.sort()  # sequential reads from the memory-mapped matrix
+
+    exact = np.asarray(full[candidates], dtype=np.float32) @ np.asarray(query, dtype=np.float32)
+    order = np.argsort(-exact, kind="stable")[:top_k]
+    return candidates[order], exact[order]
@@ -4,6 +4,7 @@ import yaml
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from src.embeddings.compress import CompressedVectors
 from src.utils.logging import setup_logging
 
 from dotenv import load_dotenv
@@ -44,6 +45,10 @@ def embed_chunks():
         normalize_embeddings=True,
     )
 
+    save_embeddings(embeddings, metadatas, cfg, out_dir)
+
+
+def save_embeddings(embeddings, metadatas, cfg, out_dir=Path("data/embeddings")):
     emb_path = out_dir / "embeddings.npy"
     meta_path = out_dir / "metadata.json"
 
@@ -54,6 +59,16 @@ def embed_chunks():
 
     logger.info(f"Saved embeddings to {emb_path}")
     logger.info(f"Saved metadata to {meta_path}")
+
+    compression = cfg.get("compression", {})
+    if compression.get("enabled"):
+        compressed = CompressedVectors.from_config(embeddings, compression)
+        compressed.save(out_dir / "compressed")
+        logger.info(
+            f"Saved {compression['precision']} vectors "
+            f"({compressed.codes.shape[1]} dims, {compressed.nbytes / 1e6:.1f} MB vs "
+            f"{np.asarray(embeddings).nbytes / 1e6:.1f} MB float32) to {out_dir / 'compressed'}"
+        )
     logger.info("Embedding pipeline completed successfully")
 
 
@@ -0,0 +1,291 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Encoders")
+
+ONNX_DIR = Path("data/models/query_encoder")
+MANIFEST_FILE = "manifest.json"
+MODEL_FILES = {"float32": "model.onnx", "int8": "model.int8.onnx"}
+
+# Queries the export compares ONNX against torch on, mixed lengths so the
+# padded positions are exercised.
+CHECK_TEXTS = [
+    "What is asthma?",
+    "symptoms of gout",
+    "How is type 2 diabetes treated in older adults with kidney disease?",
+    "Can a child with a fever and a stiff neck have meningitis, and what tests confirm it?",
+    "side effects of long-term corticosteroid use",
+    "anemia",
+]
+
+
+def load_embedding_config() -> dict:
+    with open("configs/embeddings.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def pool(hidden, mask, mode="mean"):
+    if mode == "cls":
+        return hidden[:, 0]
+    mask = mask[..., None].astype(hidden.dtype)
+    return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+def _normalize(x):
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norms == 0, 1, norms)
+
+
+class TorchEmbedder:
+    """The sentence-transformers model, optionally with a fixed thread count."""
+
+    def __init__(self, model_name, threads=None, model=None):
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+
+            model = SentenceTransformer(model_name, device="cpu")
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self.model = model
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, **kwargs):
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            normalize_embeddings=normalize_embeddings,
+        )
+
+
+class OnnxEmbedder:
+    """Transformer + pooling exported by ``export_onnx``, run on ONNX Runtime.
+
+    Drop-in for the torch model on the query path: same tokenizer, pooling
+    and normalisation, so vectors stay comparable with the existing index.
+    The session is opened on first use in each process, so a preloading
+    parent forks before any ONNX Runtime thread pool exists.
+    """
+
+    def __init__(self, model_dir, threads=1, precision="int8"):
+        self.model_dir = Path(model_dir)
+        with open(self.model_dir / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if precision not in self.manifest["files"]:
+            raise ValueError(f"No {precision} model in {self.model_dir}")
+        self.model_path = self.model_dir / self.manifest["files"][precision]
+        self.precision = precision
+        self.threads = threads
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _runtime(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._open()
+        return self.session, self.tokenizer
+
+    def _open(self):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            str(self.model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        tokenizer.enable_truncation(self.manifest["max_length"])
+        tokenizer.enable_padding(
+            pad_id=self.manifest["pad_id"], pad_token=self.manifest["pad_token"]
+        )
+        self.tokenizer = tokenizer
+        self._pid = os.getpid()
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        session, tokenizer = self._runtime()
+        blocks = []
+        for start in range(0, len(texts), batch_size):
+            encodings = tokenizer.encode_batch(texts[start : start + batch_size])
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": mask,
+            }
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = session.run(None, feeds)[0]
+            blocks.append(pool(hidden, mask, self.manifest["pooling"]))
+
+        if blocks:
+            out = np.concatenate(blocks).astype(np.float32)
+        else:
+            out = np.zeros((0, self.manifest["dim"]), dtype=np.float32)
+        if normalize_embeddings:
+            out = _normalize(out)
+        return out[0] if single else out
+
+
+def load_embedder(cfg, root="."):
+    """Query embedder for ``configs/embeddings.yaml``.
+
+    Falls back to torch when the ONNX export is missing or was made from a
+    different model than ``model_name``, whose vectors the index holds.
+    """
+    encoder_cfg = cfg.get("query_encoder", {})
+    backend = encoder_cfg.get("backend", "torch")
+    threads = encoder_cfg.get("threads")
+
+    if backend == "onnx":
+        onnx_cfg = encoder_cfg["onnx"]
+        model_dir = Path(root) / onnx_cfg.get("dir", ONNX_DIR)
+        if (model_dir / MANIFEST_FILE).exists():
+            embedder = OnnxEmbedder(model_dir, threads, onnx_cfg.get("precision", "int8"))
+            if embedder.manifest["model_name"] == cfg["model_name"]:
+                logger.info(f"Query encoder: ONNX {embedder.precision} from {model_dir}")
+                return embedder
+            logger.warning(
+                f"ONNX encoder at {model_dir} was exported from "
+                f"{embedder.manifest['model_name']}, not {cfg['model_name']}; using torch"
+            )
+        else:
+            logger.warning(f"ONNX encoder not found at {model_dir}; using torch")
+    elif backend != "torch":
+        raise ValueError(f"Unknown query encoder backend: {backend}")
+
+    return TorchEmbedder(cfg["model_name"], threads)
+
+
+def _pooling_mode(model):
+    for module in model:
+        if hasattr(module, "pooling_mode_cls_token"):
+            return "cls" if module.pooling_mode_cls_token else "mean"
+    return "mean"
+
+
+def _latency_ms(embedder, texts, repeats=5):
+    embedder.encode(texts[0])
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            embedder.encode(text)
+    return round((time.perf_counter() - start) * 1000 / (repeats * len(texts)), 3)
+
+
+def export_onnx(model_name, out_dir=ONNX_DIR, precisions=("float32", "int8"), max_length=None,
+                opset=17, min_cosine=0.99, model=None):
+    """Export ``model_name`` for ``OnnxEmbedder`` and check it against torch.
+
+    Writes the float32 graph, an int8 dynamically quantised copy, the
+    tokenizer and a manifest with the worst cosine to the torch vectors on
+    ``CHECK_TEXTS``. Raises if any exported precision is below ``min_cosine``.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name, device="cpu")
+    model.eval()
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer.save_pretrained(out_dir)
+
+    sample = tokenizer(CHECK_TEXTS[:2], padding=True, return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+    class HiddenStates(torch.nn.Module):
+        def __init__(self, encoder):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, *inputs):
+            return self.encoder(**dict(zip(names, inputs))).last_hidden_state
+
+    axes = {n: {0: "batch", 1: "sequence"} for n in names + ["last_hidden_state"]}
+    float_path = out_dir / MODEL_FILES["float32"]
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(transformer.auto_model),
+            tuple(sample[n] for n in names),
+            str(float_path),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+    if "int8" in precisions:
+        quantize_dynamic(str(float_path), str(out_dir / MODEL_FILES["int8"]), weight_type=QuantType.QInt8)
+
+    manifest = {
+        "model_name": model_name,
+        "files": {p: MODEL_FILES[p] for p in ("float32",) + tuple(precisions) if p in MODEL_FILES},
+        "pooling": _pooling_mode(model),
+        "dim": getattr(model, "get_embedding_dimension", model.get_sentence_embedding_dimension)(),
+        "max_length": max_length or model.max_seq_length or tokenizer.model_max_length,
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+        "opset": opset,
+    }
+    with open(out_dir / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    reference = TorchEmbedder(model_name, model=model)
+    expected = reference.encode(CHECK_TEXTS)
+    manifest["torch_ms"] = _latency_ms(reference, CHECK_TEXTS)
+    manifest["checks"] = {}
+    for precision in manifest["files"]:
+        embedder = OnnxEmbedder(out_dir, threads=None, precision=precision)
+        cosine = float((embedder.encode(CHECK_TEXTS) * expected).sum(axis=1).min())
+        manifest["checks"][precision] = {
+            "min_cosine": round(cosine, 6),
+            "latency_ms": _latency_ms(embedder, CHECK_TEXTS),
+            "bytes": (out_dir / manifest["files"][precision]).stat().st_size,
+        }
+        logger.info(f"ONNX {precision}: {manifest['checks'][precision]} (torch {manifest['torch_ms']} ms)")
+
+    with open(out_dir / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    failed = [p for p, c in manifest["checks"].items() if c["min_cosine"] < min_cosine]
+    if failed:
+        raise ValueError(f"ONNX export drifted from torch beyond cosine {min_cosine}: {failed}")
+    return manifest
+
+
+def export_query_encoder():
+    cfg = load_embedding_config()
+    onnx_cfg = cfg["query_encoder"]["onnx"]
+    return export_onnx(
+        cfg["model_name"],
+        onnx_cfg.get("dir", ONNX_DIR),
+        max_length=onnx_cfg.get("max_length"),
+        opset=onnx_cfg.get("opset", 17),
+        min_cosine=onnx_cfg.get("min_cosine", 0.99),
+    )
+
+
+if __name__ == "__main__":
+    export_query_encoder()
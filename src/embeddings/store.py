@@ -1,6 +1,9 @@
 import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 from pathlib import Path
 import numpy as np
+import yaml
 import chromadb
 from chromadb.config import Settings
 from src.utils.logging import setup_logging
@@ -13,54 +16,86 @@ def get_vector_store(persist_directory: str = "data/chroma_db"):
         settings=Settings(anonymized_telemetry=False)
     )
 
-def store_embeddings():
-    # Setup paths
-    emb_path = Path("data/embeddings/embeddings.npy")
-    meta_path = Path("data/embeddings/metadata.json")
-    chunks_file = Path("data/processed/chunks/chunks.jsonl")
-    
-    if not (emb_path.exists() and meta_path.exists()):
+def load_store_config() -> dict:
+    with open("configs/embeddings.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f).get("store", {})
+
+def resolve_batch_size(client, configured=None) -> int:
+    # Chroma reports the most records one call may carry; never exceed it.
+    limit = client.get_max_batch_size()
+    return min(configured, limit) if configured else limit
+
+def iter_batches(chunks_file: Path, batch_size: int):
+    """Yield (start, texts, metadatas) per batch while streaming chunks.jsonl."""
+    with open(chunks_file, "r", encoding="utf-8") as f:
+        start = 0
+        while True:
+            lines = list(islice(f, batch_size))
+            if not lines:
+                return
+            records = [json.loads(line) for line in lines]
+            yield start, [r["text"] for r in records], [r["metadata"] for r in records]
+            start += len(records)
+
+def store_embeddings(
+    emb_path: Path = Path("data/embeddings/embeddings.npy"),
+    chunks_file: Path = Path("data/processed/chunks/chunks.jsonl"),
+    cfg: dict | None = None,
+):
+    if not (emb_path.exists() and chunks_file.exists()):
         logger.error("Files not found. Run embed.py first.")
         return
 
-    # Load data
-    logger.info("Loading embeddings and metadata...")
-    embeddings = np.load(emb_path).tolist()
-    with open(meta_path, "r", encoding="utf-8") as f:
-        metadatas = json.load(f)
-    
-    texts = []
-    with open(chunks_file, "r", encoding="utf-8") as f:
-        for line in f:
-            texts.append(json.loads(line)["text"])
+    cfg = cfg if cfg is not None else load_store_config()
+
+    # Memory-mapped: each batch reads only its own rows from disk and goes to
+    # Chroma as a float32 array, never as nested Python float lists.
+    embeddings = np.load(emb_path, mmap_mode="r")
+    total_records = embeddings.shape[0]
 
-    # Initialize Chroma
     client = get_vector_store()
     collection = client.get_or_create_collection(name="document_embeddings")
-    ids = [f"id_{i}" for i in range(len(texts))]
+    batch_size = resolve_batch_size(client, cfg.get("batch_size"))
+    max_workers = cfg.get("max_workers", 2)
+    max_in_flight = cfg.get("max_in_flight", max_workers * 2)
+
+    logger.info(
+        f"Storing {total_records} vectors in batches of {batch_size} "
+        f"with {max_workers} writer(s)..."
+    )
 
-    # Batch processing
-    total_records = len(ids)
-    batch_size = 5000  # Safely under the 5461 limit
-    
-    logger.info(f"Storing {total_records} vectors in batches of {batch_size}...")
-    
+    def upsert(start, texts, metadatas):
+        end = start + len(texts)
+        collection.upsert(
+            ids=[f"id_{i}" for i in range(start, end)],
+            embeddings=np.ascontiguousarray(embeddings[start:end], dtype=np.float32),
+            metadatas=metadatas,
+            documents=texts,
+        )
+        logger.info(f"Stored batch {start} to {end}...")
+        return end - start
+
+    stored = 0
     try:
-        for i in range(0, total_records, batch_size):
-            end_idx = min(i + batch_size, total_records)
-            
-            collection.upsert(
-                ids=ids[i:end_idx],
-                embeddings=embeddings[i:end_idx],
-                metadatas=metadatas[i:end_idx],
-                documents=texts[i:end_idx]
+        # Parsing the next batch overlaps with writing the previous ones; the
+        # in-flight cap bounds how many parsed batches sit in memory.
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upsert") as pool:
+            pending = set()
+            for start, texts, metadatas in iter_batches(chunks_file, batch_size):
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    stored += sum(f.result() for f in done)
+                pending.add(pool.submit(upsert, start, texts, metadatas))
+            stored += sum(f.result() for f in pending)
+
+        if stored != total_records:
+            raise ValueError(
+                f"chunks.jsonl has {stored} records but embeddings.npy has {total_records} rows"
             )
-            logger.info(f"Stored batch {i} to {end_idx}...")
-            
         logger.info("Successfully completed vector storage.")
     except Exception as e:
         logger.error(f"Error during storage: {e}")
         raise
 
 if __name__ == "__main__":
-    store_embeddings()
\ No newline at end of file
+    store_embeddings()
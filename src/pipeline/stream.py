@@ -0,0 +1,254 @@
+import argparse
+import json
+import multiprocessing as mp
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import yaml
+from langchain_core.documents import Document
+
+from src.cleaning.clean import iter_chunks
+from src.cleaning.dedup import StreamingDeduper, load_dedup_config, write_dedup_outputs
+from src.ingestion.ingest import iter_pages
+from src.utils.config import load_ingestion_config
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Pipeline")
+
+CHUNKS_DIR = Path("data/processed/chunks")
+EMBEDDINGS_DIR = Path("data/embeddings")
+
+# Queue item a failed stage sends downstream instead of more data.
+FAILED = "__failed__"
+
+
+def load_pipeline_config() -> dict:
+    with open("configs/pipeline.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def _iter_queue(q, workers=()):
+    """Items from the batches on ``q`` until the end-of-stream ``None``.
+
+    With ``workers``, also raises if one of them died without reporting,
+    e.g. a process killed by the OOM killer.
+    """
+    while True:
+        try:
+            batch = q.get(timeout=1.0)
+        except queue.Empty:
+            dead = [w.name for w in workers if not w.is_alive() and getattr(w, "exitcode", 0)]
+            if dead:
+                raise RuntimeError(f"Pipeline stages exited unexpectedly: {dead}")
+            continue
+        if batch is None:
+            return
+        if isinstance(batch, tuple) and batch[0] == FAILED:
+            raise RuntimeError(f"Upstream stage failed:\n{batch[1]}")
+        yield from batch
+
+
+def _put_batches(items, q, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            q.put(batch)
+            batch = []
+    if batch:
+        q.put(batch)
+    q.put(None)
+
+
+def _stage(fn, out_q, *args):
+    # Failures travel down the queues, so the consumer raises instead of
+    # waiting forever on a stage that is gone.
+    try:
+        fn(out_q, *args)
+    except Exception:
+        logger.exception(f"Pipeline stage {fn.__name__} failed")
+        out_q.put((FAILED, traceback.format_exc()))
+
+
+def ingest_stage(pages_q, batch_size):
+    cfg = load_ingestion_config("configs/ingestion.yaml")
+    out_dir = Path(cfg.processed_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def pages():
+        with open(out_dir / "pages.jsonl", "w", encoding="utf-8") as f:
+            for record in iter_pages(cfg):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                yield record
+
+    _put_batches(pages(), pages_q, batch_size)
+
+
+def clean_stage(chunks_q, pages_q, batch_size):
+    pages = (
+        Document(page_content=r["text"], metadata=r["metadata"])
+        for r in _iter_queue(pages_q)
+    )
+    chunks = (
+        {"text": chunk.page_content, "metadata": chunk.metadata}
+        for chunk in iter_chunks(pages)
+    )
+    _put_batches(chunks, chunks_q, batch_size)
+
+
+class StreamingPipeline:
+    """Ingest -> clean -> dedup -> embed as one streaming run.
+
+    Ingestion and cleaning run as separate processes (or threads with
+    ``workers: thread``) joined by bounded queues; the parent deduplicates
+    chunks as they arrive and hands batches to an embedding thread, so PDF
+    parsing, cleaning and model inference overlap. Known duplicates are
+    never embedded. The artifacts are the ones the ``ingestion``,
+    ``cleaning``, ``dedup`` and ``embeddings`` DVC stages write.
+    """
+
+    def __init__(self, cfg, embedding_cfg, dedup_cfg, model=None):
+        self.cfg = cfg
+        self.embedding_cfg = embedding_cfg
+        self.dedup_cfg = dedup_cfg
+        self.model = model
+
+    def _start_stages(self):
+        if self.cfg["workers"] == "process":
+            ctx = mp.get_context("spawn")
+            make_queue, make_worker = ctx.Queue, ctx.Process
+        else:
+            make_queue, make_worker = queue.Queue, threading.Thread
+
+        pages_q = make_queue(maxsize=self.cfg["queue_size"])
+        chunks_q = make_queue(maxsize=self.cfg["queue_size"])
+        workers = [
+            make_worker(
+                target=_stage,
+                args=(ingest_stage, pages_q, self.cfg["page_batch"]),
+                name="pipeline-ingest",
+                daemon=True,
+            ),
+            make_worker(
+                target=_stage,
+                args=(clean_stage, chunks_q, pages_q, self.cfg["chunk_batch"]),
+                name="pipeline-clean",
+                daemon=True,
+            ),
+        ]
+        for worker in workers:
+            worker.start()
+        # Process.start() drops its args; the parent must keep the queues
+        # alive until the children have attached to them.
+        self.queues = (pages_q, chunks_q)
+        return chunks_q, workers
+
+    def _load_model(self):
+        if self.model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self.model = SentenceTransformer(self.embedding_cfg["model_name"])
+        return self.model
+
+    def _encode(self, texts):
+        return self.model.encode(
+            texts,
+            batch_size=self.embedding_cfg["batch_size"],
+            show_progress_bar=False,
+            normalize_embeddings=True,
+        )
+
+    def run(self, chunks_dir=CHUNKS_DIR, embeddings_dir=EMBEDDINGS_DIR):
+        from src.embeddings.embed import save_embeddings
+
+        start = time.perf_counter()
+        chunks_dir.mkdir(parents=True, exist_ok=True)
+        embeddings_dir.mkdir(parents=True, exist_ok=True)
+
+        # Workers start first so PDF parsing overlaps the model load.
+        chunks_q, workers = self._start_stages()
+        self._load_model()
+
+        deduper = StreamingDeduper(self.dedup_cfg)
+        embedded_rows = []
+        futures = []
+        pending = set()
+        rows, texts = [], []
+        max_in_flight = self.cfg["max_in_flight"]
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-embed") as pool:
+
+            def submit():
+                # Bounded like the queues: at most max_in_flight batches wait
+                # for the model, so a slow embedder throttles cleaning.
+                nonlocal pending, rows, texts
+                while len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                future = pool.submit(self._encode, texts)
+                futures.append(future)
+                pending.add(future)
+                embedded_rows.extend(rows)
+                rows, texts = [], []
+
+            with open(chunks_dir / "chunks_raw.jsonl", "w", encoding="utf-8") as f:
+                for record in _iter_queue(chunks_q, workers):
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    if deduper.add(record):
+                        rows.append(len(deduper.records) - 1)
+                        texts.append(record["text"])
+                    if len(texts) >= self.cfg["embed_batch"]:
+                        submit()
+            if texts:
+                submit()
+            blocks = [future.result() for future in futures]
+
+        for worker in workers:
+            worker.join()
+
+        canonical, provenance, report = deduper.finish()
+        write_dedup_outputs(chunks_dir, canonical, provenance, report)
+        if not canonical:
+            logger.warning("No chunks produced; nothing to embed")
+            return report
+
+        # Canonical chunks are the first member of their cluster, which is
+        # never rejected on arrival, so every one of them was embedded.
+        position = {row: k for k, row in enumerate(embedded_rows)}
+        vectors = np.concatenate([np.asarray(b, dtype=np.float32) for b in blocks])
+        keep = [position[p["members"][0]["raw_index"]] for p in provenance]
+        save_embeddings(
+            vectors[keep], [c["metadata"] for c in canonical], self.embedding_cfg, embeddings_dir
+        )
+
+        logger.info(
+            f"Streaming pipeline finished in {time.perf_counter() - start:.1f}s: "
+            f"{report['raw_chunks']} chunks, {len(embedded_rows)} embedded, "
+            f"{len(canonical)} kept"
+        )
+        return report
+
+
+def run_pipeline(workers=None):
+    from src.embeddings.embed import load_embedding_config
+
+    cfg = load_pipeline_config()
+    if workers:
+        cfg["workers"] = workers
+    pipeline = StreamingPipeline(cfg, load_embedding_config(), load_dedup_config())
+    return pipeline.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming ingest -> clean -> dedup -> embed")
+    parser.add_argument("--workers", choices=["process", "thread"], default=None)
+    args = parser.parse_args()
+    run_pipeline(args.workers)
+
+
+if __name__ == "__main__":
+    main()
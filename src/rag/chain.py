@@ -1,29 +1,101 @@
-import ollama
 import time
 from src.rag.guardrails import Guardrails
 from src.rag.explainability import build_explainability
-from src.rag.schema import RAGResponse
+from src.rag.schema import RAGResult
+from src.utils.logging import setup_logging
+from src.utils.metrics import METRICS
+
+logger = setup_logging("RagChain")
+
+EMERGENCY_ANSWER = "This appears to be a medical emergency. Please seek immediate medical attention."
+NO_CONTEXT_ANSWER = "I cannot find sufficient medical evidence in the retrieved documents."
+LOW_CONFIDENCE_ANSWER = "The available evidence is insufficient to provide a confident answer."
 
 
 class RagChain:
-    def __init__(self, model, temperature, guardrail_cfg):
+    def __init__(self, model, temperature, guardrail_cfg, llm_client=None, keep_alive=None, options=None):
         self.model = model
         self.temperature = temperature
         self.guardrails = Guardrails(guardrail_cfg)
+        # Per-chunk previews and scores are returned unless turned off.
+        explain_cfg = guardrail_cfg.get("explainability") or {}
+        self.include_chunks = explain_cfg.get("include_retrieved_chunks", True)
+        self.include_scores = explain_cfg.get("include_scores", True)
+        self.llm_client = llm_client
+        self.keep_alive = keep_alive
+        self.options = options or {}
+
+    @staticmethod
+    def _messages(prompt):
+        # A prompt is either one rendered string or a list of chat messages.
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        return prompt
 
-    def generate(self, query, docs, prompt):
-        start_llm = time.time()
+    def generate(self, query, docs, prompt, timings=None):
+        import ollama
 
-        response = ollama.chat(
+        start_ns = time.perf_counter_ns()
+        parts = []
+
+        stream = ollama.chat(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            options={"temperature": self.temperature},
+            messages=self._messages(prompt),
+            options={"temperature": self.temperature, **self.options},
+            stream=True,
+            keep_alive=self.keep_alive,
+        )
+        for part in stream:
+            if not parts:
+                ttft = (time.perf_counter_ns() - start_ns) / 1e9
+                METRICS.observe("llm_ttft", ttft)
+                if timings is not None:
+                    timings["llm_ttft"] = ttft
+            parts.append(part["message"]["content"])
+
+        llm_time = (time.perf_counter_ns() - start_ns) / 1e9
+        METRICS.observe("llm_total", llm_time)
+        if timings is not None:
+            timings["llm_total"] = llm_time
+
+        answer = "".join(parts)
+
+        return self.apply_guardrails(query, docs, answer, timings), llm_time
+
+    async def agenerate(self, query, docs, prompt, timings=None):
+        answer, llm_time = await self.llm_client.chat(
+            self._messages(prompt), timings=timings
         )
 
-        llm_time = time.time() - start_llm
+        return self.apply_guardrails(query, docs, answer, timings), llm_time
+
+    async def astream(self, prompt, timings=None):
+        async for token in self.llm_client.stream(
+            self._messages(prompt), timings=timings
+        ):
+            yield token
 
-        answer = response["message"]["content"]
+    def apply_guardrails(self, query, docs, answer, timings=None):
+        with METRICS.timer("guardrails", timings):
+            return self._apply_guardrails(query, docs, answer)
 
+    def pre_generation_refusal(self, query, docs, confidence=None):
+        """Refusal answer decided by the query and docs alone, or ``None``.
+
+        These refusals do not depend on the answer, so streaming checks them
+        before generating anything.
+        """
+        if self.guardrails.check_emergency(query):
+            return EMERGENCY_ANSWER
+        if self.guardrails.check_no_context(docs):
+            return NO_CONTEXT_ANSWER
+        if confidence is None:
+            confidence = self.guardrails.compute_confidence(docs)
+        if self.guardrails.check_low_confidence(confidence):
+            return LOW_CONFIDENCE_ANSWER
+        return None
+
+    def _apply_guardrails(self, query, docs, answer):
         citations = self.guardrails.validate_citations(answer)
         confidence = self.guardrails.compute_confidence(docs)
 
@@ -31,35 +103,24 @@ class RagChain:
         explanation = None
 
         # Guardrail logic
-        if self.guardrails.check_emergency(query):
+        refusal_answer = self.pre_generation_refusal(query, docs, confidence)
+        if refusal_answer is not None:
+            if refusal_answer == EMERGENCY_ANSWER:
+                logger.warning(f"Emergency keywords matched: {self.guardrails.match_emergency(query)}")
             refusal = True
-            answer = (
-                "This appears to be a medical emergency. "
-                "Please seek immediate medical attention."
-            )
-
-        elif self.guardrails.check_no_context(docs):
-            refusal = True
-            answer = (
-                "I cannot find sufficient medical evidence in the retrieved documents."
-            )
-
-        elif self.guardrails.check_low_confidence(confidence):
-            refusal = True
-            answer = (
-                "The available evidence is insufficient to provide a confident answer."
-            )
+            answer = refusal_answer
 
         if not citations:
             refusal = True
 
-        explanation = build_explainability(docs)
+        if self.include_chunks:
+            explanation = build_explainability(docs, self.include_scores)
 
-        return RAGResponse(
+        return RAGResult(
             answer=answer,
             citations=citations,
             confidence=confidence,
             refusal=refusal,
             explanation="Guardrails applied",
             retrieved_chunks=explanation,
-        ), llm_time
+        )
@@ -0,0 +1,145 @@
+import re
+
+from src.rag.tokens import TokenCounter
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+WORD_RE = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how in is it of on or the "
+    "to what when which who why with".split()
+)
+
+
+def _terms(text):
+    return {w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 1}
+
+
+def format_context(docs):
+    return "\n\n".join(f"[{i+1}] {d['text']}" for i, d in enumerate(docs))
+
+
+class ContextPacker:
+    """Packs reranked chunks into a token budget for the prompt.
+
+    Chunks are taken in rerank order. Text repeated from a higher-ranked chunk
+    (the splitter's overlap window) is cut, long chunks are trimmed to their
+    most query-relevant sentences, and packing stops adding chunks once the
+    budget is spent. Citation numbers follow the order of the packed chunks,
+    so ``[n]`` in the answer refers to the n-th returned doc.
+    """
+
+    def __init__(
+        self,
+        max_tokens=1200,
+        max_sentences=5,
+        min_chunk_tokens=30,
+        min_overlap=40,
+        max_overlap=300,
+        counter=None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_sentences = max_sentences
+        self.min_chunk_tokens = min_chunk_tokens
+        self.min_overlap = min_overlap
+        self.max_overlap = max_overlap
+        self.counter = counter or TokenCounter()
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(
+            max_tokens=cfg["max_tokens"],
+            max_sentences=cfg["max_sentences"],
+            min_chunk_tokens=cfg.get("min_chunk_tokens", 30),
+            min_overlap=cfg.get("min_overlap", 40),
+            max_overlap=cfg.get("max_overlap", 300),
+            counter=TokenCounter.from_config(cfg),
+        )
+
+    def pack(self, query, docs):
+        """Return ``(context, packed_docs, stats)``."""
+        count = self.counter.count
+        terms = _terms(query)
+
+        packed = []
+        kept_texts = []
+        used = 0
+        duplicates = 0
+
+        for doc in docs:
+            text = self._strip_overlap(kept_texts, doc["text"])
+            if not text:
+                duplicates += 1
+                continue
+
+            sentences = SENTENCE_RE.split(text)
+            selected = self._select_sentences(sentences, terms)
+
+            remaining = self.max_tokens - used
+            # The "[n] " marker and the blank line between chunks cost a few tokens.
+            overhead = count(f"[{len(packed) + 1}] \n\n")
+            chunk_text = self._join(sentences, selected)
+
+            if count(chunk_text) + overhead > remaining:
+                # Shrink to fit, but skip fragments too small to be useful.
+                while selected and count(chunk_text) + overhead > remaining:
+                    selected = selected[:-1]
+                    chunk_text = self._join(sentences, selected)
+                if not selected or count(chunk_text) < self.min_chunk_tokens:
+                    continue
+
+            kept_texts.append(doc["text"])
+            packed.append({**doc, "text": chunk_text})
+            used += count(chunk_text) + overhead
+
+        context = format_context(packed)
+        tokens_before = count(format_context(docs))
+        tokens_after = count(context)
+
+        stats = {
+            "chunks_in": len(docs),
+            "chunks_packed": len(packed),
+            "duplicates_removed": duplicates,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": max(0, tokens_before - tokens_after),
+            "budget": self.max_tokens,
+        }
+        return context, packed, stats
+
+    def _strip_overlap(self, kept_texts, text):
+        """Drop text already present in a kept chunk from either end of ``text``."""
+        for kept in kept_texts:
+            if text in kept:
+                return ""
+
+            limit = min(len(kept), len(text), self.max_overlap)
+            for size in range(limit, self.min_overlap - 1, -1):
+                if kept.endswith(text[:size]):
+                    text = text[size:]
+                    break
+                if kept.startswith(text[-size:]):
+                    text = text[:-size]
+                    break
+        return text.strip()
+
+    def _select_sentences(self, sentences, terms):
+        """Indices of the most relevant sentences, best first."""
+        if len(sentences) <= self.max_sentences:
+            ranked = range(len(sentences))
+        else:
+            scores = [len(_terms(s) & terms) for s in sentences]
+            ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+        return list(ranked)[: self.max_sentences]
+
+    @staticmethod
+    def _join(sentences, selected):
+        # Original order, with an ellipsis wherever sentences were cut out.
+        parts = []
+        prev = None
+        for i in sorted(selected):
+            if prev is not None and i != prev + 1:
+                parts.append("...")
+            parts.append(sentences[i])
+            prev = i
+        return " ".join(parts)
@@ -1,12 +1,23 @@
-def build_explainability(docs):
+PREVIEW_CHARS = 300
+
+
+def chunk_preview(text, max_chars=PREVIEW_CHARS):
+    return text[:max_chars]
+
+
+def build_explainability(docs, include_scores=True):
+    # Previews are stored in the chunk metadata at cleaning time; docs from
+    # older indexes fall back to slicing the text.
     explanation = []
     for idx, d in enumerate(docs):
-        explanation.append(
-            {
-                "chunk_id": idx + 1,
-                "score": d.get("score"),
-                "rerank_score": d.get("rerank_score"),
-                "preview": d["text"][:300],
-            }
-        )
+        preview = (d.get("metadata") or {}).get("preview")
+        item = {
+            "chunk_id": idx + 1,
+            "preview": preview if preview is not None else chunk_preview(d["text"]),
+        }
+        if include_scores:
+            score, rerank_score = d.get("score"), d.get("rerank_score")
+            item["score"] = None if score is None else float(score)
+            item["rerank_score"] = None if rerank_score is None else float(rerank_score)
+        explanation.append(item)
     return explanation
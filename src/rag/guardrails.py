@@ -1,16 +1,24 @@
 import re
 
+from src.utils.matcher import KeywordMatcher
+
 
 class Guardrails:
 
     def __init__(self, cfg):
         self.cfg = cfg["medical_guardrails"]
+        # Substring matching, so inflections ("overdosed", "heart attacks")
+        # still trigger the emergency refusal.
+        self.emergency_matcher = KeywordMatcher(
+            self.cfg["emergency_keywords"],
+            word_boundary=self.cfg.get("keyword_word_boundary", False),
+        )
 
     def check_emergency(self, query):
-        for keyword in self.cfg["emergency_keywords"]:
-            if keyword.lower() in query.lower():
-                return True
-        return False
+        return self.emergency_matcher.search(query)
+
+    def match_emergency(self, query):
+        return self.emergency_matcher.find(query)
 
     def check_no_context(self, retrieved_docs):
         return len(retrieved_docs) == 0
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+from src.utils.metrics import METRICS
+
+
+class AsyncLLMClient:
+    """Pooled async ollama client shared by all requests of one process.
+
+    The underlying httpx pool keeps keep-alive connections to the ollama
+    server, and a semaphore caps how many generations are in flight at once.
+    """
+
+    def __init__(
+        self,
+        model,
+        temperature,
+        host=None,
+        max_concurrency=8,
+        max_connections=16,
+        timeout=120.0,
+        connect_timeout=5.0,
+        keep_alive=None,
+        options=None,
+    ):
+        self.model = model
+        self.temperature = temperature
+        # Keeping the model resident (and num_ctx fixed) lets ollama reuse the
+        # KV cache of a matching prompt prefix instead of reloading.
+        self.keep_alive = keep_alive
+        self.options = options or {}
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    @classmethod
+    def from_config(cls, llm_cfg):
+        return cls(
+            model=llm_cfg["model"],
+            temperature=llm_cfg["temperature"],
+            host=llm_cfg.get("host"),
+            max_concurrency=llm_cfg.get("max_concurrency", 8),
+            max_connections=llm_cfg.get("max_connections", 16),
+            timeout=llm_cfg.get("timeout", 120.0),
+            connect_timeout=llm_cfg.get("connect_timeout", 5.0),
+            keep_alive=llm_cfg.get("keep_alive"),
+            options=llm_cfg.get("options"),
+        )
+
+    def _ensure_client(self):
+        # httpx pools and asyncio primitives are bound to the loop that first
+        # uses them, so rebuild them if we are now running on a different one.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            import httpx
+            import ollama
+
+            self._client = ollama.AsyncClient(
+                host=self.host,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    async def chat(self, messages, timings=None, **kwargs):
+        # Streams under the hood so time-to-first-token is measured for
+        # blocking calls too; the concatenated text is the same answer.
+        timings = timings if timings is not None else {}
+        parts = [token async for token in self.stream(messages, timings, **kwargs)]
+        return "".join(parts), timings["llm_total"]
+
+    async def stream(self, messages, timings=None, **kwargs):
+        client = self._ensure_client()
+        options = {"temperature": self.temperature, **self.options, **kwargs.pop("options", {})}
+        if self.keep_alive is not None:
+            kwargs.setdefault("keep_alive", self.keep_alive)
+        timings = timings if timings is not None else {}
+
+        queued_ns = time.perf_counter_ns()
+        async with self._semaphore:
+            start_ns = time.perf_counter_ns()
+            self._record(timings, "llm_queue", start_ns - queued_ns)
+
+            async with asyncio.timeout(self.timeout):
+                parts = await client.chat(
+                    model=self.model,
+                    messages=messages,
+                    options=options,
+                    stream=True,
+                    **kwargs,
+                )
+                first = True
+                async for part in parts:
+                    if first:
+                        self._record(timings, "llm_ttft", time.perf_counter_ns() - start_ns)
+                        first = False
+                    token = part["message"]["content"]
+                    if token:
+                        yield token
+
+            self._record(timings, "llm_total", time.perf_counter_ns() - start_ns)
+
+    def _record(self, timings, stage, elapsed_ns):
+        seconds = elapsed_ns / 1e9
+        METRICS.observe(stage, seconds)
+        timings[stage] = seconds
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
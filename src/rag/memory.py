@@ -1,15 +1,245 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+from src.rag.tokens import estimate_tokens
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class ExtractiveSummarizer:
+    """Folds evicted turns into a short running summary without an LLM call.
+
+    Keeps the first sentence of each evicted message and drops the oldest
+    material once the summary exceeds ``max_tokens``.
+    """
+
+    def __init__(self, max_tokens=150, count_tokens=estimate_tokens):
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+
+    def __call__(self, summary, messages):
+        parts = [summary] if summary else []
+        for msg in messages:
+            first = SENTENCE_RE.split(msg["content"].strip(), maxsplit=1)[0]
+            if first:
+                parts.append(f"{msg['role']}: {first}")
+
+        while len(parts) > 1 and self.count_tokens(" | ".join(parts)) > self.max_tokens:
+            parts.pop(0)
+
+        text = " | ".join(parts)
+        if self.count_tokens(text) > self.max_tokens:
+            text = text[-self.max_tokens * 4:]
+        return text
+
+
 class ConversationMemory:
-    def __init__(self, max_turns=10):
+    """Bounded history for one conversation.
+
+    Messages live in a ring buffer capped by both ``max_turns`` and a token
+    budget. The formatted history is maintained incrementally, so reading it
+    is O(1) instead of re-concatenating every message per request.
+    """
+
+    def __init__(
+        self,
+        max_turns=10,
+        max_tokens=1000,
+        summarizer=None,
+        count_tokens=estimate_tokens,
+        evict_to=1.0,
+    ):
         self.max_turns = max_turns
-        self.history = []
+        self.max_tokens = max_tokens
+        # Once over a limit, evict down to this fraction of it. Below 1.0 the
+        # history changes from the front only now and then, which keeps the
+        # prompt prefix stable for the LLM server's cache in between.
+        self.evict_to = evict_to
+        self.summarizer = summarizer
+        self.count_tokens = count_tokens
+
+        self.history = deque()
+        self.tokens = 0
+        self.summary = ""
+        self._formatted = ""
 
     def add(self, role, content):
-        self.history.append({"role": role, "content": content})
-        if len(self.history) > self.max_turns * 2:
-            self.history = self.history[-self.max_turns * 2:]
+        line = f"{role.upper()}: {content}\n"
+        msg = {"role": role, "content": content, "line": line, "tokens": self.count_tokens(line)}
+
+        self.history.append(msg)
+        self.tokens += msg["tokens"]
+        self._formatted += line
+
+        evicted = []
+        if len(self.history) > self.max_turns * 2 or self.tokens > self.max_tokens:
+            max_messages = max(1, int(self.max_turns * 2 * self.evict_to))
+            max_tokens = self.max_tokens * self.evict_to
+            while len(self.history) > 1 and (
+                len(self.history) > max_messages or self.tokens > max_tokens
+            ):
+                evicted.append(self._pop_oldest())
+            # Never leave an answer without its question at the front.
+            while len(self.history) > 1 and self.history[0]["role"] != "user":
+                evicted.append(self._pop_oldest())
+
+        if evicted:
+            self._formatted = self._formatted[sum(len(m["line"]) for m in evicted):]
+            if self.summarizer is not None:
+                self.summary = self.summarizer(self.summary, evicted)
+
+    def _pop_oldest(self):
+        old = self.history.popleft()
+        self.tokens -= old["tokens"]
+        return old
 
     def get_history(self):
-        formatted = ""
-        for msg in self.history:
-            formatted += f"{msg['role'].upper()}: {msg['content']}\n"
-        return formatted
+        if self.summary:
+            return f"SUMMARY OF EARLIER TURNS: {self.summary}\n{self._formatted}"
+        return self._formatted
+
+    def messages(self):
+        """History as chat messages, led by the summary if there is one."""
+        messages = [{"role": m["role"], "content": m["content"]} for m in self.history]
+        if self.summary:
+            messages.insert(0, {"role": "system", "content": f"Summary of earlier turns: {self.summary}"})
+        return messages
+
+    def nbytes(self) -> int:
+        # Text dominates; counting characters twice covers the message and the
+        # formatted cache without walking object headers.
+        return 2 * len(self._formatted) + len(self.summary)
+
+    def clear(self):
+        self.history.clear()
+        self.tokens = 0
+        self.summary = ""
+        self._formatted = ""
+
+
+class SessionStore:
+    """Per-session ConversationMemory with TTL and LRU eviction.
+
+    Sessions idle for longer than ``ttl_seconds`` are dropped, and the least
+    recently used sessions are evicted once either ``max_sessions`` or the
+    approximate ``max_bytes`` cap is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_sessions=1000,
+        ttl_seconds=1800,
+        max_bytes=64 * 1024 * 1024,
+        memory_factory=ConversationMemory,
+        clock=time.monotonic,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.memory_factory = memory_factory
+        self.clock = clock
+
+        self._sessions = OrderedDict()  # session_id -> [memory, last_access, nbytes]
+        self._bytes = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg):
+        summarizer = None
+        if cfg.get("summarize"):
+            summarizer = ExtractiveSummarizer(max_tokens=cfg.get("summary_tokens", 150))
+
+        def memory_factory():
+            return ConversationMemory(
+                max_turns=cfg["max_turns"],
+                max_tokens=cfg.get("max_tokens", 1000),
+                summarizer=summarizer,
+                evict_to=cfg.get("evict_to", 1.0),
+            )
+
+        return cls(
+            max_sessions=cfg.get("max_sessions", 1000),
+            ttl_seconds=cfg.get("ttl_seconds", 1800),
+            max_bytes=int(cfg.get("max_mb", 64) * 1024 * 1024),
+            memory_factory=memory_factory,
+        )
+
+    def get_history(self, session_id):
+        if session_id is None:
+            return ""
+        with self._lock:
+            entry = self._touch(session_id, create=False)
+            return entry[0].get_history() if entry else ""
+
+    def get_messages(self, session_id):
+        if session_id is None:
+            return []
+        with self._lock:
+            entry = self._touch(session_id, create=False)
+            return entry[0].messages() if entry else []
+
+    def add(self, session_id, role, content):
+        if session_id is None:
+            return
+        with self._lock:
+            entry = self._touch(session_id, create=True)
+            entry[0].add(role, content)
+            size = entry[0].nbytes()
+            self._bytes += size - entry[2]
+            entry[2] = size
+            self._evict()
+
+    def clear(self, session_id):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry:
+                self._bytes -= entry[2]
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"sessions": len(self._sessions), "bytes": self._bytes, "evicted": self._evicted}
+
+    def _touch(self, session_id, create):
+        now = self.clock()
+        entry = self._sessions.get(session_id)
+        if entry is not None and now - entry[1] > self.ttl_seconds:
+            self._drop(session_id)
+            entry = None
+
+        if entry is None:
+            if not create:
+                return None
+            entry = self._sessions[session_id] = [self.memory_factory(), now, 0]
+        else:
+            entry[1] = now
+            self._sessions.move_to_end(session_id)
+        return entry
+
+    def _evict(self):
+        now = self.clock()
+        # Oldest-first order means expired sessions sit at the front.
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if now - entry[1] > self.ttl_seconds:
+                self._drop(session_id)
+            else:
+                break
+
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._sessions)))
+
+    def _drop(self, session_id):
+        entry = self._sessions.pop(session_id)
+        self._bytes -= entry[2]
+        self._evicted += 1
@@ -1,6 +1,4 @@
-def build_medical_prompt(question, context, history):
-    return f"""
-You are a medically cautious AI assistant.
+MEDICAL_RULES = """You are a medically cautious AI assistant.
 
 Rules:
 1. ONLY answer using the provided Context.
@@ -8,7 +6,21 @@ Rules:
 3. If the answer is not clearly supported by context, say:
    "I cannot find sufficient medical evidence in the retrieved documents."
 4. Do NOT provide diagnosis or prescriptions.
-5. In emergency cases, advise seeking immediate medical attention.
+5. In emergency cases, advise seeking immediate medical attention."""
+
+MEDICAL_OUTPUT_FORMAT = """Provide:
+- Answer
+- Citations list at the end"""
+
+# Static instructions for the "messages" layout. Keeping them byte-identical
+# in a leading system message lets the LLM server reuse their KV cache for
+# every request.
+MEDICAL_SYSTEM_PROMPT = f"{MEDICAL_RULES}\n\n{MEDICAL_OUTPUT_FORMAT}"
+
+
+def build_medical_prompt(question, context, history):
+    return f"""
+{MEDICAL_RULES}
 
 Conversation History:
 {history}
@@ -19,7 +31,28 @@ Context:
 Question:
 {question}
 
-Provide:
-- Answer
-- Citations list at the end
-"""
\ No newline at end of file
+{MEDICAL_OUTPUT_FORMAT}
+"""
+
+
+def build_medical_user_message(question, context):
+    return f"""Question:
+{question}
+
+Context:
+{context}"""
+
+
+def build_medical_messages(question, context, history_messages):
+    """Chat messages laid out so the history prefix stays stable.
+
+    System rules first, then earlier turns (bare questions and answers,
+    without their retrieved context), then the new question with its
+    context. A follow-up request shares everything but its last message
+    with the next one.
+    """
+    return [
+        {"role": "system", "content": MEDICAL_SYSTEM_PROMPT},
+        *history_messages,
+        {"role": "user", "content": build_medical_user_message(question, context)},
+    ]
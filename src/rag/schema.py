@@ -1,10 +1,12 @@
+from dataclasses import dataclass
 from pydantic import BaseModel
 from typing import List, Optional
 
 
 class RetrievedChunk(BaseModel):
-    text: str
-    score: float
+    chunk_id: int
+    preview: str
+    score: Optional[float] = None
     rerank_score: Optional[float] = None
 
 
@@ -15,3 +17,28 @@ class RAGResponse(BaseModel):
     refusal: bool
     explanation: Optional[str]
     retrieved_chunks: Optional[List[RetrievedChunk]]
+
+
+@dataclass(slots=True)
+class RAGResult:
+    """Request-path counterpart of ``RAGResponse``, built without validation.
+
+    ``RAGResponse`` is only used to validate payloads at the API boundary.
+    """
+
+    answer: str
+    citations: List[int]
+    confidence: float
+    refusal: bool
+    explanation: Optional[str] = None
+    retrieved_chunks: Optional[List[dict]] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "answer": self.answer,
+            "citations": self.citations,
+            "confidence": self.confidence,
+            "refusal": self.refusal,
+            "explanation": self.explanation,
+            "retrieved_chunks": self.retrieved_chunks,
+        }
@@ -0,0 +1,43 @@
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: about four characters per token for English BPE."""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+class TokenCounter:
+    """Counts prompt tokens with the LLM's tokenizer or a calibrated ratio.
+
+    Loading a Hugging Face tokenizer is optional; without one the count is
+    ``len(text) / chars_per_token``, which ``calibrate`` fits against real
+    counts (e.g. ollama's ``prompt_eval_count``).
+    """
+
+    def __init__(self, tokenizer=None, chars_per_token=4.0):
+        self.tokenizer = tokenizer
+        self.chars_per_token = chars_per_token
+
+    @classmethod
+    def from_config(cls, cfg):
+        tokenizer = None
+        if cfg.get("tokenizer"):
+            from transformers import AutoTokenizer
+
+            tokenizer = AutoTokenizer.from_pretrained(cfg["tokenizer"])
+        return cls(tokenizer=tokenizer, chars_per_token=cfg.get("chars_per_token", 4.0))
+
+    @staticmethod
+    def calibrate(texts, token_counts) -> float:
+        """Characters per token that best fits observed counts."""
+        chars = sum(len(t) for t in texts)
+        tokens = sum(token_counts)
+        return chars / tokens if tokens else 4.0
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+        return max(1, round(len(text) / self.chars_per_token))
+
+    __call__ = count
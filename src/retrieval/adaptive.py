@@ -0,0 +1,89 @@
+from src.utils.logging import setup_logging
+
+logger = setup_logging("AdaptiveDepth")
+
+
+def _add_timings(timings, *passes):
+    if timings is None:
+        return
+    for stage_timings in passes:
+        for stage, seconds in stage_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+class AdaptiveRetriever:
+    """Shallow first pass, widened only when its head is ambiguous.
+
+    Wraps a hybrid or sharded retriever. The first pass asks for
+    ``initial_k`` per retriever; when the top fused score clearly leads
+    (relative gap to the next one) or at least ``min_agreement`` of the
+    top ``head`` chunks were found by both dense and sparse search,
+    only ``initial_candidates`` chunks go on to the reranker. Otherwise the
+    query is retrieved again at the full ``dense_k``/``sparse_k`` and the
+    caller's usual candidate cut applies.
+    """
+
+    def __init__(self, retriever, initial_k=6, initial_candidates=6, min_gap=0.1,
+                 min_agreement=2, head=3):
+        self.retriever = retriever
+        self.initial_k = initial_k
+        self.initial_candidates = initial_candidates
+        self.min_gap = min_gap
+        self.min_agreement = min_agreement
+        self.head = head
+
+    @classmethod
+    def from_config(cls, retriever, cfg):
+        return cls(
+            retriever,
+            initial_k=cfg["initial_k"],
+            initial_candidates=cfg["initial_candidates"],
+            min_gap=cfg["min_gap"],
+            min_agreement=cfg["min_agreement"],
+            head=cfg.get("head", 3),
+        )
+
+    def assess(self, docs):
+        """Return ``(reason, gap, agreement)``; reason ``ambiguous`` means widen."""
+        if not docs:
+            return "no_hits", 0.0, 0
+
+        agreement = sum(len(d.get("found_by", ())) > 1 for d in docs[: self.head])
+        if len(docs) == 1:
+            return "single_hit", 1.0, agreement
+
+        top, second = docs[0]["score"], docs[1]["score"]
+        # Relative, because BM25 puts fused scores on a per-query scale.
+        # Sharded scores share one scale (see ShardedRetriever).
+        gap = (top - second) / abs(top) if top else 0.0
+        if gap >= self.min_gap:
+            return "score_gap", gap, agreement
+        if agreement >= self.min_agreement:
+            return "agreement", gap, agreement
+        return "ambiguous", gap, agreement
+
+    def retrieve(self, query, query_embedding, dense_k, sparse_k, timings=None):
+        first = {}
+        docs = self.retriever.retrieve(query, query_embedding, self.initial_k, self.initial_k, first)
+        reason, gap, agreement = self.assess(docs)
+
+        if reason in ("score_gap", "agreement", "single_hit"):
+            _add_timings(timings, first)
+            docs = docs[: self.initial_candidates]
+            k = self.initial_k
+        else:
+            second = {}
+            docs = self.retriever.retrieve(query, query_embedding, dense_k, sparse_k, second)
+            _add_timings(timings, first, second)
+            k = max(dense_k, sparse_k)
+
+        logger.info(
+            f"Retrieval depth k={k} candidates={len(docs)} reason={reason} "
+            f"gap={gap:.3f} agreement={agreement}/{self.head}"
+        )
+        return docs
+
+    def close(self):
+        close = getattr(self.retriever, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,129 @@
+from collections import Counter
+
+import numpy as np
+
+
+class BM25Index:
+    """Okapi BM25 over a compressed-sparse-row inverted index.
+
+    Scores match ``rank_bm25.BM25Okapi`` (same idf floor of
+    ``epsilon * average_idf``), but postings live in a handful of flat numpy
+    arrays instead of one dict per document. Scoring only touches the
+    postings of the query terms, and the arrays stay shared copy-on-write
+    when a preloaded parent forks serving workers.
+    """
+
+    def __init__(self, tokenized_corpus, k1=1.5, b=0.75, epsilon=0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        self.vocab = {}
+        term_ids = []
+        doc_ids = []
+        tfs = []
+        doc_len = []
+
+        for doc_id, tokens in enumerate(tokenized_corpus):
+            doc_len.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_id = self.vocab.setdefault(term, len(self.vocab))
+                term_ids.append(term_id)
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+
+        self.corpus_size = len(doc_len)
+        self.doc_len = np.asarray(doc_len, dtype=np.float64)
+        self.avgdl = float(self.doc_len.mean()) if self.corpus_size else 0.0
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")
+        self.postings_docs = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.postings_tf = np.asarray(tfs, dtype=np.float64)[order]
+
+        df = np.bincount(term_ids, minlength=len(self.vocab))
+        self.indptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=self.indptr[1:])
+
+        self.idf = self._calc_idf(df)
+
+        # Per-document length normalisation is query independent.
+        if self.corpus_size:
+            self.norm = self.k1 * (1 - self.b + self.b * self.doc_len / self.avgdl)
+        else:
+            self.norm = np.zeros(0)
+
+    def _calc_idf(self, df):
+        if not len(df):
+            return np.zeros(0)
+        idf = np.log(self.corpus_size - df + 0.5) - np.log(df + 0.5)
+        eps = self.epsilon * float(idf.mean())
+        idf[idf < 0] = eps
+        return idf
+
+    def _postings(self, term_id, ranges):
+        start, end = self.indptr[term_id], self.indptr[term_id + 1]
+        if ranges is None:
+            return self.postings_docs[start:end], self.postings_tf[start:end]
+        # Postings are sorted by doc id, so each range is one contiguous slice.
+        docs = self.postings_docs[start:end]
+        bounds = np.searchsorted(docs, np.asarray(ranges).ravel()).reshape(-1, 2)
+        keep = np.concatenate([np.arange(lo, hi) for lo, hi in bounds]) + start
+        return self.postings_docs[keep], self.postings_tf[keep]
+
+    def get_scores(self, query_tokens, ranges=None):
+        """BM25 scores; with ``ranges`` only docs in those ``[start, end)`` ranges are scored."""
+        scores = np.zeros(self.corpus_size)
+        for term in query_tokens:
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            docs, tf = self._postings(term_id, ranges)
+            scores[docs] += self.idf[term_id] * (
+                tf * (self.k1 + 1) / (tf + self.norm[docs])
+            )
+        return scores
+
+    def max_score(self, query_tokens):
+        """Upper bound of any doc's score for ``query_tokens``.
+
+        Each term contributes at most ``idf * (k1 + 1)`` (as its tf grows);
+        terms missing from the corpus count with the idf of ``df = 0``, so a
+        corpus lacking query terms does not get a smaller bound.
+        """
+        unseen = np.log(self.corpus_size + 0.5) - np.log(0.5)
+        idf = [
+            self.idf[term_id] if (term_id := self.vocab.get(term)) is not None else unseen
+            for term in query_tokens
+        ]
+        return float(sum(idf)) * (self.k1 + 1)
+
+    def top_k(self, query_tokens, k, ranges=None):
+        scores = self.get_scores(query_tokens, ranges)
+        if ranges is None:
+            candidates = None
+            k = min(k, self.corpus_size)
+        else:
+            candidates = np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+            k = min(k, len(candidates))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), scores
+        pool = scores if candidates is None else scores[candidates]
+        top = np.argpartition(-pool, k - 1)[:k]
+        if candidates is not None:
+            top = candidates[top]
+        top = top[np.lexsort((top, -scores[top]))]
+        return top, scores
+
+    def nbytes(self):
+        return sum(
+            a.nbytes
+            for a in (
+                self.postings_docs,
+                self.postings_tf,
+                self.indptr,
+                self.idf,
+                self.doc_len,
+                self.norm,
+            )
+        )
@@ -0,0 +1,252 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Bundles")
+
+BUNDLES_DIR = Path("data/bundles")
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+# Version of the indexes at the repository root, when no bundle is published.
+LOCAL_VERSION = "local"
+
+
+def load_retrieval_config() -> dict:
+    with open("configs/retrieval.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def bundle_paths(retrieval_cfg):
+    """Index artifacts of the main corpus, relative to the project root."""
+    dense = retrieval_cfg["dense"]
+    return [
+        retrieval_cfg["sparse"]["chunks_path"],
+        retrieval_cfg["sparse"]["expansion"]["path"],
+        dense["persist_directory"],
+        dense["compressed_dir"],
+        dense["embeddings_path"],
+        dense["metadata_path"],
+        retrieval_cfg["expansion"]["index_path"],
+        retrieval_cfg["topics"]["index_path"],
+        retrieval_cfg["priors"]["path"],
+    ]
+
+
+def _sha256(path, block=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _size(path):
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def current_version(bundles_dir=BUNDLES_DIR):
+    path = Path(bundles_dir) / CURRENT_FILE
+    if not path.exists():
+        return None
+    return path.read_text(encoding="utf-8").strip() or None
+
+
+def read_manifest(bundle_dir):
+    with open(Path(bundle_dir) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def publish(version, bundles_dir=BUNDLES_DIR):
+    """Point ``CURRENT`` at ``version``; running services pick it up on reload."""
+    bundles_dir = Path(bundles_dir)
+    if not (bundles_dir / version / MANIFEST_FILE).exists():
+        raise FileNotFoundError(f"No bundle {version} in {bundles_dir}")
+    tmp = bundles_dir / f".{CURRENT_FILE}.tmp"
+    tmp.write_text(version + "\n", encoding="utf-8")
+    os.replace(tmp, bundles_dir / CURRENT_FILE)
+    logger.info(f"Published index bundle {version}")
+
+
+def build_bundle(retrieval_cfg, root=".", bundles_dir=BUNDLES_DIR, version=None):
+    """Copy the current index artifacts into a new immutable bundle.
+
+    The bundle mirrors the project layout, so it is loaded like a shard
+    rooted at the bundle directory. It only becomes visible under its
+    version name once complete.
+    """
+    root, bundles_dir = Path(root), Path(bundles_dir)
+    chunks_path = root / retrieval_cfg["sparse"]["chunks_path"]
+    digest = _sha256(chunks_path)
+    version = version or f"{time.strftime('%Y%m%d-%H%M%S')}-{digest[:8]}"
+
+    tmp = bundles_dir / f".{version}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    files = {}
+    for rel in bundle_paths(retrieval_cfg):
+        src = root / rel
+        if not src.exists():
+            continue
+        dst = tmp / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if src.is_dir():
+            shutil.copytree(src, dst)
+        else:
+            shutil.copy2(src, dst)
+        files[str(rel)] = {"bytes": _size(dst)}
+
+    files[str(retrieval_cfg["sparse"]["chunks_path"])]["sha256"] = digest
+    manifest = {
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": files,
+    }
+    with open(tmp / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    os.replace(tmp, bundles_dir / version)
+    logger.info(f"Built index bundle {version} ({sum(f['bytes'] for f in files.values()) / 1e6:.1f} MB)")
+    return version
+
+
+def prune(bundles_dir=BUNDLES_DIR, keep=3):
+    """Delete all but the ``keep`` newest bundles; never the current one."""
+    bundles_dir = Path(bundles_dir)
+    current = current_version(bundles_dir)
+    bundles = sorted(
+        (p for p in bundles_dir.iterdir() if (p / MANIFEST_FILE).exists()),
+        key=lambda p: (read_manifest(p)["created"], p.name),
+        reverse=True,
+    )
+    removed = []
+    for path in bundles[keep:]:
+        if path.name != current:
+            shutil.rmtree(path)
+            removed.append(path.name)
+    return removed
+
+
+class IndexVersion:
+    """One loaded set of indexes, reference-counted by the requests using it.
+
+    Once retired by a swap, it is released when the last request holding
+    it finishes.
+    """
+
+    def __init__(self, version, hybrid, expander=None, shards=(), dense=None, on_free=None):
+        self.version = version
+        self.hybrid = hybrid
+        self.expander = expander
+        self.shards = list(shards)
+        self.dense = dense
+        self.on_free = on_free
+        self.refs = 0
+        self.retired = False
+        self.freed = False
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self.refs += 1
+
+    def release(self):
+        with self._lock:
+            self.refs -= 1
+            free = self.retired and self.refs == 0
+        if free:
+            self._free()
+
+    def retire(self):
+        with self._lock:
+            self.retired = True
+            free = self.refs == 0
+        if free:
+            self._free()
+
+    def _free(self):
+        if self.freed:
+            return
+        self.freed = True
+        # Executors, SQLite handles and HNSW memory are only released on
+        # close; dropping the references is not enough.
+        resources = [self.hybrid, self.dense, *(shard.dense for shard in self.shards)]
+        for resource in {id(r): r for r in resources}.values():
+            close = getattr(resource, "close", None)
+            if close is not None:
+                close()
+        self.hybrid = self.expander = self.dense = None
+        self.shards = []
+        if self.on_free is not None:
+            self.on_free(self)
+        logger.info(f"Released index version {self.version}")
+
+
+class VersionedIndex:
+    """Holds the current ``IndexVersion``; swapping it in is atomic."""
+
+    def __init__(self, current):
+        self.current = current
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def use(self):
+        with self._lock:
+            index = self.current
+            index.acquire()
+        try:
+            yield index
+        finally:
+            index.release()
+
+    def swap(self, index):
+        with self._lock:
+            old, self.current = self.current, index
+        old.retire()
+        return old
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and publish versioned index bundles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Bundle the current indexes and publish them")
+    build.add_argument("--version", default=None)
+    build.add_argument("--no-publish", dest="publish", action="store_false")
+    sub.add_parser("publish", help="Point CURRENT at an existing bundle").add_argument("version")
+    sub.add_parser("list", help="List bundles")
+    args = parser.parse_args()
+
+    cfg = load_retrieval_config()
+    bundles_cfg = cfg["bundles"]
+    bundles_dir = Path(bundles_cfg["dir"])
+    bundles_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.command == "build":
+        version = build_bundle(cfg, bundles_dir=bundles_dir, version=args.version)
+        if args.publish:
+            publish(version, bundles_dir)
+            removed = prune(bundles_dir, bundles_cfg["keep"])
+            if removed:
+                logger.info(f"Pruned bundles: {removed}")
+    elif args.command == "publish":
+        publish(args.version, bundles_dir)
+    else:
+        current = current_version(bundles_dir)
+        for path in sorted(p for p in bundles_dir.iterdir() if (p / MANIFEST_FILE).exists()):
+            marker = "*" if path.name == current else " "
+            print(f"{marker} {path.name}  {read_manifest(path)['created']}")
+
+
+if __name__ == "__main__":
+    main()
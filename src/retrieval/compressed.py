@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+
+from src.embeddings.compress import CompressedVectors, shortlist_and_rescore
+
+
+class CompressedDenseRetriever:
+    """Dense retrieval over compressed vectors with full-precision rescoring.
+
+    Drop-in for ``DenseRetriever``: a brute-force pass over the int8/float16
+    codes shortlists ``top_k * rescore_factor`` chunks, which are rescored
+    against the memory-mapped float32 matrix. Only the shortlisted rows of
+    that matrix are ever read, so it does not need to stay resident.
+    """
+
+    def __init__(self, compressed, full, texts, metadatas, rescore_factor=4, space="l2"):
+        self.compressed = compressed
+        self.full = full
+        self.texts = texts
+        self.metadatas = metadatas
+        self.rescore_factor = rescore_factor
+        self.space = space
+
+    @classmethod
+    def from_config(cls, dense_cfg, texts):
+        with open(dense_cfg["metadata_path"], "r", encoding="utf-8") as f:
+            metadatas = json.load(f)
+        return cls(
+            CompressedVectors.load(dense_cfg["compressed_dir"]),
+            np.load(dense_cfg["embeddings_path"], mmap_mode="r"),
+            texts,
+            metadatas,
+            rescore_factor=dense_cfg.get("rescore_factor", 4),
+            space=dense_cfg.get("space", "l2"),
+        )
+
+    def _distance(self, similarity):
+        # Match Chroma's distances for normalized vectors so hybrid fusion
+        # weights are unchanged when switching backends.
+        if self.space == "cosine":
+            return 1.0 - similarity
+        return 2.0 - 2.0 * similarity
+
+    def retrieve(self, query_embedding, top_k: int, scope=None):
+        rows = scope.rows() if scope is not None else None
+        idx, sims = shortlist_and_rescore(
+            self.compressed, self.full, query_embedding, top_k, self.rescore_factor, rows
+        )
+        return [
+            {
+                "id": f"id_{i}",
+                "text": self.texts[i],
+                "metadata": self.metadatas[i],
+                "score": float(self._distance(s)),
+            }
+            for i, s in zip(idx, sims)
+        ]
@@ -1,20 +1,29 @@
-import chromadb
-
-
 class DenseRetriever:
-    def __init__(self, collection):
+    def __init__(self, collection, client=None):
         self.collection = collection
+        # Chroma keeps one System per persist path until its clients close.
+        self.client = client
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+
+    def retrieve(self, query_embedding, top_k: int, scope=None):
+        kwargs = {}
+        if scope is not None:
+            kwargs["where"] = {"topic": {"$in": list(scope.topics)}}
 
-    def retrieve(self, query_embedding, top_k: int):
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=top_k,
+            **kwargs,
         )
 
         docs = []
         for i in range(len(results["documents"][0])):
             docs.append(
                 {
+                    "id": results["ids"][0][i],
                     "text": results["documents"][0][i],
                     "metadata": results["metadatas"][0][i],
                     "score": results["distances"][0][i],
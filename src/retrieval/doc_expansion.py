@@ -0,0 +1,170 @@
+import json
+import string
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from src.retrieval.bm25 import BM25Index
+from src.utils.logging import setup_logging
+
+logger = setup_logging("DocExpansion")
+
+
+def load_retrieval_config() -> dict:
+    with open("configs/retrieval.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def normalize_tokens(text):
+    """Lower-cased whitespace tokens without surrounding punctuation.
+
+    Expansion terms are bare lower-case words, so the expanded index and its
+    queries are tokenised this way: "Heart" and "attack?" must match them.
+    """
+    tokens = (token.strip(string.punctuation).lower() for token in text.split())
+    return [token for token in tokens if token]
+
+
+def expansion_tokens(terms):
+    """Expansion terms as extra BM25 tokens: each repeated ``tf`` times."""
+    return [term for term, tf in terms.items() for _ in range(tf)]
+
+
+def load_expansions(path, n_docs):
+    """Per-chunk ``{term: tf}`` dicts, aligned to chunk ids (line numbers)."""
+    expansions = [{} for _ in range(n_docs)]
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            idx = int(record["id"].removeprefix("id_"))
+            if idx < n_docs:
+                expansions[idx] = record["terms"]
+    return expansions
+
+
+class SpladeExpander:
+    """Document-side expansion terms from a SPLADE masked-LM head.
+
+    A term's weight is ``max`` over the chunk's positions of
+    ``log(1 + relu(logit))``. The ``terms`` highest-weighted whole-word
+    vocabulary entries that are not already (normalised) tokens of the
+    chunk are kept,
+    with the weight rounded to an integer term frequency, so they can be
+    appended to the chunk's BM25 tokens.
+    """
+
+    def __init__(self, model_name, terms=20, min_weight=0.5, max_length=256, batch_size=8,
+                 model=None, tokenizer=None):
+        self.model_name = model_name
+        self.terms = terms
+        self.min_weight = min_weight
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.model = model
+        self.tokenizer = tokenizer
+        self._vocab = None
+        self._word_mask = None
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(
+            cfg["model_name"],
+            terms=cfg["terms"],
+            min_weight=cfg["min_weight"],
+            max_length=cfg["max_length"],
+            batch_size=cfg["batch_size"],
+        )
+
+    def _load(self):
+        if self.model is None:
+            from transformers import AutoModelForMaskedLM, AutoTokenizer
+
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModelForMaskedLM.from_pretrained(self.model_name)
+        self.model.eval()
+
+        vocab = self.tokenizer.convert_ids_to_tokens(list(range(self.model.config.vocab_size)))
+        special = set(self.tokenizer.all_special_tokens)
+        # Whole words only: query tokens are normalised words, so word
+        # pieces ("##itis") and punctuation could never match.
+        self._vocab = vocab
+        self._word_mask = np.array(
+            [t is not None and t not in special and t.isalpha() and len(t) > 2 for t in vocab]
+        )
+
+    def weights(self, texts):
+        """``(len(texts), vocab_size)`` SPLADE term weights."""
+        import torch
+
+        if self._vocab is None:
+            self._load()
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="pt"
+        )
+        with torch.inference_mode():
+            logits = self.model(**encoded).logits
+            weights = torch.log1p(torch.relu(logits)) * encoded["attention_mask"].unsqueeze(-1)
+            weights = weights.max(dim=1).values.float().numpy()
+        weights[:, ~self._word_mask] = 0.0
+        return weights
+
+    def expand(self, texts):
+        expansions = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start : start + self.batch_size]
+            for text, row in zip(batch, self.weights(batch)):
+                tokens = set(normalize_tokens(text))
+                candidates = np.flatnonzero((row >= self.min_weight) & (row > 0))
+                terms = {}
+                for idx in candidates[np.argsort(-row[candidates], kind="stable")]:
+                    term = self._vocab[idx].lower()
+                    if term in tokens or term in terms:
+                        continue
+                    terms[term] = max(1, int(round(float(row[idx]))))
+                    if len(terms) == self.terms:
+                        break
+                expansions.append(terms)
+        return expansions
+
+
+def main():
+    cfg = load_retrieval_config()["sparse"]
+    expansion_cfg = cfg["expansion"]
+    chunks_path = Path(cfg["chunks_path"])
+    out_path = Path(expansion_cfg["path"])
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if cfg.get("backend", "bm25") != "expanded":
+        # The bundle stage depends on the file, so leave an empty one rather
+        # than loading the SPLADE model for a backend that is not used.
+        out_path.write_text("", encoding="utf-8")
+        logger.info(f"sparse.backend is not 'expanded'; wrote empty {out_path}")
+        return
+
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f]
+
+    start = time.perf_counter()
+    expansions = SpladeExpander.from_config(expansion_cfg).expand(texts)
+    seconds = time.perf_counter() - start
+
+    tmp = out_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for i, terms in enumerate(expansions):
+            f.write(json.dumps({"id": f"id_{i}", "terms": terms}) + "\n")
+    tmp.replace(out_path)
+
+    plain = BM25Index([text.split() for text in texts])
+    expanded = BM25Index([normalize_tokens(t) + expansion_tokens(e) for t, e in zip(texts, expansions)])
+    logger.info(
+        f"Expanded {len(texts)} chunks in {seconds:.1f}s: "
+        f"{np.mean([len(e) for e in expansions]):.1f} terms per chunk, "
+        f"postings {len(plain.postings_docs)} -> {len(expanded.postings_docs)}, "
+        f"index {plain.nbytes() / 1e6:.1f} -> {expanded.nbytes() / 1e6:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
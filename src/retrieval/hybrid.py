@@ -1,27 +1,76 @@
+from src.utils.metrics import METRICS
+
+
 class HybridRetriever:
-    def __init__(self, dense, sparse, alpha=0.6):
+    def __init__(self, dense, sparse, alpha=0.6, router=None, priors=None, prior_weight=0.0, min_prior=0.0):
         self.dense = dense
         self.sparse = sparse
         self.alpha = alpha
+        self.router = router
+        # Static per-chunk priors: added to the fused score, and chunks
+        # below ``min_prior`` are dropped before they reach the reranker.
+        self.priors = priors
+        self.prior_weight = prior_weight
+        self.min_prior = min_prior
+
+    def retrieve(self, query, query_embedding, dense_k, sparse_k, timings=None):
+        # Queries naming a known condition only search that topic's chunks.
+        kwargs = {}
+        if self.router is not None:
+            with METRICS.timer("route", timings):
+                scope = self.router.route(query)
+            if scope is not None:
+                kwargs["scope"] = scope
 
-    def retrieve(self, query, query_embedding, dense_k, sparse_k):
-        dense_docs = self.dense.retrieve(query_embedding, dense_k)
-        sparse_docs = self.sparse.retrieve(query, sparse_k)
+        with METRICS.timer("dense", timings):
+            dense_docs = self.dense.retrieve(query_embedding, dense_k, **kwargs)
+        with METRICS.timer("sparse", timings):
+            sparse_docs = self.sparse.retrieve(query, sparse_k, **kwargs)
 
-        return self.fuse(dense_docs, sparse_docs)
+        with METRICS.timer("fuse", timings):
+            return self.fuse(dense_docs, sparse_docs)
 
     def fuse(self, dense_docs, sparse_docs):
         scores = {}
+        sources = {}
+        # Which retrievers found each chunk; adaptive depth reads agreement.
+        found_by = {}
 
         for d in dense_docs:
             scores[d["text"]] = self.alpha * (1 - d["score"])
+            sources[d["text"]] = d
+            found_by[d["text"]] = ["dense"]
 
         for s in sparse_docs:
             if s["text"] in scores:
                 scores[s["text"]] += (1 - self.alpha) * s["score"]
+                found_by[s["text"]].append("sparse")
             else:
                 scores[s["text"]] = (1 - self.alpha) * s["score"]
+                sources[s["text"]] = s
+                found_by[s["text"]] = ["sparse"]
+
+        if self.priors is not None:
+            scores = self._apply_priors(scores, sources)
 
         fused = sorted(scores.items(), key=lambda x: x[1], reverse=True)
 
-        return [{"text": t, "score": sc} for t, sc in fused]
+        return [
+            {
+                "id": sources[t].get("id"),
+                "text": t,
+                "metadata": sources[t].get("metadata", {}),
+                "score": sc,
+                "found_by": found_by[t],
+            }
+            for t, sc in fused
+        ]
+
+    def _apply_priors(self, scores, sources):
+        adjusted = {}
+        for text, score in scores.items():
+            prior = self.priors.of(sources[text])
+            if prior >= self.min_prior:
+                adjusted[text] = score + self.prior_weight * prior
+        # Never prune everything: keep the unadjusted list instead.
+        return adjusted or scores
@@ -0,0 +1,183 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Neighbors")
+
+CHUNKS_PATH = Path("data/processed/chunks/chunks.jsonl")
+INDEX_PATH = Path("data/processed/chunks/neighbors.npz")
+
+
+def chunk_index(chunk_id) -> int:
+    # Chunk ids are "id_<line number in chunks.jsonl>".
+    return int(str(chunk_id).rsplit("_", 1)[-1])
+
+
+class NeighborIndex:
+    """Chunk position -> previous/next chunk and enclosing section span.
+
+    A section is a maximal run of consecutive chunks sharing ``pdf``,
+    ``topic`` and ``section``; pages may change inside a run because the
+    cleaner flushes its buffers at every page break.
+    """
+
+    def __init__(self, prev, next, section, section_start, section_end):
+        self.prev = prev
+        self.next = next
+        self.section = section
+        self.section_start = section_start
+        self.section_end = section_end  # exclusive
+
+    @classmethod
+    def build(cls, metadatas):
+        n = len(metadatas)
+        section = np.zeros(n, dtype=np.int32)
+        starts = []
+
+        key = None
+        for i, meta in enumerate(metadatas):
+            current = (meta.get("pdf"), meta.get("topic"), meta.get("section"))
+            if current != key:
+                starts.append(i)
+                key = current
+            section[i] = len(starts) - 1
+
+        section_start = np.asarray(starts, dtype=np.int32)
+        section_end = np.append(section_start[1:], n).astype(np.int32)
+
+        positions = np.arange(n, dtype=np.int32)
+        first = section_start[section] == positions
+        last = section_end[section] - 1 == positions
+        prev = np.where(first, -1, positions - 1).astype(np.int32)
+        next = np.where(last, -1, positions + 1).astype(np.int32)
+
+        return cls(prev, next, section, section_start, section_end)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        data = np.load(path)
+        return cls(data["prev"], data["next"], data["section"], data["section_start"], data["section_end"])
+
+    def save(self, path=INDEX_PATH):
+        np.savez(
+            path,
+            prev=self.prev,
+            next=self.next,
+            section=self.section,
+            section_start=self.section_start,
+            section_end=self.section_end,
+        )
+
+    def span(self, i, window=1, max_section_chunks=4):
+        """Chunk range ``[start, end)`` to show for a hit on chunk ``i``."""
+        sec = self.section[i]
+        start, end = int(self.section_start[sec]), int(self.section_end[sec])
+        if end - start <= max_section_chunks:
+            return start, end
+        return max(start, i - window), min(end, i + window + 1)
+
+
+def join_chunks(texts, min_overlap=20, max_overlap=300):
+    """Concatenate consecutive chunks, dropping the splitter's overlap."""
+    merged = texts[0]
+    for text in texts[1:]:
+        cut = 0
+        for size in range(min(len(merged), len(text), max_overlap), min_overlap - 1, -1):
+            if merged.endswith(text[:size]):
+                cut = size
+                break
+        merged = merged + (text[cut:] if cut else " " + text)
+    return merged
+
+
+class NeighborExpander:
+    """Expands reranked chunks into neighbouring / whole-section context.
+
+    Expansions of hits in the same section that overlap or touch are merged
+    into one doc, ranked by its best hit, so no text is sent twice.
+    """
+
+    def __init__(self, index, texts, window=1, max_section_chunks=4, max_overlap=300):
+        self.index = index
+        self.texts = texts
+        self.window = window
+        self.max_section_chunks = max_section_chunks
+        self.max_overlap = max_overlap
+
+    def expand(self, docs):
+        spans = []  # [start, end, rank of best hit, best hit doc]
+        passthrough = []
+        for rank, doc in enumerate(docs):
+            if doc.get("id") is None:
+                passthrough.append((rank, doc))
+                continue
+            i = chunk_index(doc["id"])
+            start, end = self.index.span(i, self.window, self.max_section_chunks)
+            spans.append([start, end, rank, doc])
+
+        # Spans only merge inside a section, and sections are contiguous, so
+        # sorting by start and merging touching ranges is enough.
+        spans.sort(key=lambda s: s[0])
+        merged = []
+        for span in spans:
+            prev = merged[-1] if merged else None
+            if (
+                prev is not None
+                and span[0] <= prev[1]
+                and self.index.section[span[0]] == self.index.section[prev[0]]
+            ):
+                prev[1] = max(prev[1], span[1])
+                if span[2] < prev[2]:
+                    prev[2], prev[3] = span[2], span[3]
+            else:
+                merged.append(list(span))
+
+        expanded = [
+            (
+                rank,
+                {
+                    **doc,
+                    "text": join_chunks(self.texts[start:end], max_overlap=self.max_overlap),
+                    "chunk_ids": [f"id_{j}" for j in range(start, end)],
+                },
+            )
+            for start, end, rank, doc in merged
+        ]
+        expanded += passthrough
+        expanded.sort(key=lambda x: x[0])
+        return [doc for _, doc in expanded]
+
+    @classmethod
+    def from_config(cls, cfg, texts):
+        path = Path(cfg.get("index_path", INDEX_PATH))
+        if not path.exists():
+            logger.warning(f"Neighbor index not found at {path}; chunk expansion disabled")
+            return None
+        return cls(
+            NeighborIndex.load(path),
+            texts,
+            window=cfg["window"],
+            max_section_chunks=cfg["max_section_chunks"],
+        )
+
+
+def build_neighbor_index(chunks_path=CHUNKS_PATH, out_path=INDEX_PATH):
+    metadatas = []
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        for line in f:
+            metadatas.append(json.loads(line)["metadata"])
+
+    index = NeighborIndex.build(metadatas)
+    index.save(out_path)
+    logger.info(
+        f"Saved neighbor index for {len(metadatas)} chunks in "
+        f"{len(index.section_start)} sections to {out_path}"
+    )
+    return index
+
+
+if __name__ == "__main__":
+    build_neighbor_index()
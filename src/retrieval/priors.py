@@ -0,0 +1,140 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from src.retrieval.neighbors import chunk_index
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Priors")
+
+CHUNKS_PATH = Path("data/processed/chunks/chunks.jsonl")
+EMBEDDINGS_PATH = Path("data/embeddings/embeddings.npy")
+PRIORS_PATH = Path("data/embeddings/priors.npz")
+
+COMPONENTS = ("section", "length", "dup", "centrality")
+
+
+def load_priors_config() -> dict:
+    with open("configs/priors.yaml", "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def section_prior(metadatas, weights, default=0.5):
+    return np.array(
+        [weights.get(m.get("section"), default) for m in metadatas], dtype=np.float32
+    )
+
+
+def length_prior(texts, target_chars=400):
+    # Saturates at ``target_chars``: only fragments are penalised.
+    lengths = np.array([len(t) for t in texts], dtype=np.float32)
+    return np.minimum(1.0, lengths / target_chars)
+
+
+def dup_prior(metadatas):
+    # Text repeated across many pages (resources lists, boilerplate) is
+    # rarely the answer; a unique chunk scores 1.
+    counts = np.array([m.get("dup_count", 1) for m in metadatas], dtype=np.float32)
+    return 1.0 / (1.0 + np.log(np.maximum(counts, 1.0)))
+
+
+def centrality_prior(metadatas, embeddings):
+    """Cosine of each chunk to its topic centroid, mapped to [0, 1]."""
+    out = np.ones(len(metadatas), dtype=np.float32)
+    if embeddings is None:
+        return out
+
+    topics = {}
+    for i, meta in enumerate(metadatas):
+        topics.setdefault(meta.get("topic"), []).append(i)
+
+    for topic, rows in topics.items():
+        if topic is None or len(rows) < 2:
+            continue
+        vectors = np.asarray(embeddings[rows], dtype=np.float32)
+        centroid = vectors.mean(axis=0)
+        norm = np.linalg.norm(centroid)
+        if norm == 0:
+            continue
+        out[rows] = np.clip((vectors @ (centroid / norm) + 1.0) / 2.0, 0.0, 1.0)
+    return out
+
+
+class ChunkPriors:
+    """Query-independent prior per chunk, aligned to chunk ids.
+
+    ``prior`` is a weighted mean of the components in [0, 1]; the
+    components are kept for inspection.
+    """
+
+    def __init__(self, prior, components=None):
+        self.prior = prior
+        self.components = components or {}
+
+    @classmethod
+    def compute(cls, metadatas, texts, cfg, embeddings=None):
+        components = {
+            "section": section_prior(metadatas, cfg["section_weights"], cfg["default_section_weight"]),
+            "length": length_prior(texts, cfg["target_chars"]),
+            "dup": dup_prior(metadatas),
+            "centrality": centrality_prior(metadatas, embeddings),
+        }
+        weights = cfg["weights"]
+        total = sum(weights[name] for name in COMPONENTS)
+        prior = sum(weights[name] * components[name] for name in COMPONENTS) / total
+        return cls(prior.astype(np.float32), components)
+
+    def __len__(self):
+        return len(self.prior)
+
+    def of(self, doc, default=1.0):
+        if doc.get("id") is None:
+            return default
+        i = chunk_index(doc["id"])
+        return float(self.prior[i]) if i < len(self.prior) else default
+
+    def save(self, path=PRIORS_PATH):
+        np.savez(path, prior=self.prior, **{k: v.astype(np.float16) for k, v in self.components.items()})
+
+    @classmethod
+    def load(cls, path=PRIORS_PATH):
+        data = np.load(path)
+        return cls(data["prior"], {k: data[k] for k in COMPONENTS if k in data})
+
+    @classmethod
+    def from_config(cls, cfg, root="."):
+        if not cfg["enabled"]:
+            return None
+        path = Path(root) / cfg.get("path", PRIORS_PATH)
+        if not path.exists():
+            logger.warning(f"Chunk priors not found at {path}; priors disabled")
+            return None
+        return cls.load(path)
+
+
+def build_priors(chunks_path=CHUNKS_PATH, embeddings_path=EMBEDDINGS_PATH, out_path=PRIORS_PATH):
+    cfg = load_priors_config()
+    texts, metadatas = [], []
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            texts.append(record["text"])
+            metadatas.append(record["metadata"])
+
+    embeddings = None
+    if Path(embeddings_path).exists():
+        embeddings = np.load(embeddings_path, mmap_mode="r")
+
+    priors = ChunkPriors.compute(metadatas, texts, cfg, embeddings)
+    priors.save(out_path)
+    logger.info(
+        f"Saved priors for {len(priors)} chunks to {out_path} "
+        f"(mean {priors.prior.mean():.3f}, min {priors.prior.min():.3f})"
+    )
+    return priors
+
+
+if __name__ == "__main__":
+    build_priors()
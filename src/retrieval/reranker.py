@@ -1,11 +1,17 @@
-from sentence_transformers import CrossEncoder
-
-
 class Reranker:
-    def __init__(self, model_name):
-        self.model = CrossEncoder(model_name)
+    def __init__(self, model_name, model=None):
+        # ``model`` lets benchmarks plug in any object with a CrossEncoder-style
+        # ``predict(pairs)`` instead of loading the real cross-encoder.
+        if model is None:
+            from sentence_transformers import CrossEncoder
+
+            model = CrossEncoder(model_name)
+        self.model = model
 
     def rerank(self, query, docs, top_k):
+        if not docs:
+            return []
+
         pairs = [(query, d["text"]) for d in docs]
         scores = self.model.predict(pairs)
 
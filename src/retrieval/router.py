@@ -0,0 +1,113 @@
+import difflib
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.cleaning.topics import INDEX_PATH, normalize_topic
+from src.utils.logging import setup_logging
+from src.utils.matcher import KeywordMatcher
+
+logger = setup_logging("TopicRouter")
+
+
+class TopicScope:
+    """Topics a query was narrowed to, with their chunk ranges."""
+
+    def __init__(self, topics, ranges):
+        self.topics = topics
+        self.ranges = ranges
+        self._rows = None
+
+    def rows(self):
+        """Chunk positions in scope, ascending."""
+        if self._rows is None:
+            self._rows = np.concatenate(
+                [np.arange(start, end) for start, end in sorted(self.ranges)]
+            ) if self.ranges else np.zeros(0, dtype=np.int64)
+        return self._rows
+
+    def __len__(self):
+        return sum(end - start for start, end in self.ranges)
+
+
+class TopicRouter:
+    """Maps the conditions named in a query to topic chunk ranges.
+
+    Aliases are matched exactly in one Aho-Corasick pass over the normalized
+    query. When nothing matches and ``fuzzy`` is on, query n-grams are
+    compared to aliases with the same word count and first letter, which
+    catches most misspellings ("diabetis"). Queries matching no topic, or
+    more than ``max_topics``, are not narrowed.
+    """
+
+    def __init__(self, index, fuzzy=False, fuzzy_cutoff=0.88, min_fuzzy_chars=6, max_topics=5):
+        self.topics = index["topics"]
+        self.aliases = index["aliases"]
+        self.fuzzy = fuzzy
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.min_fuzzy_chars = min_fuzzy_chars
+        self.max_topics = max_topics
+        self.matcher = KeywordMatcher(self.aliases)
+
+        self.buckets = {}
+        self.max_words = 1
+        for alias in self.aliases:
+            words = len(alias.split())
+            self.max_words = max(self.max_words, words)
+            self.buckets.setdefault((words, alias[0]), []).append(alias)
+
+    @classmethod
+    def from_config(cls, cfg, root="."):
+        if not cfg["enabled"]:
+            return None
+        path = Path(root) / cfg.get("index_path", INDEX_PATH)
+        if not path.exists():
+            logger.warning(f"Topic index not found at {path}; topic routing disabled")
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return cls(
+            index,
+            fuzzy=cfg.get("fuzzy", False),
+            fuzzy_cutoff=cfg.get("fuzzy_cutoff", 0.88),
+            min_fuzzy_chars=cfg.get("min_fuzzy_chars", 6),
+            max_topics=cfg.get("max_topics", 5),
+        )
+
+    def _fuzzy_match(self, words):
+        found = []
+        for n in range(min(self.max_words, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                gram = " ".join(words[i:i + n])
+                if len(gram) < self.min_fuzzy_chars:
+                    continue
+                close = difflib.get_close_matches(
+                    gram, self.buckets.get((n, gram[0]), []), n=1, cutoff=self.fuzzy_cutoff
+                )
+                found.extend(close)
+        return found
+
+    def match(self, query):
+        """Aliases named in ``query``, without those inside a longer match."""
+        normalized = normalize_topic(query)
+        found = self.matcher.find(normalized)
+        if not found and self.fuzzy:
+            found = self._fuzzy_match(normalized.split())
+
+        # "anemia" inside "iron deficiency anemia" names the same condition.
+        padded = [f" {a} " for a in found]
+        return [
+            a for a in dict.fromkeys(found)
+            if not any(f" {a} " in p and p != f" {a} " for p in padded)
+        ]
+
+    def route(self, query):
+        topics = []
+        for alias in self.match(query):
+            topics.extend(self.aliases[alias])
+        topics = list(dict.fromkeys(topics))
+        if not topics or len(topics) > self.max_topics:
+            return None
+        ranges = [r for topic in topics for r in self.topics[topic]]
+        return TopicScope(topics, ranges)
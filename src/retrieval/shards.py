@@ -0,0 +1,221 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+
+from src.retrieval.hybrid import HybridRetriever
+from src.retrieval.neighbors import NeighborExpander
+from src.retrieval.priors import ChunkPriors
+from src.retrieval.router import TopicRouter
+from src.retrieval.sparse import SparseRetriever
+from src.utils.logging import setup_logging
+from src.utils.matcher import KeywordMatcher
+from src.utils.metrics import METRICS
+
+logger = setup_logging("Shards")
+
+SHARD_STAGES = ("route", "dense", "sparse", "fuse")
+
+# Extra corpora live in project-style directories built by the same pipeline.
+SHARDS_DIR = Path("data/shards")
+
+# The main corpus: the indexes at the repository root.
+MAIN_SHARD = {"name": "main", "root": "."}
+
+
+class BoundedSparse:
+    """BM25 scores divided by the query's maximum possible score in the corpus.
+
+    Raw BM25 scales with each corpus' statistics; scaled to [0, 1] they can
+    be fused with dense similarities and compared across shards.
+    """
+
+    def __init__(self, sparse):
+        self.sparse = sparse
+
+    def retrieve(self, query, top_k, **kwargs):
+        docs = self.sparse.retrieve(query, top_k, **kwargs)
+        bound = self.sparse.max_score(query) if docs else 0.0
+        if not bound:
+            return docs
+        return [{**d, "score": d["score"] / bound} for d in docs]
+
+
+class Shard:
+    """One corpus with its own dense and sparse index.
+
+    ``root`` is the corpus' project-style directory (``.`` for the main
+    corpus, ``data/shards/<name>`` for the others), so every index path in
+    the retrieval config resolves under it.
+    """
+
+    def __init__(self, name, dense=None, sparse=None, expander=None, root=".", route=None, timeout=None, collection_name=None, router=None, priors=None):
+        self.name = name
+        self.dense = dense
+        self.sparse = sparse
+        self.expander = expander
+        self.router = router
+        self.priors = priors
+        self.root = Path(root)
+        self.timeout = timeout
+        self.collection_name = collection_name
+        # Shards with route keywords are only searched when the query
+        # mentions one of them; shards without any are always searched.
+        self.matcher = KeywordMatcher(route) if route else None
+
+    @classmethod
+    def from_config(cls, shard_cfg, retrieval_cfg):
+        """Load the shard's BM25 index; dense and expander are opened later."""
+        name = shard_cfg["name"]
+        shard = cls(
+            name,
+            root=shard_cfg.get("root", SHARDS_DIR / name),
+            route=shard_cfg.get("route"),
+            timeout=shard_cfg.get("timeout"),
+            collection_name=shard_cfg.get("collection_name", retrieval_cfg["dense"]["collection_name"]),
+        )
+        shard.sparse = SparseRetriever.from_config(retrieval_cfg["sparse"], shard.root)
+        return shard
+
+    def load_expander(self, expansion_cfg):
+        if expansion_cfg["enabled"]:
+            self.expander = NeighborExpander.from_config(
+                {**expansion_cfg, "index_path": self.path(expansion_cfg["index_path"])}, self.sparse.texts
+            )
+        return self.expander
+
+    def load_router(self, topics_cfg):
+        self.router = TopicRouter.from_config(topics_cfg, self.root)
+        return self.router
+
+    def load_priors(self, priors_cfg):
+        self.priors = ChunkPriors.from_config(priors_cfg, self.root)
+        return self.priors
+
+    def path(self, relative):
+        return self.root / relative
+
+    def accepts(self, query):
+        return self.matcher is None or self.matcher.search(query)
+
+
+class ShardedRetriever:
+    """Scatter-gather hybrid retrieval over several shards.
+
+    Each routed shard runs its own ``HybridRetriever`` on a thread; results
+    arriving after the shard's timeout are dropped and the rest are merged
+    into one list. Each shard's BM25 scores are divided by the query's
+    maximum possible score in that shard before fusion, so fused scores are
+    comparable across shards and an unrelated shard's best hit stays low.
+
+    A search that timed out still holds its worker until it returns, so a
+    shard with one outstanding is skipped until it finishes: a hung shard
+    ties up at most one worker.
+    """
+
+    def __init__(self, shards, alpha=0.6, timeout=2.0, max_workers=None, prior_weight=0.0, min_prior=0.0):
+        self.shards = shards
+        self.timeout = timeout
+        self.retrievers = {
+            s.name: HybridRetriever(
+                s.dense,
+                BoundedSparse(s.sparse),
+                alpha=alpha,
+                router=s.router,
+                priors=s.priors,
+                prior_weight=prior_weight,
+                min_prior=min_prior,
+            )
+            for s in shards
+        }
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(shards), thread_name_prefix="rag-shard"
+        )
+        # Timed-out searches still running, by shard name.
+        self._stalled = {}
+        self._lock = threading.Lock()
+
+    def route(self, query):
+        shards = [s for s in self.shards if s.accepts(query)]
+        return shards or self.shards
+
+    def _search(self, shard, query, query_embedding, dense_k, sparse_k):
+        timings = {}
+        docs = self.retrievers[shard.name].retrieve(query, query_embedding, dense_k, sparse_k, timings)
+        return [{**d, "shard": shard.name} for d in docs], timings
+
+    def _available(self, shards):
+        with self._lock:
+            for name, future in list(self._stalled.items()):
+                if future.done():
+                    del self._stalled[name]
+            stalled = [s for s in shards if s.name in self._stalled]
+        for shard in stalled:
+            logger.warning(f"Shard {shard.name} still busy with a timed-out search; skipping it")
+            METRICS.observe("shard_timeout", 0.0)
+        return [s for s in shards if s not in stalled]
+
+    def retrieve(self, query, query_embedding, dense_k, sparse_k, timings=None):
+        start = time.perf_counter()
+        shards = self._available(self.route(query))
+        futures = [
+            (s, self.executor.submit(self._search, s, query, query_embedding, dense_k, sparse_k))
+            for s in shards
+        ]
+
+        merged = []
+        shard_timings = []
+        for shard, future in futures:
+            deadline = start + (shard.timeout or self.timeout)
+            try:
+                docs, stage_timings = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+            except FutureTimeout:
+                if not future.cancel():
+                    with self._lock:
+                        self._stalled[shard.name] = future
+                logger.warning(f"Shard {shard.name} timed out; merging without it")
+                METRICS.observe("shard_timeout", time.perf_counter() - start)
+                continue
+            merged.extend(docs)
+            shard_timings.append(stage_timings)
+
+        with METRICS.timer("merge", timings):
+            merged.sort(key=lambda d: d["score"], reverse=True)
+            merged = merged[: dense_k + sparse_k]
+
+        if timings is not None:
+            # Shards run concurrently, so the slowest one is what the request waited for.
+            for stage in SHARD_STAGES:
+                timings[stage] = max((t.get(stage, 0.0) for t in shard_timings), default=0.0)
+        return merged
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ShardedExpander:
+    """Routes each doc to the neighbor expander of the shard it came from."""
+
+    def __init__(self, shards):
+        self.expanders = {s.name: s.expander for s in shards if s.expander is not None}
+
+    def expand(self, docs):
+        by_shard = {}
+        passthrough = []
+        for rank, doc in enumerate(docs):
+            if doc.get("shard") in self.expanders:
+                by_shard.setdefault(doc["shard"], []).append((rank, doc))
+            else:
+                passthrough.append((rank, doc))
+
+        expanded = list(passthrough)
+        for name, ranked in by_shard.items():
+            # An expanded doc carries the id of its best hit.
+            ranks = {}
+            for rank, doc in ranked:
+                ranks.setdefault(doc.get("id"), rank)
+            for doc in self.expanders[name].expand([doc for _, doc in ranked]):
+                expanded.append((ranks.get(doc.get("id"), len(docs)), doc))
+
+        expanded.sort(key=lambda x: x[0])
+        return [doc for _, doc in expanded]
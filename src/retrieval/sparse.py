@@ -1,33 +1,87 @@
 import json
 from pathlib import Path
-from rank_bm25 import BM25Okapi
+
+from src.retrieval.bm25 import BM25Index
+from src.retrieval.doc_expansion import expansion_tokens, load_expansions, normalize_tokens
+from src.utils.logging import setup_logging
+
+logger = setup_logging("SparseRetriever")
+
+BACKENDS = ("bm25", "expanded")
 
 
 class SparseRetriever:
-    def __init__(self, chunks_path="data/processed/chunks/chunks.jsonl"):
-        self.texts = []
-        with open(chunks_path, "r", encoding="utf-8") as f:
-            for line in f:
-                self.texts.append(json.loads(line)["text"])
-
-        tokenized = [doc.split() for doc in self.texts]
-        self.bm25 = BM25Okapi(tokenized)
-
-    def retrieve(self, query: str, top_k: int):
-        scores = self.bm25.get_scores(query.split())
-        ranked = sorted(
-            zip(self.texts, scores),
-            key=lambda x: x[1],
-            reverse=True
-        )[:top_k]
+    """BM25 over whitespace tokens.
+
+    With ``expansion_path`` each chunk is indexed with its document-side
+    expansion terms (``python -m src.retrieval.doc_expansion``) appended,
+    in the same inverted index, so queries still only read postings. Chunks
+    and queries are then tokenised with ``normalize_tokens`` to match the
+    lower-case expansion terms.
+    """
+
+    def __init__(self, chunks_path="data/processed/chunks/chunks.jsonl", texts=None, expansion_path=None):
+        self.previews = None
+        if texts is not None:
+            self.texts = list(texts)
+        else:
+            self.texts = []
+            self.previews = []
+            with open(chunks_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    self.texts.append(record["text"])
+                    self.previews.append(record.get("metadata", {}).get("preview"))
+
+        # Same ids as the Chroma collection: the chunk's line number.
+        self.ids = [f"id_{i}" for i in range(len(self.texts))]
+
+        if expansion_path is None:
+            self.tokenize = str.split
+            tokenized = [doc.split() for doc in self.texts]
+        else:
+            self.tokenize = normalize_tokens
+            expansions = load_expansions(expansion_path, len(self.texts))
+            tokenized = [
+                normalize_tokens(doc) + expansion_tokens(terms) for doc, terms in zip(self.texts, expansions)
+            ]
+        self.bm25 = BM25Index(tokenized)
+
+    @classmethod
+    def from_config(cls, sparse_cfg, root="."):
+        root = Path(root)
+        backend = sparse_cfg.get("backend", "bm25")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown sparse backend: {backend}")
+
+        expansion_path = None
+        if backend == "expanded":
+            expansion_path = root / sparse_cfg["expansion"]["path"]
+            if not expansion_path.exists():
+                logger.warning(f"No document expansion at {expansion_path}; using plain BM25")
+                expansion_path = None
+        return cls(chunks_path=root / sparse_cfg["chunks_path"], expansion_path=expansion_path)
+
+    def _metadata(self, idx):
+        if self.previews is None or self.previews[idx] is None:
+            return {}
+        return {"preview": self.previews[idx]}
+
+    def max_score(self, query: str):
+        return self.bm25.max_score(self.tokenize(query))
+
+    def retrieve(self, query: str, top_k: int, scope=None):
+        ranges = scope.ranges if scope is not None else None
+        top, scores = self.bm25.top_k(self.tokenize(query), top_k, ranges)
 
         docs = []
-        for text, score in ranked:
+        for idx in top:
             docs.append(
                 {
-                    "text": text,
-                    "metadata": {},
-                    "score": float(score),
+                    "id": self.ids[idx],
+                    "text": self.texts[idx],
+                    "metadata": self._metadata(idx),
+                    "score": float(scores[idx]),
                 }
             )
         return docs
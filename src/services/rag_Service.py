@@ -1,23 +1,45 @@
+import asyncio
+import gc
+import os
+import re
+import threading
 import yaml
 import time
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.config import Settings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+from src.embeddings.encoders import load_embedder, load_embedding_config
+from src.retrieval.adaptive import AdaptiveRetriever
+from src.retrieval.bundles import LOCAL_VERSION, IndexVersion, VersionedIndex, current_version
 from src.retrieval.dense import DenseRetriever
-from src.retrieval.sparse import SparseRetriever
 from src.retrieval.hybrid import HybridRetriever
 from src.retrieval.reranker import Reranker
+from src.retrieval.shards import MAIN_SHARD, Shard, ShardedExpander, ShardedRetriever
 
 from src.rag.chain import RagChain
-from src.rag.prompt import build_medical_prompt
-from src.rag.memory import ConversationMemory
+from src.rag.context import ContextPacker
+from src.rag.llm import AsyncLLMClient
+from src.rag.prompt import build_medical_messages, build_medical_prompt
+from src.rag.memory import SessionStore
+from src.services.warmup import touch_pages
+from src.utils.cache import LRUCache, cache_key
+from src.utils.logging import setup_logging
 
 # Phase-5
-from langsmith import traceable
-from langsmith.run_helpers import get_run_tree_context
+from src.utils.metrics import METRICS
+from src.utils.startup import timed
+from src.utils.tracing import trace, traceable
 
 
+logger = setup_logging("RagService")
+
+CITATION_RE = re.compile(r"\s*\[\d+\]")
+
+RETRIEVAL_STAGES = ("embed", "route", "dense", "sparse", "fuse", "merge", "rerank", "expand")
+
+# Caches whose entries depend on the index version (keyed by it).
+VERSIONED_CACHES = ("retrieval", "rerank", "answer")
+
 
 class RagService:
     _instance = None
@@ -26,49 +48,439 @@ class RagService:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialize()
+        elif cls._instance._pid != os.getpid():
+            # Instance inherited from a preloading parent: keep the shared
+            # read-only assets, rebuild everything that cannot cross a fork.
+            cls._instance._init_process_state()
         return cls._instance
 
-    def _initialize(self):
-        with open("configs/retrieval.yaml") as f:
-            self.retrieval_cfg = yaml.safe_load(f)
+    @classmethod
+    def preload(cls):
+        """Load read-only assets in the current (parent) process before forking.
 
-        with open("configs/guardrails.yaml") as f:
-            self.guardrail_cfg = yaml.safe_load(f)
+        Workers forked afterwards get the models, BM25 arrays and chunk text
+        copy-on-write and only build their per-process state on first use.
+        No inference runs here, so no torch/OpenMP thread pools exist at fork.
+        """
+        if cls._instance is None:
+            instance = super().__new__(cls)
+            instance._pid = None
+            instance._load_assets()
+            cls._instance = instance
+
+        # Move everything allocated so far out of the collector's reach so
+        # GC passes in the workers do not write to (and un-share) those pages.
+        gc.collect()
+        gc.freeze()
+        return cls._instance
 
-        self.embedder = SentenceTransformer(
-            "sentence-transformers/all-MiniLM-L6-v2"
+    @classmethod
+    def from_components(cls, retrieval_cfg, guardrail_cfg, embedder, dense, sparse, reranker, expander=None):
+        """Build a standalone (non-singleton) service around given components.
+
+        Used by benchmarks and load tests to run the real request path over a
+        synthetic corpus, stub models or a stub LLM server.
+        """
+        service = object.__new__(cls)
+        service.init_timings = {}
+        service.retrieval_cfg = retrieval_cfg
+        service.guardrail_cfg = guardrail_cfg
+        service.embedder = embedder
+        service.reranker = reranker
+        service._init_runtime(
+            service._build_index(LOCAL_VERSION, [], dense=dense, sparse=sparse, expander=expander)
         )
+        return service
+
+    def _initialize(self):
+        self._load_assets()
+        self._init_process_state()
+
+    def _load_assets(self):
+        # Per-component wall time, reported by the startup profile command.
+        self.init_timings = {}
+
+        with timed(self.init_timings, "configs"):
+            with open("configs/retrieval.yaml") as f:
+                self.retrieval_cfg = yaml.safe_load(f)
+
+            with open("configs/guardrails.yaml") as f:
+                self.guardrail_cfg = yaml.safe_load(f)
+
+        with timed(self.init_timings, "embedder"):
+            self.embedder = load_embedder(load_embedding_config())
+
+        with timed(self.init_timings, "reranker"):
+            self.reranker = Reranker(
+                self.retrieval_cfg["reranker"]["model_name"]
+            )
+
+        self.version, root = self._bundle_root()
+        self.shards = self._load_shards(root, self.init_timings)
+
+    def _bundle_root(self, version=None):
+        """Version and root of the main corpus' indexes.
+
+        The published bundle when bundles are enabled and one exists,
+        otherwise the indexes at the repository root.
+        """
+        bundles_cfg = self.retrieval_cfg.get("bundles", {})
+        if bundles_cfg.get("enabled"):
+            version = version or current_version(bundles_cfg["dir"])
+            if version is not None:
+                return version, Path(bundles_cfg["dir"]) / version
+        return LOCAL_VERSION, Path(MAIN_SHARD["root"])
+
+    def _load_shards(self, root, timings):
+        with timed(timings, "sparse_index"):
+            # The main corpus first, then any extra corpora, each with its
+            # own indexes under its shard directory.
+            shards = [
+                Shard.from_config(shard_cfg, self.retrieval_cfg)
+                for shard_cfg in [{**MAIN_SHARD, "root": root}] + self.retrieval_cfg["shards"]["corpora"]
+            ]
+
+        with timed(timings, "neighbor_index"):
+            for shard in shards:
+                shard.load_expander(self.retrieval_cfg["expansion"])
+
+        with timed(timings, "topic_index"):
+            for shard in shards:
+                shard.load_router(self.retrieval_cfg["topics"])
+
+        with timed(timings, "priors"):
+            for shard in shards:
+                shard.load_priors(self.retrieval_cfg["priors"])
+        return shards
+
+    def _init_process_state(self):
+        # Chroma's client holds sqlite handles and threads, httpx pools hold
+        # sockets: none of these are fork-safe, so each process opens its own.
+        with timed(self.init_timings, "vector_store"):
+            for shard in self.shards:
+                shard.dense = self._open_dense(shard)
+
+        self._init_runtime(self._build_index(self.version, self.shards))
+
+    def _open_dense(self, shard):
+        dense_cfg = self.retrieval_cfg["dense"]
+        if dense_cfg.get("backend", "chroma") == "compressed":
+            # Memory-mapped int8/float16 codes: pages are shared by all
+            # workers through the page cache, no client to rebuild.
+            from src.retrieval.compressed import CompressedDenseRetriever
+
+            paths = ("compressed_dir", "embeddings_path", "metadata_path")
+            return CompressedDenseRetriever.from_config(
+                {**dense_cfg, **{key: shard.path(dense_cfg[key]) for key in paths}},
+                shard.sparse.texts,
+            )
+
+        import chromadb
+        from chromadb.config import Settings
 
         client = chromadb.PersistentClient(
-            path=self.retrieval_cfg["dense"]["persist_directory"],
+            path=str(shard.path(dense_cfg["persist_directory"])),
             settings=Settings(anonymized_telemetry=False),
         )
 
-        collection = client.get_collection(
-            name=self.retrieval_cfg["dense"]["collection_name"]
-        )
+        collection = client.get_collection(name=shard.collection_name)
+        return DenseRetriever(collection, client)
+
+    def _build_index(self, version, shards, dense=None, sparse=None, expander=None):
+        if shards:
+            dense, sparse, expander = shards[0].dense, shards[0].sparse, shards[0].expander
+
+        priors_cfg = self.retrieval_cfg["priors"]
+        if len(shards) > 1:
+            # Scatter-gather over every routed corpus, merged on fused score.
+            shards_cfg = self.retrieval_cfg["shards"]
+            hybrid = ShardedRetriever(
+                shards,
+                alpha=self.retrieval_cfg["hybrid"]["alpha"],
+                timeout=shards_cfg["timeout"],
+                max_workers=shards_cfg.get("max_workers"),
+                prior_weight=priors_cfg["weight"],
+                min_prior=priors_cfg["min_prior"],
+            )
+            if any(shard.expander is not None for shard in shards):
+                expander = ShardedExpander(shards)
+        else:
+            hybrid = HybridRetriever(
+                dense,
+                sparse,
+                alpha=self.retrieval_cfg["hybrid"]["alpha"],
+                router=shards[0].router if shards else None,
+                priors=shards[0].priors if shards else None,
+                prior_weight=priors_cfg["weight"],
+                min_prior=priors_cfg["min_prior"],
+            )
 
-        self.dense = DenseRetriever(collection)
-        self.sparse = SparseRetriever()
+        # Shallow first pass per request, widened only for ambiguous heads.
+        adaptive_cfg = self.retrieval_cfg.get("adaptive", {})
+        if adaptive_cfg.get("enabled"):
+            hybrid = AdaptiveRetriever.from_config(hybrid, adaptive_cfg)
 
-        self.hybrid = HybridRetriever(
-            self.dense,
-            self.sparse,
-            alpha=self.retrieval_cfg["hybrid"]["alpha"],
-        )
+        return IndexVersion(version, hybrid, expander, shards, dense, on_free=self._evict_version)
 
-        self.reranker = Reranker(
-            self.retrieval_cfg["reranker"]["model_name"]
-        )
+    def _init_runtime(self, index):
+        # Requests pin the version they start on; reload() swaps in the next.
+        self.indexes = VersionedIndex(index)
+        self._reload_lock = threading.Lock()
+        self._failed_version = None
+
+        self.packer = ContextPacker.from_config(self.retrieval_cfg["context"])
 
-        self.memory = ConversationMemory()
+        # Per-session histories, bounded by count, idle TTL and bytes.
+        self.memory = SessionStore.from_config(self.retrieval_cfg["memory"])
+
+        # Per-process result caches keyed by normalised query text: embedding,
+        # retrieval, rerank and (stateless requests only) the final answer.
+        self.caches = {
+            name: LRUCache.from_config(cache_cfg)
+            for name, cache_cfg in self.retrieval_cfg.get("cache", {}).items()
+            if cache_cfg["max_size"] > 0
+        }
 
         self.chain = RagChain(
             model=self.retrieval_cfg["llm"]["model"],
             temperature=self.retrieval_cfg["llm"]["temperature"],
             guardrail_cfg=self.guardrail_cfg,
+            llm_client=AsyncLLMClient.from_config(self.retrieval_cfg["llm"]),
+            keep_alive=self.retrieval_cfg["llm"].get("keep_alive"),
+            options=self.retrieval_cfg["llm"].get("options"),
+        )
+
+        # "messages": static system message + append-only history, so
+        # follow-ups reuse the server's prompt cache. "single": one user
+        # message with everything inlined.
+        self.prompt_layout = self.retrieval_cfg["llm"].get("prompt_layout", "single")
+
+        # Bounded pool for the CPU-bound stages of the async path, so that
+        # embedding and reranking never run on the event loop thread.
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.retrieval_cfg["executor"]["max_workers"],
+            thread_name_prefix="rag-cpu",
         )
 
+        # Per-stage slots so a burst of requests cannot monopolise the pool
+        # with one kind of work. LLM slots live in the AsyncLLMClient.
+        stage_limits = self.retrieval_cfg["executor"]["stage_limits"]
+        self.stage_limits = {
+            "embed": asyncio.Semaphore(stage_limits["embed"]),
+            "retrieve": asyncio.Semaphore(stage_limits["retrieve"]),
+            "rerank": asyncio.Semaphore(stage_limits["rerank"]),
+        }
+
+        self._pid = os.getpid()
+
+    def warm_up(self):
+        # Run each model once so lazy kernel/thread-pool setup is not paid by
+        # the first real request.
+        with timed(self.init_timings, "warm_up"):
+            embedding = self.embedder.encode("warm up", normalize_embeddings=True)
+            self.reranker.rerank("warm up", [{"text": "warm up"}], 1)
+        return embedding
+
+    def cache_stats(self):
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+    def index_version(self):
+        return self.indexes.current.version
+
+    def mapped_arrays(self, index=None):
+        """Memory-mapped index arrays, for warm-up to fault their pages in."""
+        index = index or self.indexes.current
+        denses = [shard.dense for shard in index.shards] or [index.dense]
+        for dense in denses:
+            compressed = getattr(dense, "compressed", None)
+            if compressed is not None:
+                yield compressed.codes
+                yield dense.full
+
+    def reload(self, version=None):
+        """Load an index bundle and swap it in atomically.
+
+        Runs in the calling thread while requests keep being served. Requests
+        that already started retrieving finish on the old version, which is
+        released when the last of them is done. Returns the new version, or
+        None if ``version`` (default: the published one) is already current.
+        """
+        with self._reload_lock:
+            version, root = self._bundle_root(version)
+            if version in (self.indexes.current.version, self._failed_version):
+                return None
+
+            timings = {}
+            try:
+                shards = self._load_shards(root, timings)
+                with timed(timings, "vector_store"):
+                    for shard in shards:
+                        shard.dense = self._open_dense(shard)
+                index = self._build_index(version, shards)
+            except Exception:
+                # Keep serving the current version; do not retry this one.
+                self._failed_version = version
+                logger.exception(f"Failed to load index version {version}")
+                raise
+
+            with timed(timings, "prewarm"):
+                warmed = self._prewarm(index)
+
+            old = self.indexes.swap(index)
+            self._evict_version(old)
+
+        logger.info(
+            f"Swapped index version {old.version} -> {version} "
+            f"({warmed} queries prewarmed), timings: {timings}"
+        )
+        return version
+
+    def _prewarm(self, index):
+        """Fault in the new version's pages and re-run recent retrievals on it.
+
+        So the first requests after a swap neither page in the index nor miss
+        the retrieval cache.
+        """
+        for array in self.mapped_arrays(index):
+            touch_pages(array)
+
+        retrieval = self.caches.get("retrieval")
+        embedding = self.caches.get("embedding")
+        if retrieval is None or embedding is None:
+            return 0
+
+        current = self.indexes.current.version
+        limit = self.retrieval_cfg["bundles"].get("prewarm", 0)
+        warmed = 0
+        for version, key in retrieval.keys():
+            if warmed >= limit:
+                break
+            entry = retrieval.peek((version, key))
+            query_embedding = embedding.peek(key)
+            if version != current or entry is None or query_embedding is None:
+                continue
+            # The original text, not the normalised key: BM25 tokens are case-sensitive.
+            query = entry[0]
+            retrieval.put((index.version, key), (query, self._search(query, query_embedding, None, index)))
+            warmed += 1
+        return warmed
+
+    def _evict_version(self, index):
+        for name in VERSIONED_CACHES:
+            if name in self.caches:
+                self.caches[name].evict(lambda key: key[0] == index.version)
+
+    def _cached(self, name, query, compute, *args, version=None):
+        cache = self.caches.get(name)
+        if cache is None:
+            return compute(query, *args)
+        key = cache_key(query) if version is None else (version, cache_key(query))
+        value = cache.get(key)
+        if value is None:
+            value = compute(query, *args)
+            self._put(cache, key, value, version)
+        return value
+
+    def _put(self, cache, key, value, version=None):
+        # A request still running on a retired version must not re-insert
+        # entries that reload() already evicted.
+        if version is None:
+            cache.put(key, value)
+        elif version == self.indexes.current.version:
+            cache.put(key, value)
+            if version != self.indexes.current.version:
+                cache.evict(lambda k: k == key)
+
+    def _embed(self, query, timings=None):
+        return self._cached("embedding", query, self._encode, timings)
+
+    def _encode(self, query, timings=None):
+        with METRICS.timer("embed", timings):
+            return self.embedder.encode(
+                query,
+                normalize_embeddings=True,
+            )
+
+    def _hybrid_retrieve(self, index, query, query_embedding, timings=None):
+        _, docs = self._cached(
+            "retrieval", query, self._search_entry, query_embedding, timings, index, version=index.version
+        )
+        # Copies, so reranking never writes scores into cached docs.
+        return [dict(doc) for doc in docs]
+
+    def _search_entry(self, query, query_embedding, timings, index):
+        # Cached with the query as sent, for reload() to re-run it verbatim.
+        return query, self._search(query, query_embedding, timings, index)
+
+    def _search(self, query, query_embedding, timings, index):
+        return index.hybrid.retrieve(
+            query,
+            query_embedding,
+            self.retrieval_cfg["dense"]["top_k"],
+            self.retrieval_cfg["sparse"]["top_k"],
+            timings=timings,
+        )
+
+    def _rerank(self, index, query, docs, timings=None):
+        docs = self._cached(
+            "rerank", query, self._rerank_and_expand, docs, timings, index, version=index.version
+        )
+        return [dict(doc) for doc in docs]
+
+    def _rerank_and_expand(self, query, docs, timings, index):
+        # Fused scores already include the chunk priors, so the head of the
+        # list is what the cross-encoder would mostly keep anyway.
+        candidates = self.retrieval_cfg["reranker"].get("candidates")
+        if candidates:
+            docs = docs[:candidates]
+
+        with METRICS.timer("rerank", timings):
+            docs = self.reranker.rerank(
+                query,
+                docs,
+                self.retrieval_cfg["reranker"]["top_k"],
+            )
+
+        if index.expander is None:
+            return docs
+        # Grow the few top chunks into their neighbours/section after the
+        # cross-encoder, instead of reranking more chunks.
+        with METRICS.timer("expand", timings):
+            return index.expander.expand(docs)
+
+    def _build_prompt(self, query, docs, timings=None, session_id=None):
+        """Return the prompt plus the packed docs its citation numbers refer to."""
+        with METRICS.timer("prompt_build", timings):
+            context, docs, context_stats = self.packer.pack(query, docs)
+
+            if self.prompt_layout == "messages":
+                history = self.memory.get_messages(session_id)
+                prompt = build_medical_messages(query, context, history)
+            else:
+                history = self.memory.get_history(session_id)
+                prompt = build_medical_prompt(query, context, history)
+            return prompt, docs, context_stats
+
+    def _remember(self, session_id, query, response):
+        # Only the bare question and the model's answer: earlier context
+        # would be re-sent every turn and its [n] numbers would clash with
+        # the current context's. Refusals are guardrail text, not answers.
+        if response.refusal:
+            return
+        self.memory.add(session_id, "user", query)
+        self.memory.add(session_id, "assistant", CITATION_RE.sub("", response.answer))
+
+    def _timing(self, timings, start_ns):
+        total_time = (time.perf_counter_ns() - start_ns) / 1e9
+        METRICS.observe("request_total", total_time)
+
+        return {
+            "retrieval_time": sum(timings.get(s, 0.0) for s in RETRIEVAL_STAGES),
+            "llm_time": timings.get("llm_total", 0.0),
+            "total_time": total_time,
+            "stages": dict(timings),
+        }
+
     # def ask(self, query):
     #     start_total = time.time()
     #     start_retrieval = time.time()
@@ -114,51 +526,119 @@ class RagService:
     #         },
     #     }
 
-    @traceable(name="RAG_Request")
-    def ask(self, query: str):
-        start_total = time.time()
-
-        with get_run_tree_context().trace("retrieval"):
-            start_retrieval = time.time()
-
-            query_embedding = self.embedder.encode(
-                query,
-                normalize_embeddings=True,
-            )
-
-            docs = self.hybrid.retrieve(
-                query,
-                query_embedding,
-                self.retrieval_cfg["dense"]["top_k"],
-                self.retrieval_cfg["sparse"]["top_k"],
-            )
-
-            docs = self.reranker.rerank(
-                query,
-                docs,
-                self.retrieval_cfg["reranker"]["top_k"],
-            )
-
-            retrieval_time = time.time() - start_retrieval
+    def _cached_answer(self, query, session_id, start_ns):
+        # Only stateless requests: with a session the prompt carries history.
+        cache = self.caches.get("answer")
+        if cache is None or session_id is not None:
+            return None
+        cached = cache.get((self.indexes.current.version, cache_key(query)))
+        if cached is None:
+            return None
+        return {**cached, "timing": self._timing({}, start_ns), "cached": True}
+
+    def _result(self, version, query, session_id, response, timings, start_ns, context_stats):
+        result = {
+            "response": response.to_dict(),
+            "timing": self._timing(timings, start_ns),
+            "context": context_stats,
+        }
+        cache = self.caches.get("answer")
+        if cache is not None and session_id is None:
+            entry = {"response": result["response"], "context": context_stats}
+            self._put(cache, (version, cache_key(query)), entry, version)
+        return result
 
-        with get_run_tree_context().trace("prompt_building"):
-            context = "\n\n".join(
-                [f"[{i+1}] {d['text']}" for i, d in enumerate(docs)]
+    @traceable(name="RAG_Request")
+    def ask(self, query: str, session_id: str | None = None):
+        start_ns = time.perf_counter_ns()
+        cached = self._cached_answer(query, session_id, start_ns)
+        if cached is not None:
+            return cached
+        timings = {}
+
+        with trace("retrieval"), self.indexes.use() as index:
+            query_embedding = self._embed(query, timings)
+            docs = self._hybrid_retrieve(index, query, query_embedding, timings)
+            docs = self._rerank(index, query, docs, timings)
+
+        with trace("prompt_building"):
+            prompt, docs, context_stats = self._build_prompt(query, docs, timings, session_id)
+
+        with trace("llm_generation"):
+            response, _ = self.chain.generate(query, docs, prompt, timings)
+
+        self._remember(session_id, query, response)
+
+        return self._result(index.version, query, session_id, response, timings, start_ns, context_stats)
+
+    async def aclose(self):
+        await self.chain.llm_client.aclose()
+
+    async def _run_stage(self, stage, fn, *args):
+        loop = asyncio.get_running_loop()
+        async with self.stage_limits[stage]:
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def aretrieve(self, query: str, timings=None):
+        """Embed, retrieve and rerank ``query`` without calling the LLM."""
+        docs, _ = await self._aretrieve(query, {} if timings is None else timings)
+        return docs
+
+    async def _aretrieve(self, query, timings):
+        """Reranked docs plus the index version they came from."""
+        with self.indexes.use() as index:
+            query_embedding = await self._run_stage("embed", self._embed, query, timings)
+            docs = await self._run_stage(
+                "retrieve", self._hybrid_retrieve, index, query, query_embedding, timings
             )
-
-            history = self.memory.get_history()
-            prompt = build_medical_prompt(query, context, history)
-
-        with get_run_tree_context().trace("llm_generation"):
-            response, llm_time = self.chain.generate(query, docs, prompt)
-
-        total_time = time.time() - start_total
-
-        return {
-            "response": response.dict(),
-            "timing": {
-                "retrieval_time": retrieval_time,
-                "llm_time": llm_time,
-                "total_time": total_time,
-            },
+            docs = await self._run_stage("rerank", self._rerank, index, query, docs, timings)
+        return docs, index.version
+
+    @traceable(name="RAG_Request_Async")
+    async def aask(self, query: str, session_id: str | None = None):
+        start_ns = time.perf_counter_ns()
+        cached = self._cached_answer(query, session_id, start_ns)
+        if cached is not None:
+            return cached
+        timings = {}
+
+        docs, version = await self._aretrieve(query, timings)
+
+        prompt, docs, context_stats = self._build_prompt(query, docs, timings, session_id)
+
+        response, _ = await self.chain.agenerate(query, docs, prompt, timings)
+        self._remember(session_id, query, response)
+
+        return self._result(version, query, session_id, response, timings, start_ns, context_stats)
+
+    async def astream(self, query: str, session_id: str | None = None):
+        """Yield ``token`` events while generating, then one ``final`` event.
+
+        Refusals that only depend on the query and docs (emergency, no
+        context, low confidence) are decided before generation, so no tokens
+        are streamed for them. Citation checks need the full answer, so the
+        final event carries the validated response.
+        """
+        start_ns = time.perf_counter_ns()
+        cached = self._cached_answer(query, session_id, start_ns)
+        if cached is not None:
+            yield {"type": "final", **cached}
+            return
+        timings = {}
+
+        docs, version = await self._aretrieve(query, timings)
+        prompt, docs, context_stats = self._build_prompt(query, docs, timings, session_id)
+
+        tokens = []
+        if self.chain.pre_generation_refusal(query, docs) is None:
+            async for token in self.chain.astream(prompt, timings):
+                tokens.append(token)
+                yield {"type": "token", "content": token}
+
+        response = self.chain.apply_guardrails(query, docs, "".join(tokens), timings)
+        self._remember(session_id, query, response)
+
+        yield {
+            "type": "final",
+            **self._result(version, query, session_id, response, timings, start_ns, context_stats),
         }
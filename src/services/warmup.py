@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import json
+import mmap
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.utils.cache import cache_key
+from src.utils.logging import setup_logging
+
+logger = setup_logging("Warmup")
+
+
+def load_query_log(path) -> list:
+    """Queries from a JSONL (``{"query": ...}``) or plain-text log."""
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            queries.append(json.loads(line)["query"] if line.startswith("{") else line)
+    return queries
+
+
+def top_queries(queries, n):
+    """The ``n`` most frequent queries, counted after cache-key normalisation."""
+    counts = Counter()
+    first_seen = {}
+    for query in queries:
+        key = cache_key(query)
+        counts[key] += 1
+        first_seen.setdefault(key, query)
+    return [first_seen[key] for key, _ in counts.most_common(n)]
+
+
+def touch_pages(array) -> int:
+    """Read one byte per page of a memory-mapped array; returns its size."""
+    if not isinstance(array, np.memmap):
+        return 0
+    flat = np.asarray(array).reshape(-1).view(np.uint8)
+    int(flat[:: mmap.PAGESIZE].sum())
+    return flat.nbytes
+
+
+async def replay(service, queries, concurrency=4, answers=True, timeout=None):
+    """Run ``queries`` through the service, at most ``concurrency`` at a time.
+
+    With ``answers``, the full stateless request path runs and fills the
+    answer cache too; otherwise it stops after reranking.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    completed = failed = 0
+
+    async def one(query):
+        nonlocal completed, failed
+        async with semaphore:
+            try:
+                if answers:
+                    await service.aask(query)
+                else:
+                    await service.aretrieve(query)
+                completed += 1
+            except Exception as exc:
+                failed += 1
+                logger.warning(f"Warm-up query failed: {query!r}: {exc}")
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*(one(q) for q in queries)), timeout)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+        logger.warning(f"Warm-up stopped after {timeout}s")
+    return {
+        "completed": completed,
+        "failed": failed,
+        "timed_out": timed_out,
+    }
+
+
+async def warm_up_from_log(service, cfg) -> dict:
+    """Touch mapped index pages, then replay the top logged queries.
+
+    Returns the report served by ``/health/ready``: time taken, queries
+    replayed and the fill level of every cache.
+    """
+    start = time.perf_counter()
+    mapped_bytes = sum(touch_pages(a) for a in service.mapped_arrays())
+
+    try:
+        queries = top_queries(load_query_log(cfg["query_log"]), cfg["top_n"])
+    except FileNotFoundError:
+        logger.warning(f"Query log not found at {cfg['query_log']}; skipping query replay")
+        queries = []
+
+    report = await replay(
+        service,
+        queries,
+        concurrency=cfg["concurrency"],
+        answers=cfg.get("answers", True),
+        timeout=cfg.get("timeout"),
+    )
+    report.update(
+        queries=len(queries),
+        mapped_bytes=mapped_bytes,
+        seconds=round(time.perf_counter() - start, 3),
+        caches=service.cache_stats(),
+    )
+    logger.info(
+        f"Warm-up replayed {report['completed']}/{len(queries)} queries in "
+        f"{report['seconds']}s, touched {mapped_bytes / 1e6:.1f} MB, caches: "
+        + ", ".join(f"{name} {c['size']}/{c['max_size']}" for name, c in report["caches"].items())
+    )
+    return report
+
+
+async def main_async(args):
+    from src.api.app import load_serving_config
+    from src.services.rag_Service import RagService
+
+    cfg = load_serving_config()["query_warmup"]
+    for key in ("query_log", "top_n", "concurrency", "answers"):
+        if getattr(args, key) is not None:
+            cfg[key] = getattr(args, key)
+
+    service = await asyncio.to_thread(RagService)
+    await asyncio.to_thread(service.warm_up)
+    try:
+        return await warm_up_from_log(service, cfg)
+    finally:
+        await service.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay frequent logged queries to warm the RAG caches")
+    parser.add_argument("--query-log", dest="query_log", default=None)
+    parser.add_argument("--top-n", dest="top_n", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--answers", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
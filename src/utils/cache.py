@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(query: str) -> str:
+    # Case and spacing variants of a query hit the same entry.
+    return " ".join(query.lower().split())
+
+
+class LRUCache:
+    """Thread-safe LRU map bounded by entry count, with an optional TTL."""
+
+    def __init__(self, max_size, ttl_seconds=None, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cfg):
+        return cls(cfg["max_size"], cfg.get("ttl_seconds"))
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and self.ttl_seconds and self.clock() - item[1] > self.ttl_seconds:
+                del self._items[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = (value, self.clock())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def peek(self, key, default=None):
+        """Like ``get`` but without touching recency, TTL or the counters."""
+        with self._lock:
+            item = self._items.get(key)
+            return default if item is None else item[0]
+
+    def keys(self):
+        """Keys from most to least recently used."""
+        with self._lock:
+            return list(reversed(self._items))
+
+    def evict(self, predicate):
+        with self._lock:
+            stale = [key for key in self._items if predicate(key)]
+            for key in stale:
+                del self._items[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_size": self.max_size,
+            "fill": round(len(self._items) / self.max_size, 3) if self.max_size else 0.0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -1,23 +1,41 @@
 import logging
+import os
 from pathlib import Path
 
-LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
+LOG_DIR = Path(os.getenv("LOG_DIR", "logs"))
+
+FORMATTER = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+
+
+class LazyFileHandler(logging.FileHandler):
+    # Creates the log directory and opens the file on the first record, so
+    # importing a module never touches the filesystem.
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
 
 def setup_logging(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    # Repeated calls (re-imports, tests, forked workers) must not stack
+    # handlers and duplicate every line.
+    if logger.handlers:
+        return logger
 
-    console = logging.StreamHandler()
-    console.setFormatter(formatter)
-
-    file = logging.FileHandler(LOG_DIR / "app.log")
-    file.setFormatter(formatter)
+    logger.setLevel(logging.INFO)
 
+    console = logging.StreamHandler()
+    console.setFormatter(FORMATTER)
     logger.addHandler(console)
+
+    file = LazyFileHandler(LOG_DIR / "app.log")
+    file.setFormatter(FORMATTER)
     logger.addHandler(file)
+
     logger.propagate = False
 
-    return logger
\ No newline at end of file
+    return logger
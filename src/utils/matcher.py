@@ -0,0 +1,98 @@
+from collections import deque
+from typing import Iterable, List
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton matching many keywords in a single pass over the text.
+
+    Keywords and text are case-folded, so matching is case-insensitive for any
+    script. With ``word_boundary`` a match only counts when it is not glued to
+    a letter or digit on either side ("stroke" does not fire on "strokes").
+    """
+
+    def __init__(self, keywords: Iterable[str], word_boundary: bool = True):
+        self.word_boundary = word_boundary
+        self.keywords: List[str] = []
+
+        # State 0 is the root; each state has goto edges, a failure link and
+        # the keywords (by index) that end there.
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._lengths: List[int] = []
+
+        seen = set()
+        for keyword in keywords:
+            folded = keyword.casefold().strip()
+            if not folded or folded in seen:
+                continue
+            seen.add(folded)
+            self._add(folded, len(self.keywords))
+            self.keywords.append(keyword)
+            self._lengths.append(len(folded))
+
+        self._build_failure_links()
+
+    def _add(self, pattern: str, index: int):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _is_boundary(self, text: str, start: int, end: int) -> bool:
+        if start > 0 and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+    def _scan(self, text: str, first_only: bool):
+        text = text.casefold()
+        found = []
+        found_set = set()
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index in self._out[state]:
+                if index in found_set:
+                    continue
+                end = pos + 1
+                start = end - self._lengths[index]
+                if self.word_boundary and not self._is_boundary(text, start, end):
+                    continue
+                found.append(index)
+                found_set.add(index)
+                if first_only:
+                    return found
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """Return the configured keywords present in ``text``, ordered by where their first match ends."""
+        return [self.keywords[i] for i in self._scan(text, first_only=False)]
+
+    def search(self, text: str) -> bool:
+        """Return True as soon as any keyword matches."""
+        if not self.keywords:
+            return False
+        return bool(self._scan(text, first_only=True))
@@ -0,0 +1,121 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, roughly log-spaced from 1 ms to 2 minutes, which
+# covers everything from a BM25 lookup to a long LLM generation.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            if cumulative + c >= rank and c:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - cumulative) / c
+            cumulative += c
+        return self.max
+
+
+class MetricsRegistry:
+    """Process-local latency histograms keyed by pipeline stage.
+
+    Independent of LangSmith: timings are always recorded with
+    ``perf_counter_ns`` and can be scraped from ``/metrics``.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, timings: dict | None = None):
+        """Time a block into the ``stage`` histogram (and ``timings`` if given)."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            seconds = (time.perf_counter_ns() - start) / 1e9
+            self.observe(stage, seconds)
+            if timings is not None:
+                timings[stage] = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "mean": h.sum / h.count if h.count else 0.0,
+                    **{f"p{int(q * 100)}": h.quantile(q) for q in QUANTILES},
+                    "max": h.max,
+                }
+                for stage, h in sorted(self._histograms.items())
+            }
+
+    def render_prometheus(self, prefix: str = "rag") -> str:
+        name = f"{prefix}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Latency of each RAG pipeline stage.",
+            f"# TYPE {name} histogram",
+        ]
+        quantile_lines = [
+            f"# HELP {name}_quantile Estimated latency quantiles per stage.",
+            f"# TYPE {name}_quantile gauge",
+        ]
+
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, c in zip(self.buckets, h.counts):
+                    cumulative += c
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+                for q in QUANTILES:
+                    quantile_lines.append(
+                        f'{name}_quantile{{stage="{stage}",quantile="{q}"}} {h.quantile(q)}'
+                    )
+
+        return "\n".join(lines + quantile_lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,47 @@
+import os
+import resource
+from pathlib import Path
+
+
+def memory_usage(pid: int | None = None) -> dict:
+    """RSS/PSS breakdown in MB for a process (Linux only, empty elsewhere).
+
+    RSS counts shared pages in full for every process; PSS splits them
+    between sharers, so summing PSS across forked workers gives the real
+    footprint of a worker pool.
+    """
+    path = Path(f"/proc/{pid or 'self'}/smaps_rollup")
+    if not path.exists():
+        return {}
+
+    fields = {
+        "Rss": "rss_mb",
+        "Pss": "pss_mb",
+        "Shared_Clean": "shared_clean_mb",
+        "Shared_Dirty": "shared_dirty_mb",
+        "Private_Clean": "private_clean_mb",
+        "Private_Dirty": "private_dirty_mb",
+    }
+    usage = {}
+    with open(path, "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in fields:
+                usage[fields[key]] = round(int(rest.split()[0]) / 1024, 1)
+    return usage
+
+
+def cpu_seconds() -> float:
+    ru = resource.getrusage(resource.RUSAGE_SELF)
+    return ru.ru_utime + ru.ru_stime
+
+
+def process_cpu_seconds(pid: int) -> float | None:
+    """User+system CPU seconds of another process, from /proc (Linux only)."""
+    path = Path(f"/proc/{pid}/stat")
+    if not path.exists():
+        return None
+    # The command name may contain spaces; fields after it are space separated.
+    fields = path.read_text().rsplit(")", 1)[1].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    return (int(fields[11]) + int(fields[12])) / ticks
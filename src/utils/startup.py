@@ -0,0 +1,22 @@
+import time
+from contextlib import contextmanager
+
+# Third-party modules that dominate cold start on the serving path. Serving
+# modules import them lazily, on first use.
+HEAVY_MODULES = [
+    "sentence_transformers",
+    "onnxruntime",
+    "chromadb",
+    "langsmith",
+    "ollama",
+    "rank_bm25",
+]
+
+
+@contextmanager
+def timed(timings: dict, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round(time.perf_counter() - start, 4)
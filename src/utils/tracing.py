@@ -0,0 +1,63 @@
+import functools
+import inspect
+import os
+from contextlib import contextmanager
+
+
+def tracing_enabled() -> bool:
+    for var in ("LANGSMITH_TRACING", "LANGCHAIN_TRACING_V2"):
+        if os.getenv(var, "").lower() in ("true", "1"):
+            return True
+    return False
+
+
+def traceable(name: str):
+    """LangSmith ``@traceable`` that imports langsmith only when tracing is on.
+
+    With tracing off the wrapped function is called directly, so the serving
+    path neither imports langsmith nor needs its network endpoint.
+    """
+
+    def decorator(fn):
+        traced = None
+
+        def get_traced():
+            nonlocal traced
+            if traced is None:
+                from langsmith import traceable as ls_traceable
+
+                traced = ls_traceable(name=name)(fn)
+            return traced
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not tracing_enabled():
+                    return await fn(*args, **kwargs)
+                return await get_traced()(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracing_enabled():
+                return fn(*args, **kwargs)
+            return get_traced()(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def trace(name: str):
+    """Child span under the current LangSmith run; a no-op when tracing is off."""
+    if not tracing_enabled():
+        yield
+        return
+
+    import langsmith
+
+    with langsmith.trace(name):
+        yield
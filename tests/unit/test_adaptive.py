@@ -0,0 +1,69 @@
+from src.retrieval.adaptive import AdaptiveRetriever
+
+
+def doc(i, score, found_by=("dense",)):
+    return {"id": f"id_{i}", "text": f"chunk {i}", "score": score, "found_by": list(found_by)}
+
+
+class StubRetriever:
+    """Returns ``shallow`` for small k and ``deep`` otherwise."""
+
+    def __init__(self, shallow, deep):
+        self.shallow = shallow
+        self.deep = deep
+        self.calls = []
+
+    def retrieve(self, query, query_embedding, dense_k, sparse_k, timings=None):
+        self.calls.append(dense_k)
+        timings["dense"] = 0.01
+        return self.shallow if dense_k <= 6 else self.deep
+
+
+def make(shallow, deep=None):
+    inner = StubRetriever(shallow, deep or [doc(i, 1.0 - i / 100) for i in range(30)])
+    return AdaptiveRetriever(inner, initial_k=6, initial_candidates=4, min_gap=0.1, min_agreement=2), inner
+
+
+def test_clear_score_gap_keeps_shallow_pass():
+    retriever, inner = make([doc(0, 2.0)] + [doc(i, 1.0) for i in range(1, 6)])
+    timings = {}
+
+    docs = retriever.retrieve("q", [0.1], 20, 20, timings)
+
+    assert inner.calls == [6]
+    assert len(docs) == 4
+    assert timings["dense"] == 0.01
+    assert retriever.assess(inner.shallow)[0] == "score_gap"
+
+
+def test_dense_sparse_agreement_keeps_shallow_pass():
+    both = ("dense", "sparse")
+    retriever, inner = make([doc(0, 1.0, both), doc(1, 0.99, both), doc(2, 0.98)] + [doc(i, 0.5) for i in range(3, 6)])
+
+    retriever.retrieve("q", [0.1], 20, 20, {})
+
+    assert inner.calls == [6]
+    assert retriever.assess(inner.shallow)[0] == "agreement"
+
+
+def test_ambiguous_head_widens_search():
+    retriever, inner = make([doc(i, 1.0 - i / 100) for i in range(6)])
+    timings = {}
+
+    docs = retriever.retrieve("q", [0.1], 20, 20, timings)
+
+    assert inner.calls == [6, 20]
+    assert len(docs) == 30
+    # Both passes count towards the request's stage timings.
+    assert timings["dense"] == 0.02
+    assert retriever.assess(inner.shallow)[0] == "ambiguous"
+
+
+def test_no_hits_widens_search(caplog):
+    retriever, inner = make([])
+
+    with caplog.at_level("INFO", logger="AdaptiveDepth"):
+        retriever.retrieve("q", [0.1], 20, 20, {})
+
+    assert inner.calls == [6, 20]
+    assert "reason=no_hits" in caplog.text
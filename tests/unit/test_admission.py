@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from src.api.admission import AdmissionController, Overloaded
+
+
+def test_admission_sheds_when_queue_full():
+    admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+
+    async def run():
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded):
+            await admission.acquire()
+
+        admission.release()
+        await waiter
+        assert admission.in_flight == 1
+        admission.release()
+
+    asyncio.run(run())
+
+    assert admission.rejected == 1
+    assert admission.in_flight == 0
+
+
+def test_admission_times_out_queued_requests():
+    admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.01)
+
+    async def run():
+        async with admission.slot():
+            with pytest.raises(Overloaded):
+                await admission.acquire()
+
+    asyncio.run(run())
+
+    assert admission.waiting == 0
+    assert admission.in_flight == 0
@@ -0,0 +1,192 @@
+import asyncio
+import json
+
+import httpx
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.api.app import create_app
+
+SERVING_CFG = {"admission": {"max_in_flight": 1, "max_queue": 0, "queue_timeout": 1}}
+
+
+class StubService:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    async def aask(self, query, session_id=None):
+        await asyncio.sleep(self.delay)
+        return {"response": {"answer": f"echo {query} [1]"}, "timing": {}}
+
+    async def astream(self, query, session_id=None):
+        for token in ["echo ", query]:
+            await asyncio.sleep(self.delay)
+            yield {"type": "token", "content": token}
+        yield {"type": "final", "response": {"answer": f"echo {query}"}, "timing": {}}
+
+
+def test_health_and_ask():
+    app = create_app(service_factory=StubService, serving_cfg=SERVING_CFG)
+
+    with TestClient(app) as client:
+        assert client.get("/health/live").status_code == 200
+
+        for _ in range(100):
+            if client.get("/health/ready").status_code == 200:
+                break
+
+        response = client.post("/ask", json={"query": "asthma"})
+
+    assert response.status_code == 200
+    assert response.json()["response"]["answer"] == "echo asthma [1]"
+
+
+def test_ask_serializes_numpy_and_validates_at_boundary():
+    class NumpyService(StubService):
+        async def aask(self, query, session_id=None):
+            return {
+                "response": {
+                    "answer": "a [1]",
+                    "citations": [1],
+                    "confidence": np.float32(0.5),
+                    "refusal": False,
+                    "explanation": None,
+                    "retrieved_chunks": None,
+                },
+                "timing": {},
+            }
+
+    app = create_app(service_factory=NumpyService, serving_cfg={**SERVING_CFG, "validate_responses": True})
+
+    with TestClient(app) as client:
+        app.state.service = NumpyService()
+        response = client.post("/ask", json={"query": "asthma"})
+
+    assert response.status_code == 200
+    assert response.json()["response"]["confidence"] == 0.5
+
+
+def test_stream_returns_ndjson_events():
+    app = create_app(service_factory=StubService, serving_cfg=SERVING_CFG)
+
+    with TestClient(app) as client:
+        app.state.service = StubService()
+        response = client.post("/ask/stream", json={"query": "asthma"})
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["type"] for e in events] == ["token", "token", "final"]
+    assert app.state.admission.in_flight == 0
+
+
+def test_not_ready_returns_503():
+    app = create_app(service_factory=StubService, serving_cfg=SERVING_CFG)
+    app.state.service = None
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            ready = await client.get("/health/ready")
+            ask = await client.post("/ask", json={"query": "asthma"})
+        return ready, ask
+
+    ready, ask = asyncio.run(run())
+
+    assert ready.status_code == 503
+    assert ask.status_code == 503
+
+
+def test_overload_returns_429():
+    app = create_app(service_factory=StubService, serving_cfg=SERVING_CFG)
+    app.state.service = StubService(delay=0.05)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *[client.post("/ask", json={"query": "asthma"}) for _ in range(3)]
+            )
+
+    codes = sorted(r.status_code for r in asyncio.run(run()))
+
+    assert codes == [200, 429, 429]
+    assert app.state.admission.rejected == 2
+
+
+def test_metrics_endpoint_exports_prometheus_text():
+    app = create_app(service_factory=StubService, serving_cfg=SERVING_CFG)
+
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "rag_requests_in_flight 0" in response.text
+
+
+class CachingService(StubService):
+    def __init__(self):
+        super().__init__()
+        self.asked = []
+
+    async def aask(self, query, session_id=None):
+        self.asked.append(query)
+        return await super().aask(query, session_id)
+
+    def mapped_arrays(self):
+        return iter(())
+
+    def cache_stats(self):
+        return {"answer": {"size": len(self.asked), "max_size": 8, "hits": 0, "misses": len(self.asked)}}
+
+
+def test_ready_waits_for_query_warmup(tmp_path):
+    log = tmp_path / "query_log.jsonl"
+    log.write_text("asthma\nasthma\ngout\n", encoding="utf-8")
+    cfg = {
+        **SERVING_CFG,
+        "query_warmup": {"enabled": True, "query_log": str(log), "top_n": 5, "concurrency": 2},
+    }
+    app = create_app(service_factory=CachingService, serving_cfg=cfg)
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            ready = client.get("/health/ready")
+            if ready.status_code == 200:
+                break
+        metrics = client.get("/metrics").text
+
+    warmup = ready.json()["warmup"]
+    assert warmup["completed"] == 2
+    assert warmup["caches"]["answer"]["size"] == 2
+    assert app.state.service.asked == ["asthma", "gout"]
+    assert 'rag_cache_entries{cache="answer"} 2' in metrics
+
+
+class ReloadingService(StubService):
+    def __init__(self):
+        super().__init__()
+        self.version = "v1"
+        self.published = "v2"
+
+    def index_version(self):
+        return self.version
+
+    def reload(self, version=None):
+        if self.version == self.published:
+            return None
+        self.version = self.published
+        return self.version
+
+
+def test_admin_reload_swaps_to_published_version():
+    app = create_app(service_factory=ReloadingService, serving_cfg=SERVING_CFG)
+
+    with TestClient(app) as client:
+        for _ in range(100):
+            ready = client.get("/health/ready")
+            if ready.status_code == 200:
+                break
+        assert ready.json()["index_version"] == "v1"
+
+        assert client.post("/admin/reload").json() == {"reloaded": True, "index_version": "v2"}
+        assert client.post("/admin/reload").json() == {"reloaded": False, "index_version": "v2"}
+        assert client.get("/health/ready").json()["index_version"] == "v2"
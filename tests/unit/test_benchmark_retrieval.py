@@ -0,0 +1,120 @@
+import math
+
+from src.benchmarks.retrieval import (
+    build_synthetic_stack,
+    expand_sweep,
+    ndcg_at_k,
+    reciprocal_rank,
+    recall_at_k,
+    run_sweep,
+)
+from src.benchmarks.synthetic import make_synthetic_corpus
+
+
+def test_quality_metrics():
+    retrieved = ["a", "b", "c", "d"]
+    relevant = ["b", "d"]
+
+    assert recall_at_k(retrieved, relevant, 2) == 0.5
+    assert reciprocal_rank(retrieved, relevant) == 0.5
+    expected = (1 / math.log2(3) + 1 / math.log2(5)) / (1 + 1 / math.log2(3))
+    assert math.isclose(ndcg_at_k(retrieved, relevant, 4), expected)
+    assert reciprocal_rank(retrieved, ["z"]) == 0.0
+
+
+def test_sweep_skips_parameters_a_pipeline_ignores():
+    runs = expand_sweep(
+        {
+            "pipelines": ["dense", "hybrid_rerank"],
+            "top_k": [5],
+            "alpha": [0.4, 0.6],
+            "rerank_top_k": [3],
+        }
+    )
+
+    assert runs == [
+        {"pipeline": "dense", "top_k": 5, "alpha": None, "rerank_top_k": None},
+        {"pipeline": "hybrid_rerank", "top_k": 5, "alpha": 0.4, "rerank_top_k": 3},
+        {"pipeline": "hybrid_rerank", "top_k": 5, "alpha": 0.6, "rerank_top_k": 3},
+    ]
+
+
+def test_synthetic_sweep_runs_offline():
+    records, queries = make_synthetic_corpus(n_topics=5, n_queries=10)
+    stack = build_synthetic_stack(records)
+
+    rows = run_sweep(
+        stack,
+        queries,
+        {
+            "pipelines": ["dense", "sparse", "hybrid", "hybrid_rerank"],
+            "top_k": [5],
+            "alpha": [0.6],
+            "rerank_top_k": [3],
+            "eval_k": 3,
+        },
+    )
+
+    assert [r["pipeline"] for r in rows] == ["dense", "sparse", "hybrid", "hybrid_rerank"]
+    for row in rows:
+        assert 0.0 <= row["recall@3"] <= 1.0
+        assert row["qps"] > 0
+        assert row["p95_ms"] >= row["p50_ms"]
+    assert rows[1]["mrr"] > 0.5
+
+
+def test_adaptive_rerank_sends_fewer_docs_to_reranker():
+    records, queries = make_synthetic_corpus(n_topics=5, n_queries=20)
+    stack = build_synthetic_stack(records)
+
+    rows = run_sweep(
+        stack,
+        queries,
+        {
+            "pipelines": ["hybrid_rerank", "adaptive_rerank"],
+            "top_k": [20],
+            "alpha": [0.6],
+            "rerank_top_k": [3],
+            "eval_k": 3,
+            "adaptive": {"initial_k": 6, "initial_candidates": 6, "min_gap": 0.1, "min_agreement": 2},
+        },
+    )
+
+    full, adaptive = rows
+    assert adaptive["rerank_docs"] < full["rerank_docs"]
+    assert adaptive["recall@3"] >= full["recall@3"] - 0.05
+
+
+def test_sparse_expanded_runs_only_with_an_expansion(tmp_path):
+    import json
+
+    from src.retrieval.sparse import SparseRetriever
+
+    records, queries = make_synthetic_corpus(n_topics=5, n_queries=20)
+    stack = build_synthetic_stack(records)
+    cfg = {
+        "pipelines": ["sparse", "sparse_expanded"],
+        "top_k": [5],
+        "alpha": [0.6],
+        "rerank_top_k": [3],
+        "eval_k": 3,
+    }
+
+    assert [r["pipeline"] for r in run_sweep(stack, queries, cfg)] == ["sparse"]
+
+    # Expand every chunk with the words of its section's other chunks.
+    texts = [r["text"] for r in records]
+    sections = {}
+    for i, r in enumerate(records):
+        sections.setdefault((r["metadata"]["topic"], r["metadata"]["section"]), []).append(i)
+    path = tmp_path / "expansion.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for ids in sections.values():
+            for i in ids:
+                words = {w for j in ids if j != i for w in texts[j].split()} - set(texts[i].split())
+                f.write(json.dumps({"id": f"id_{i}", "terms": dict.fromkeys(sorted(words), 1)}) + "\n")
+    stack.expanded_sparse = SparseRetriever(texts=texts, expansion_path=path)
+
+    plain, expanded = run_sweep(stack, queries, cfg)
+    assert expanded["pipeline"] == "sparse_expanded"
+    assert expanded["recall@3"] >= plain["recall@3"]
@@ -0,0 +1,43 @@
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+from src.retrieval.bm25 import BM25Index
+
+CORPUS = [
+    "diabetes is a chronic disease of blood sugar",
+    "hypertension is high blood pressure",
+    "insulin regulates blood sugar in diabetes",
+    "asthma narrows the airways",
+    "blood tests diagnose diabetes and anemia",
+]
+
+
+def test_bm25_index_matches_rank_bm25():
+    tokenized = [doc.split() for doc in CORPUS]
+    reference = BM25Okapi(tokenized)
+    index = BM25Index(tokenized)
+
+    for query in ["blood sugar", "diabetes diabetes", "airways", "unknown term", "is"]:
+        expected = reference.get_scores(query.split())
+        assert np.allclose(index.get_scores(query.split()), expected)
+
+
+def test_bm25_top_k_orders_by_score():
+    index = BM25Index([doc.split() for doc in CORPUS])
+
+    top, scores = index.top_k(["diabetes", "insulin"], 2)
+
+    assert len(top) == 2
+    assert top[0] == 2
+    assert scores[top[0]] >= scores[top[1]]
+
+
+def test_bm25_max_score_bounds_every_doc():
+    index = BM25Index([doc.split() for doc in CORPUS])
+
+    for query in ["blood sugar", "diabetes diabetes", "airways unknown"]:
+        tokens = query.split()
+        assert index.get_scores(tokens).max() < index.max_score(tokens)
+
+    # A term the corpus lacks raises the bound instead of being ignored.
+    assert index.max_score(["airways", "unknown"]) > index.max_score(["airways"])
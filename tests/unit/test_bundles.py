@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from src.retrieval.bundles import (
+    IndexVersion,
+    VersionedIndex,
+    build_bundle,
+    current_version,
+    prune,
+    publish,
+    read_manifest,
+)
+
+CFG = {
+    "sparse": {
+        "chunks_path": "data/processed/chunks/chunks.jsonl",
+        "expansion": {"path": "data/processed/chunks/expansion.jsonl"},
+    },
+    "dense": {
+        "persist_directory": "data/chroma_db",
+        "compressed_dir": "data/embeddings/compressed",
+        "embeddings_path": "data/embeddings/embeddings.npy",
+        "metadata_path": "data/embeddings/metadata.json",
+    },
+    "expansion": {"index_path": "data/processed/chunks/neighbors.npz"},
+    "topics": {"index_path": "data/processed/chunks/topics.json"},
+    "priors": {"path": "data/embeddings/priors.npz"},
+}
+
+
+@pytest.fixture
+def project(tmp_path):
+    chunks = tmp_path / CFG["sparse"]["chunks_path"]
+    chunks.parent.mkdir(parents=True)
+    chunks.write_text(json.dumps({"text": "Asthma narrows the airways."}) + "\n")
+    store = tmp_path / CFG["dense"]["persist_directory"]
+    store.mkdir(parents=True)
+    (store / "chroma.sqlite3").write_bytes(b"x" * 10)
+    return tmp_path
+
+
+def test_build_copies_artifacts_and_writes_manifest(project):
+    bundles = project / "bundles"
+    version = build_bundle(CFG, root=project, bundles_dir=bundles, version="v1")
+
+    bundle = bundles / "v1"
+    assert (bundle / CFG["sparse"]["chunks_path"]).read_text() == (project / CFG["sparse"]["chunks_path"]).read_text()
+    assert (bundle / "data/chroma_db/chroma.sqlite3").exists()
+    manifest = read_manifest(bundle)
+    assert manifest["version"] == version == "v1"
+    assert manifest["files"]["data/chroma_db"]["bytes"] == 10
+    assert len(manifest["files"][CFG["sparse"]["chunks_path"]]["sha256"]) == 64
+    # Missing optional artifacts are skipped, and nothing is published yet.
+    assert CFG["priors"]["path"] not in manifest["files"]
+    assert current_version(bundles) is None
+    assert not list(bundles.glob(".*.tmp"))
+
+
+def test_publish_and_prune_keep_current(project):
+    bundles = project / "bundles"
+    for version in ("v1", "v2", "v3"):
+        build_bundle(CFG, root=project, bundles_dir=bundles, version=version)
+
+    with pytest.raises(FileNotFoundError):
+        publish("v9", bundles)
+    publish("v1", bundles)
+    assert current_version(bundles) == "v1"
+
+    assert prune(bundles, keep=1) == ["v2"]
+    assert sorted(p.name for p in bundles.iterdir() if p.is_dir()) == ["v1", "v3"]
+
+
+def test_retired_version_is_freed_after_last_request():
+    freed = []
+    old = IndexVersion("v1", hybrid=object(), on_free=freed.append)
+    indexes = VersionedIndex(old)
+
+    with indexes.use() as index:
+        assert indexes.swap(IndexVersion("v2", hybrid=object())) is old
+        # In-flight requests keep the version they started on.
+        assert index is old and index.hybrid is not None
+        assert indexes.current.version == "v2"
+        assert freed == []
+
+    assert freed == [old]
+    assert old.hybrid is None
+
+
+def test_idle_version_is_freed_on_swap():
+    class Closable:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    hybrid = Closable()
+    old = IndexVersion("v1", hybrid)
+    VersionedIndex(old).swap(IndexVersion("v2", object()))
+
+    assert old.freed
+    assert hybrid.closed
+
+
+def test_retired_version_closes_its_chroma_clients():
+    from src.retrieval.dense import DenseRetriever
+    from src.retrieval.shards import Shard
+
+    class FakeClient:
+        closes = 0
+
+        def close(self):
+            self.closes += 1
+
+    client = FakeClient()
+    dense = DenseRetriever(collection=None, client=client)
+    old = IndexVersion("v1", object(), shards=[Shard("main", dense=dense)], dense=dense)
+    indexes = VersionedIndex(old)
+
+    with indexes.use():
+        indexes.swap(IndexVersion("v2", object()))
+        assert client.closes == 0
+
+    assert client.closes == 1
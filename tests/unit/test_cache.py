@@ -0,0 +1,53 @@
+from src.utils.cache import LRUCache, cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_ignores_case_and_spacing():
+    assert cache_key("  What is   Asthma? ") == cache_key("what is asthma?")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_expires_entries():
+    clock = FakeClock()
+    cache = LRUCache(max_size=4, ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 5
+    assert cache.get("a") == 1
+    clock.now = 16
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_stats_report_fill_and_hit_rate():
+    cache = LRUCache(max_size=4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.stats() == {
+        "size": 1,
+        "max_size": 4,
+        "fill": 0.25,
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+    }
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.embeddings.compress import CompressedVectors, Projection, quantize, shortlist_and_rescore
+from src.retrieval.compressed import CompressedDenseRetriever
+
+
+def corpus(n=500, dim=64, seed=0, rank=None):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n, rank or dim))
+    if rank:
+        # Real embeddings concentrate in far fewer directions than their size.
+        x = x @ rng.normal(size=(rank, dim)) + 0.01 * rng.normal(size=(n, dim))
+    x = x.astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def test_int8_quantization_uses_per_vector_scales():
+    x = corpus(10)
+    codes, scales = quantize(x, "int8")
+
+    assert codes.dtype == np.int8
+    assert np.abs(codes).max() == 127
+    np.testing.assert_allclose(codes * scales[:, None], x, atol=scales.max())
+
+    with pytest.raises(ValueError):
+        quantize(x, "int4")
+
+
+def test_pca_projection_keeps_leading_variance():
+    x = corpus()
+    projection = Projection.fit(x, "pca", 16)
+    assert projection.apply(x).shape == (500, 16)
+    np.testing.assert_allclose(np.linalg.norm(projection.apply(x), axis=1), 1.0, atol=1e-5)
+
+    truncate = Projection.fit(x, "truncate", 8)
+    np.testing.assert_array_equal(truncate.components, np.eye(64)[:8])
+
+
+@pytest.mark.parametrize("cfg", [
+    {"precision": "float16"},
+    {"precision": "int8"},
+    {"precision": "int8", "projection": "pca", "dim": 32},
+])
+def test_rescoring_recovers_exact_top_k(cfg):
+    x = corpus(rank=24)
+    compressed = CompressedVectors.from_config(x, cfg)
+    query = x[7] + 0.05 * corpus(1, seed=1)[0]
+
+    idx, scores = shortlist_and_rescore(compressed, x, query, top_k=5, rescore_factor=10)
+
+    expected = np.argsort(-(x @ query))[:5]
+    assert idx.tolist() == expected.tolist()
+    np.testing.assert_allclose(scores, (x @ query)[expected], rtol=1e-5)
+    assert compressed.nbytes < x.nbytes
+
+
+def test_save_load_and_dense_retriever(tmp_path):
+    x = corpus(50, 16)
+    CompressedVectors.from_config(x, {"precision": "int8"}).save(tmp_path / "compressed")
+    np.save(tmp_path / "embeddings.npy", x)
+    (tmp_path / "metadata.json").write_text(json.dumps([{"page": i} for i in range(50)]))
+
+    retriever = CompressedDenseRetriever.from_config(
+        {
+            "compressed_dir": tmp_path / "compressed",
+            "embeddings_path": tmp_path / "embeddings.npy",
+            "metadata_path": tmp_path / "metadata.json",
+            "rescore_factor": 4,
+        },
+        texts=[f"chunk {i}" for i in range(50)],
+    )
+
+    assert isinstance(retriever.compressed.codes, np.memmap)
+    docs = retriever.retrieve(x[3], 3)
+    assert docs[0]["id"] == "id_3"
+    assert docs[0]["text"] == "chunk 3"
+    assert docs[0]["metadata"] == {"page": 3}
+    assert docs[0]["score"] == pytest.approx(0.0, abs=1e-5)
+    assert docs[0]["score"] <= docs[1]["score"] <= docs[2]["score"]
@@ -0,0 +1,61 @@
+from src.rag.context import ContextPacker
+from src.rag.tokens import TokenCounter
+
+
+def words(n, prefix="filler"):
+    return " ".join(f"{prefix}{i}" for i in range(n))
+
+
+def test_overlapping_windows_are_deduplicated():
+    shared = "Inhaled corticosteroids reduce airway inflammation in most patients."
+    first = "Asthma is a chronic disease of the airways. " + shared
+    second = shared + " Short acting bronchodilators relieve acute symptoms."
+
+    packer = ContextPacker(max_tokens=500, min_overlap=20)
+    context, docs, stats = packer.pack("asthma treatment", [{"text": first}, {"text": second}, {"text": shared}])
+
+    assert [d["text"] for d in docs] == [
+        first,
+        "Short acting bronchodilators relieve acute symptoms.",
+    ]
+    assert context.count(shared) == 1
+    assert stats["duplicates_removed"] == 1
+
+
+def test_chunks_trimmed_to_relevant_sentences():
+    text = (
+        "Gout is a form of arthritis. It was described in antiquity. "
+        "Many famous people had it. Uric acid crystals cause gout attacks. "
+        "The weather was cold. Treatment of gout uses colchicine."
+    )
+    packer = ContextPacker(max_tokens=500, max_sentences=2)
+
+    _, docs, _ = packer.pack("gout treatment uric acid", [{"text": text}])
+
+    assert docs[0]["text"] == (
+        "Uric acid crystals cause gout attacks. ... Treatment of gout uses colchicine."
+    )
+
+
+def test_budget_filled_in_rank_order_with_consistent_citations():
+    docs = [
+        {"text": words(40, "a") + ".", "rerank_score": 0.9},
+        {"text": words(200, "b") + ".", "rerank_score": 0.8},
+        {"text": words(40, "c") + ".", "rerank_score": 0.7},
+    ]
+    counter = TokenCounter(chars_per_token=4.0)
+    packer = ContextPacker(max_tokens=200, counter=counter)
+
+    context, packed, stats = packer.pack("query", docs)
+
+    assert [d["rerank_score"] for d in packed] == [0.9, 0.7]
+    assert context.startswith("[1] a0")
+    assert "[2] c0" in context
+    assert stats["tokens_after"] <= 200
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"] > 0
+
+
+def test_calibrated_counter():
+    ratio = TokenCounter.calibrate(["x" * 300, "y" * 100], [100, 25])
+    assert ratio == 3.2
+    assert TokenCounter(chars_per_token=ratio).count("z" * 32) == 10
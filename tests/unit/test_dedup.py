@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+
+from src.cleaning.dedup import MinHasher, StreamingDeduper, dedup_records, run_dedup, shingles
+
+CFG = {"enabled": True, "num_perm": 128, "bands": 16, "shingle_size": 3, "threshold": 0.8, "seed": 1}
+
+BOILERPLATE = (
+    "Resources Books Smith John The Encyclopedia of Medicine Second Edition "
+    "Detroit Gale Group Periodicals Journal of Clinical Medicine Organizations "
+    "American Medical Association 515 North State Street Chicago"
+)
+
+
+def record(text, page):
+    return {"text": text, "metadata": {"topic": "t", "section": "s", "pdf": "a.pdf", "page": page}}
+
+
+def test_signature_similarity_tracks_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = "asthma is a chronic inflammatory disease of the airways that causes wheezing and coughing"
+    b = a + " at night"
+    c = "gout is a form of arthritis caused by uric acid crystals in the joints"
+
+    sa, sb, sc = (hasher.signature(t) for t in (a, b, c))
+    exact = len(shingles(a) & shingles(b)) / len(shingles(a) | shingles(b))
+
+    assert abs(np.mean(sa == sb) - exact) < 0.1
+    assert np.mean(sa == sc) < 0.1
+
+
+def test_near_duplicates_collapse_to_first_occurrence():
+    records = [
+        record("Asthma narrows the airways and causes wheezing, coughing and shortness of breath.", 1),
+        record(BOILERPLATE, 2),
+        record("Gout is a painful form of arthritis caused by uric acid crystals in joints.", 3),
+        record(BOILERPLATE + " Illinois", 4),
+        record(BOILERPLATE, 5),
+    ]
+
+    canonical, provenance, report = dedup_records(records, CFG)
+
+    assert [c["text"] for c in canonical] == [records[0]["text"], BOILERPLATE, records[2]["text"]]
+    assert canonical[1]["metadata"]["dup_count"] == 3
+    assert canonical[0]["metadata"]["dup_count"] == 1
+    assert provenance[1]["id"] == "id_1"
+    assert [m["page"] for m in provenance[1]["members"]] == [2, 4, 5]
+    assert report["removed_chunks"] == 2
+    assert report["largest_cluster"] == 3
+    assert 0 < report["char_reduction"] < 1
+
+
+def test_run_dedup_writes_stage_outputs(tmp_path, mocker):
+    mocker.patch("src.cleaning.dedup.load_dedup_config", return_value=CFG)
+    raw = tmp_path / "chunks_raw.jsonl"
+    raw.write_text("\n".join(json.dumps(record(BOILERPLATE, p)) for p in range(3)) + "\n")
+
+    report = run_dedup(raw_path=raw, out_dir=tmp_path)
+
+    lines = (tmp_path / "chunks.jsonl").read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads((tmp_path / "dedup_report.json").read_text()) == report
+    assert len((tmp_path / "provenance.jsonl").read_text().splitlines()) == 1
+
+
+def test_streaming_deduper_matches_batch_clusters():
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(60)]
+    base = [" ".join(rng.choice(words, 40)) for _ in range(8)]
+    records = []
+    for page in range(60):
+        text = base[rng.integers(len(base))]
+        if rng.random() < 0.5:
+            text = text + " " + " ".join(rng.choice(words, 3))
+        records.append(record(text, page))
+
+    deduper = StreamingDeduper(CFG)
+    accepted = [deduper.add(r) for r in records]
+    streamed = deduper.finish()
+    batch = dedup_records(records, CFG)
+
+    assert streamed[0] == batch[0]
+    assert streamed[1] == batch[1]
+    # Every canonical chunk was accepted on arrival; most duplicates were not.
+    assert all(accepted[p["members"][0]["raw_index"]] for p in batch[1])
+    assert sum(accepted) < len(records) / 2
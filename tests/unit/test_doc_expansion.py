@@ -0,0 +1,63 @@
+import pytest
+
+from src.retrieval.doc_expansion import SpladeExpander, expansion_tokens, main
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "##itis", "a", "of", ".", "heart", "attack",
+         "infarction", "myocardial", "cardiac", "muscle", "asthma", "airway", "wheezing"]
+
+
+@pytest.fixture(scope="module")
+def expander():
+    """Randomly initialised one-layer BERT masked-LM over a tiny vocabulary."""
+    torch = pytest.importorskip("torch")
+    from transformers import BertConfig, BertForMaskedLM, BertTokenizerFast
+
+    tokenizer = BertTokenizerFast(vocab={token: i for i, token in enumerate(VOCAB)})
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(VOCAB),
+        hidden_size=32,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=64,
+    )
+    return SpladeExpander(
+        "tiny", terms=4, min_weight=0.0, batch_size=2, model=BertForMaskedLM(config), tokenizer=tokenizer
+    )
+
+
+def test_expansion_terms_are_new_whole_words(expander):
+    texts = ["myocardial infarction of the cardiac muscle", "asthma", "airway wheezing attack"]
+
+    expansions = expander.expand(texts)
+
+    assert len(expansions) == len(texts)
+    for text, terms in zip(texts, expansions):
+        assert 0 < len(terms) <= 4
+        for term, tf in terms.items():
+            assert term in VOCAB[9:]
+            assert term not in text.split()
+            assert isinstance(tf, int) and tf >= 1
+
+
+def test_expansion_is_batch_independent(expander):
+    texts = ["myocardial infarction", "asthma attack", "cardiac muscle"]
+
+    assert expander.expand(texts) == [expander.expand([t])[0] for t in texts]
+
+
+def test_expansion_tokens_repeat_by_tf():
+    assert expansion_tokens({"heart": 2, "attack": 1}) == ["heart", "heart", "attack"]
+
+
+def test_main_writes_empty_expansions_without_expanded_backend(tmp_path, mocker):
+    out = tmp_path / "expansion.jsonl"
+    cfg = {"sparse": {"backend": "bm25", "chunks_path": str(tmp_path / "missing.jsonl"), "expansion": {"path": str(out)}}}
+    mocker.patch("src.retrieval.doc_expansion.load_retrieval_config", return_value=cfg)
+    load = mocker.patch.object(SpladeExpander, "_load")
+
+    main()
+
+    assert out.read_text() == ""
+    load.assert_not_called()
@@ -55,4 +55,31 @@ def test_embed_chunks_logic(mocker, tmp_path):
     with open(meta_path, "r", encoding="utf-8") as f:
         loaded_meta = json.load(f)
     assert len(loaded_meta) == 2
-    assert loaded_meta[0]["topic"] == "A"
\ No newline at end of file
+    assert loaded_meta[0]["topic"] == "A"
+
+def test_embed_chunks_writes_compressed_vectors(mocker, tmp_path):
+    chunks_file = tmp_path / "chunks.jsonl"
+    out_dir = tmp_path / "embeddings"
+    chunks_file.write_text(
+        "\n".join(json.dumps({"text": f"chunk {i}", "metadata": {}}) for i in range(4)) + "\n"
+    )
+
+    mocker.patch("src.embeddings.embed.load_embedding_config", return_value={
+        "model_name": "mock-model",
+        "batch_size": 2,
+        "compression": {"enabled": True, "precision": "int8", "projection": None, "dim": 384},
+    })
+    mocker.patch("src.embeddings.embed.Path", side_effect=lambda p: {
+        "data/processed/chunks/chunks.jsonl": chunks_file,
+        "data/embeddings": out_dir
+    }.get(str(p).replace("\\", "/"), Path(p)))
+    mock_model_instance = mocker.MagicMock()
+    mock_model_instance.encode.return_value = np.random.rand(4, 384).astype(np.float32)
+    mocker.patch("src.embeddings.embed.SentenceTransformer", return_value=mock_model_instance)
+
+    embed_chunks()
+
+    codes = np.load(out_dir / "compressed" / "codes.npy")
+    assert codes.shape == (4, 384)
+    assert codes.dtype == np.int8
+    assert (out_dir / "compressed" / "scales.npy").exists()
@@ -0,0 +1,127 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.embeddings import encoders
+from src.embeddings.encoders import CHECK_TEXTS, OnnxEmbedder, export_onnx, load_embedder, pool
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(
+    {w.strip("?,").lower() for text in CHECK_TEXTS for w in text.split()}
+)
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory):
+    """Randomly initialised two-layer BERT behind sentence-transformers."""
+    pytest.importorskip("onnx")
+    torch = pytest.importorskip("torch")
+    from sentence_transformers import SentenceTransformer
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    model_dir = tmp_path_factory.mktemp("tiny-bert")
+    (model_dir / "vocab.txt").write_text("\n".join(VOCAB), encoding="utf-8")
+    BertTokenizerFast(vocab_file=str(model_dir / "vocab.txt")).save_pretrained(model_dir)
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(VOCAB),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=64,
+    )
+    BertModel(config).save_pretrained(model_dir)
+    return SentenceTransformer(str(model_dir), device="cpu")
+
+
+@pytest.fixture(scope="module")
+def exported(tiny_model, tmp_path_factory):
+    out_dir = tmp_path_factory.mktemp("onnx")
+    manifest = export_onnx("tiny", out_dir, min_cosine=0.9, model=tiny_model)
+    return out_dir, manifest
+
+
+def test_pool_ignores_padding():
+    hidden = np.array([[[1.0, 1.0], [3.0, 3.0], [100.0, 100.0]]])
+    mask = np.array([[1, 1, 0]])
+    assert pool(hidden, mask).tolist() == [[2.0, 2.0]]
+    assert pool(hidden, mask, "cls").tolist() == [[1.0, 1.0]]
+
+
+def test_onnx_float32_matches_torch(tiny_model, exported):
+    out_dir, _ = exported
+    expected = tiny_model.encode(CHECK_TEXTS, normalize_embeddings=True)
+
+    actual = OnnxEmbedder(out_dir, threads=1, precision="float32").encode(CHECK_TEXTS, batch_size=4)
+
+    assert actual.shape == expected.shape
+    assert np.allclose(actual, expected, atol=1e-4)
+
+
+def test_onnx_int8_within_tolerance(tiny_model, exported):
+    out_dir, manifest = exported
+    expected = tiny_model.encode(CHECK_TEXTS, normalize_embeddings=True)
+
+    actual = OnnxEmbedder(out_dir, threads=1, precision="int8").encode(CHECK_TEXTS)
+
+    cosine = (actual * expected).sum(axis=1)
+    assert cosine.min() > 0.9
+    assert manifest["checks"]["int8"]["min_cosine"] == pytest.approx(cosine.min(), abs=1e-4)
+
+
+def test_onnx_single_query_is_one_vector(exported):
+    out_dir, manifest = exported
+
+    vector = OnnxEmbedder(out_dir).encode("What is asthma?")
+
+    assert vector.shape == (manifest["dim"],)
+    assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_export_fails_below_min_cosine(tiny_model, tmp_path):
+    with pytest.raises(ValueError, match="drifted"):
+        export_onnx("tiny", tmp_path, precisions=("float32",), min_cosine=1.01, model=tiny_model)
+
+
+def _cfg(model_dir, model_name="tiny"):
+    return {
+        "model_name": model_name,
+        "query_encoder": {
+            "backend": "onnx",
+            "threads": 1,
+            "onnx": {"dir": str(model_dir), "precision": "int8"},
+        },
+    }
+
+
+def test_load_embedder_uses_onnx_export(exported):
+    out_dir, _ = exported
+
+    embedder = load_embedder(_cfg(out_dir))
+
+    assert isinstance(embedder, OnnxEmbedder)
+    assert embedder.precision == "int8"
+
+
+def test_load_embedder_falls_back_to_torch_when_missing(mocker, tmp_path):
+    torch_embedder = mocker.patch.object(encoders, "TorchEmbedder")
+
+    embedder = load_embedder(_cfg(tmp_path / "missing"))
+
+    assert embedder is torch_embedder.return_value
+    torch_embedder.assert_called_once_with("tiny", 1)
+
+
+def test_load_embedder_rejects_export_of_another_model(mocker, tmp_path):
+    (tmp_path / "manifest.json").write_text(
+        json.dumps({"model_name": "other", "files": {"int8": "model.int8.onnx"}})
+    )
+    torch_embedder = mocker.patch.object(encoders, "TorchEmbedder")
+
+    assert load_embedder(_cfg(tmp_path)) is torch_embedder.return_value
+
+
+def test_load_embedder_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        load_embedder({"model_name": "tiny", "query_encoder": {"backend": "tensorrt"}})
@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.rag.chain import RagChain
+from src.rag.explainability import build_explainability
+from src.rag.schema import RAGResponse
+
+GUARDRAILS = {"medical_guardrails": {"confidence_threshold": 0.3, "emergency_keywords": []}}
+DOCS = [
+    {"text": "x" * 500, "metadata": {"preview": "stored preview"}, "score": np.float32(0.5), "rerank_score": 0.9},
+    {"text": "y" * 500, "score": 0.4, "rerank_score": 0.7},
+]
+
+
+def test_previews_come_from_metadata_with_text_fallback():
+    explanation = build_explainability(DOCS)
+
+    assert explanation[0]["preview"] == "stored preview"
+    assert explanation[1]["preview"] == "y" * 300
+    assert type(explanation[0]["score"]) is float
+
+    assert set(build_explainability(DOCS, include_scores=False)[0]) == {"chunk_id", "preview"}
+
+
+def test_chain_builds_explainability_only_when_configured():
+    lean = RagChain(
+        "stub",
+        0.0,
+        {**GUARDRAILS, "explainability": {"include_retrieved_chunks": False, "include_scores": False}},
+    ).apply_guardrails("q", DOCS, "Answer [1].")
+    # Without the section, responses keep their retrieved chunks.
+    verbose = RagChain("stub", 0.0, GUARDRAILS).apply_guardrails("q", DOCS, "Answer [1].")
+
+    assert lean.retrieved_chunks is None
+    assert [c["chunk_id"] for c in verbose.retrieved_chunks] == [1, 2]
+    # The lean result still satisfies the API schema.
+    RAGResponse.model_validate(lean.to_dict())
+    RAGResponse.model_validate(verbose.to_dict())
@@ -1,3 +1,5 @@
+import yaml
+
 from src.rag.guardrails import Guardrails
 
 
@@ -32,3 +34,28 @@ def test_emergency_detection():
     guard = Guardrails(cfg)
 
     assert guard.check_emergency("I think I have a heart attack")
+
+
+def test_emergency_terms_reported():
+    cfg = {
+        "medical_guardrails": {
+            "confidence_threshold": 0.3,
+            "emergency_keywords": ["heart attack", "stroke", "overdose"],
+        }
+    }
+
+    guard = Guardrails(cfg)
+
+    assert guard.match_emergency("Stroke or heart attack?") == ["stroke", "heart attack"]
+
+
+def test_emergency_detection_matches_inflected_forms():
+    with open("configs/guardrails.yaml", "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f)
+
+    guard = Guardrails(cfg)
+
+    assert guard.check_emergency("I overdosed on my pills")
+    assert guard.check_emergency("my dad had two heart attacks")
+    assert guard.check_emergency("signs of strokes")
+    assert guard.check_emergency("I feel suicidal")
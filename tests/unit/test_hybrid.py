@@ -24,3 +24,12 @@ def test_hybrid_fusion():
 
     assert len(docs) >= 1
     assert isinstance(docs, list)
+
+
+def test_hybrid_records_stage_timings():
+    hybrid = HybridRetriever(DummyDense(), DummySparse(), alpha=0.5)
+    timings = {}
+
+    hybrid.retrieve("query", [0.1], 2, 2, timings=timings)
+
+    assert set(timings) == {"dense", "sparse", "fuse"}
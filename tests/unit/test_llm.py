@@ -0,0 +1,76 @@
+import asyncio
+
+from src.rag.llm import AsyncLLMClient
+
+
+class FakeOllama:
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+        self.active = 0
+        self.peak = 0
+
+    async def chat(self, model, messages, options, stream=False, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if stream:
+            async def parts():
+                for token in ["Hello", " world"]:
+                    yield {"message": {"content": token}}
+            return parts()
+        return {"message": {"content": "Hello world"}}
+
+    async def close(self):
+        pass
+
+
+def test_async_client_limits_concurrency(mocker):
+    fake = FakeOllama()
+    factory = mocker.patch("ollama.AsyncClient", return_value=fake)
+
+    client = AsyncLLMClient("qwen", 0.2, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(
+            *[client.chat([{"role": "user", "content": "hi"}]) for _ in range(6)]
+        )
+
+    results = asyncio.run(run())
+
+    assert len(results) == 6
+    assert results[0][0] == "Hello world"
+    assert results[0][1] >= 0
+    assert fake.peak == 2
+    assert factory.call_count == 1
+    assert "limits" in factory.call_args.kwargs
+
+
+def test_async_client_streams_tokens(mocker):
+    mocker.patch("ollama.AsyncClient", return_value=FakeOllama())
+
+    client = AsyncLLMClient("qwen", 0.2)
+
+    async def run():
+        return [t async for t in client.stream([{"role": "user", "content": "hi"}])]
+
+    assert asyncio.run(run()) == ["Hello", " world"]
+
+
+def test_async_client_times_out(mocker):
+    class SlowOllama(FakeOllama):
+        async def chat(self, *args, **kwargs):
+            await asyncio.sleep(1)
+
+    mocker.patch("ollama.AsyncClient", return_value=SlowOllama())
+
+    client = AsyncLLMClient("qwen", 0.2, timeout=0.01)
+
+    async def run():
+        await client.chat([{"role": "user", "content": "hi"}])
+
+    try:
+        asyncio.run(run())
+        assert False, "expected a timeout"
+    except TimeoutError:
+        pass
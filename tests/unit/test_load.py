@@ -0,0 +1,67 @@
+import asyncio
+
+from src.benchmarks.load import (
+    RequestResult,
+    ServiceTarget,
+    build_service,
+    run_closed_loop,
+    run_open_loop,
+    summarize,
+)
+from src.benchmarks.stub_llm import StubLLMConfig, StubLLMServer
+
+
+class EchoTarget:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, query):
+        self.sent.append(query)
+        await asyncio.sleep(0.001)
+        return RequestResult(0.0, 0.001, "ok", refusal=query == "refuse")
+
+
+def test_summarize_rates_and_saturation():
+    results = [
+        RequestResult(0.0, 0.1, "ok", refusal=False),
+        RequestResult(0.0, 0.3, "ok", refusal=True),
+        RequestResult(0.0, 0.0, "shed"),
+        RequestResult(0.0, 5.0, "timeout"),
+    ]
+
+    summary = summarize(results, wall_seconds=1.0, samples=[], offered_qps=4, duration=1.0)
+
+    assert summary["requests"] == 4
+    assert summary["throughput_rps"] == 2.0
+    assert summary["shed_rate"] == 0.25
+    assert summary["timeout_rate"] == 0.25
+    assert summary["refusal_rate"] == 0.5
+    assert summary["saturated"] is True
+    assert 100 <= summary["latency_ms"]["p50"] <= 300
+
+
+def test_open_and_closed_loop_patterns():
+    target = EchoTarget()
+
+    open_results = asyncio.run(run_open_loop(target, ["a", "refuse"], qps=200, duration=0.1, arrival="constant"))
+    assert 15 <= len(open_results) <= 21
+
+    closed_results = asyncio.run(run_closed_loop(EchoTarget(), ["a"], users=3, duration=0.05))
+    assert len(closed_results) >= 3
+
+
+def test_service_against_stub_llm():
+    with StubLLMServer(StubLLMConfig(tokens_per_second=1000, output_tokens=5, load_ms=0)) as url:
+        service = build_service(synthetic=True, llm_host=url)
+        target = ServiceTarget(service, timeout=10)
+
+        async def run():
+            try:
+                return await run_closed_loop(target, ["definition of asthma"], users=2, duration=0.2)
+            finally:
+                await target.aclose()
+
+        results = asyncio.run(run())
+
+    assert results
+    assert all(r.status == "ok" for r in results)
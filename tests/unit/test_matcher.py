@@ -0,0 +1,41 @@
+from src.utils.matcher import KeywordMatcher
+
+
+def test_matcher_finds_all_terms_in_order():
+    matcher = KeywordMatcher(["stroke", "heart attack", "overdose"])
+
+    found = matcher.find("Possible OVERDOSE after a Heart Attack")
+
+    assert found == ["overdose", "heart attack"]
+
+
+def test_matcher_respects_word_boundaries():
+    matcher = KeywordMatcher(["stroke"])
+
+    assert matcher.search("signs of a stroke.")
+    assert not matcher.search("heat strokes and brushstrokes")
+
+
+def test_matcher_substring_mode():
+    matcher = KeywordMatcher(["stroke"], word_boundary=False)
+
+    assert matcher.find("brushstrokes") == ["stroke"]
+
+
+def test_matcher_overlapping_patterns():
+    matcher = KeywordMatcher(["he", "she", "his", "hers"], word_boundary=False)
+
+    assert set(matcher.find("ushers")) == {"he", "she", "hers"}
+
+
+def test_matcher_case_folding_non_ascii():
+    matcher = KeywordMatcher(["Herzinfarkt", "straße"])
+
+    assert matcher.find("HERZINFARKT in der STRASSE") == ["Herzinfarkt", "straße"]
+
+
+def test_matcher_empty_keywords():
+    matcher = KeywordMatcher([])
+
+    assert not matcher.search("anything")
+    assert matcher.find("anything") == []
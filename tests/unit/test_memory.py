@@ -0,0 +1,94 @@
+from src.rag.memory import ConversationMemory, ExtractiveSummarizer, SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_history_is_bounded_by_turns():
+    memory = ConversationMemory(max_turns=2, max_tokens=10_000)
+    for i in range(5):
+        memory.add("user", f"question {i}")
+        memory.add("assistant", f"answer {i}")
+
+    assert len(memory.history) == 4
+    assert memory.get_history() == (
+        "USER: question 3\nASSISTANT: answer 3\nUSER: question 4\nASSISTANT: answer 4\n"
+    )
+
+
+def test_history_is_bounded_by_tokens_and_summarized():
+    memory = ConversationMemory(
+        max_turns=100,
+        max_tokens=30,
+        summarizer=ExtractiveSummarizer(max_tokens=40),
+    )
+    memory.add("user", "What is asthma? Please explain in detail.")
+    memory.add("assistant", "Asthma narrows the airways [1]. It causes wheezing.")
+    memory.add("user", "How is it treated with inhalers and other medication?")
+
+    assert memory.tokens <= 30
+    assert memory.history[-1]["content"].startswith("How is it treated")
+    assert "user: What is asthma?" in memory.summary
+    history = memory.get_history()
+    assert history.startswith("SUMMARY OF EARLIER TURNS:")
+    assert history.endswith("USER: How is it treated with inhalers and other medication?\n")
+
+
+def test_formatted_history_matches_rebuild():
+    memory = ConversationMemory(max_turns=3, max_tokens=50)
+    for i in range(20):
+        memory.add("user" if i % 2 else "assistant", "x" * (i * 7 % 40))
+
+    expected = "".join(f"{m['role'].upper()}: {m['content']}\n" for m in memory.messages())
+    assert memory.get_history() == expected
+
+
+def test_sessions_are_isolated_and_expire():
+    clock = FakeClock()
+    store = SessionStore(ttl_seconds=10, clock=clock)
+
+    store.add("a", "user", "hello from a")
+    store.add("b", "user", "hello from b")
+    assert store.get_history("a") == "USER: hello from a\n"
+    assert store.get_history(None) == ""
+
+    clock.now = 11
+    assert store.get_history("a") == ""
+    store.add("c", "user", "new")
+    assert "b" not in store
+    assert len(store) == 1
+
+
+def test_sessions_evicted_lru_by_count_and_bytes():
+    store = SessionStore(max_sessions=2)
+    store.add("a", "user", "1")
+    store.add("b", "user", "2")
+    store.get_history("a")
+    store.add("c", "user", "3")
+
+    assert "a" in store and "c" in store and "b" not in store
+
+    capped = SessionStore(max_bytes=200)
+    for i in range(10):
+        capped.add(str(i), "user", "y" * 40)
+    assert capped.stats()["bytes"] <= 200
+    assert "9" in capped and "0" not in capped
+
+
+def test_eviction_to_low_watermark_keeps_prefix_stable():
+    memory = ConversationMemory(max_turns=4, max_tokens=10_000, evict_to=0.5)
+    for i in range(4):
+        memory.add("user", f"q{i}")
+        memory.add("assistant", f"a{i}")
+    assert len(memory.history) == 8
+
+    memory.add("user", "q4")
+    assert [m["content"] for m in memory.history] == ["q3", "a3", "q4"]
+
+    memory.add("assistant", "a4")
+    assert memory.messages()[0] == {"role": "user", "content": "q3"}
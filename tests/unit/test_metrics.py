@@ -0,0 +1,41 @@
+from src.utils.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_quantiles_are_bucket_interpolated():
+    hist = Histogram(buckets=(0.01, 0.1, 1.0))
+    for _ in range(90):
+        hist.observe(0.005)
+    for _ in range(10):
+        hist.observe(0.5)
+
+    assert hist.count == 100
+    assert 0.0 < hist.quantile(0.5) <= 0.01
+    assert 0.1 < hist.quantile(0.99) <= 1.0
+    assert hist.max == 0.5
+
+
+def test_timer_records_stage_and_request_timings():
+    metrics = MetricsRegistry()
+    timings = {}
+
+    with metrics.timer("embed", timings):
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["embed"]["count"] == 1
+    assert "embed" in timings
+    assert set(snapshot["embed"]) >= {"p50", "p95", "p99"}
+
+
+def test_prometheus_rendering():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.observe("rerank", 0.05)
+    metrics.observe("rerank", 0.5)
+
+    text = metrics.render_prometheus()
+
+    assert "# TYPE rag_stage_duration_seconds histogram" in text
+    assert 'rag_stage_duration_seconds_bucket{stage="rerank",le="0.1"} 1' in text
+    assert 'rag_stage_duration_seconds_bucket{stage="rerank",le="+Inf"} 2' in text
+    assert 'rag_stage_duration_seconds_count{stage="rerank"} 2' in text
+    assert 'rag_stage_duration_seconds_quantile{stage="rerank",quantile="0.95"}' in text
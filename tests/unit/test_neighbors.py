@@ -0,0 +1,69 @@
+import numpy as np
+
+from src.retrieval.neighbors import NeighborExpander, NeighborIndex, join_chunks
+
+
+def meta(topic, section, page=1):
+    return {"pdf": "book.pdf", "topic": topic, "section": section, "page": page}
+
+
+METADATAS = [
+    meta("asthma", "definition"),
+    meta("asthma", "treatment"),
+    meta("asthma", "treatment"),
+    meta("asthma", "treatment", page=2),
+    meta("asthma", "treatment", page=2),
+    meta("asthma", "treatment", page=2),
+    meta("gout", "definition", page=2),
+]
+
+
+def test_index_links_neighbors_within_sections():
+    index = NeighborIndex.build(METADATAS)
+
+    assert index.section.tolist() == [0, 1, 1, 1, 1, 1, 2]
+    assert index.prev.tolist() == [-1, -1, 1, 2, 3, 4, -1]
+    assert index.next.tolist() == [-1, 2, 3, 4, 5, -1, -1]
+    assert index.span(3, window=1, max_section_chunks=4) == (2, 5)
+    assert index.span(1, window=1, max_section_chunks=4) == (1, 3)
+    assert index.span(6, window=1, max_section_chunks=4) == (6, 7)
+    assert index.span(3, window=1, max_section_chunks=5) == (1, 6)
+
+
+def test_index_round_trip(tmp_path):
+    index = NeighborIndex.build(METADATAS)
+    path = tmp_path / "neighbors.npz"
+    index.save(path)
+
+    loaded = NeighborIndex.load(path)
+    assert np.array_equal(loaded.section_end, index.section_end)
+
+
+def test_join_chunks_drops_splitter_overlap():
+    a = "Inhalers deliver the drug to the lungs. Steroids reduce inflammation."
+    b = "Steroids reduce inflammation. Bronchodilators open the airways."
+    assert join_chunks([a, b]) == (
+        "Inhalers deliver the drug to the lungs. Steroids reduce inflammation. "
+        "Bronchodilators open the airways."
+    )
+    assert join_chunks(["one", "two"]) == "one two"
+
+
+def test_expansions_are_merged_and_keep_rank_order():
+    texts = [f"chunk {i}." for i in range(len(METADATAS))]
+    expander = NeighborExpander(NeighborIndex.build(METADATAS), texts, window=1, max_section_chunks=2)
+
+    docs = [
+        {"id": "id_6", "text": texts[6], "rerank_score": 0.9},
+        {"id": "id_4", "text": texts[4], "rerank_score": 0.8},
+        {"id": "id_2", "text": texts[2], "rerank_score": 0.7},
+        {"id": None, "text": "no id", "rerank_score": 0.1},
+    ]
+
+    expanded = expander.expand(docs)
+
+    assert [d["rerank_score"] for d in expanded] == [0.9, 0.8, 0.1]
+    assert expanded[0]["chunk_ids"] == ["id_6"]
+    assert expanded[1]["chunk_ids"] == ["id_1", "id_2", "id_3", "id_4", "id_5"]
+    assert expanded[1]["text"] == "chunk 1. chunk 2. chunk 3. chunk 4. chunk 5."
+    assert expanded[2]["text"] == "no id"
@@ -0,0 +1,85 @@
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+from src.cleaning.clean import clean_and_chunk
+from src.cleaning.dedup import dedup_records
+from src.pipeline.stream import StreamingPipeline
+
+PAGES = [
+    "Asthma\nDefinition\nAsthma narrows the airways and causes wheezing.\nTreatment\nInhalers relieve symptoms quickly.",
+    "Gout\nDefinition\nGout is a painful arthritis caused by uric acid crystals in the joints.",
+    "Resources\nBOOKS\nHealth Publishing. 2001.",
+    "Asthma\nDefinition\nAsthma narrows the airways and causes wheezing.\nTreatment\nInhalers relieve symptoms quickly.",
+]
+PIPELINE_CFG = {
+    "workers": "thread",
+    "queue_size": 2,
+    "page_batch": 1,
+    "chunk_batch": 1,
+    "embed_batch": 2,
+    "max_in_flight": 1,
+}
+DEDUP_CFG = {"enabled": True, "num_perm": 64, "bands": 16, "shingle_size": 2, "threshold": 0.8, "seed": 1}
+EMBEDDING_CFG = {"batch_size": 2, "compression": {"enabled": False}}
+
+
+class HashModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, normalize_embeddings=True):
+        self.encoded.extend(texts)
+        return np.array([[zlib.crc32(t.encode()) % 997, len(t)] for t in texts], dtype=np.float32)
+
+
+def page_records():
+    return [{"text": text, "metadata": {"pdf": "book.pdf", "page": i + 1}} for i, text in enumerate(PAGES)]
+
+
+@pytest.fixture
+def pipeline_env(mocker, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cfg = mocker.MagicMock(processed_dir=str(tmp_path / "pages"))
+    mocker.patch("src.pipeline.stream.load_ingestion_config", return_value=cfg)
+    mocker.patch("src.pipeline.stream.iter_pages", side_effect=lambda cfg: iter(page_records()))
+    mocker.patch(
+        "src.cleaning.clean.load_cleaning_config",
+        return_value={"chunk_size": 1100, "chunk_overlap": 150},
+    )
+    return tmp_path
+
+
+def test_streaming_pipeline_matches_sequential_stages(pipeline_env):
+    from langchain_core.documents import Document
+
+    model = HashModel()
+    report = StreamingPipeline(PIPELINE_CFG, EMBEDDING_CFG, DEDUP_CFG, model=model).run(
+        pipeline_env / "chunks", pipeline_env / "embeddings"
+    )
+
+    chunks = clean_and_chunk([Document(page_content=r["text"], metadata=r["metadata"]) for r in page_records()])
+    records = [{"text": c.page_content, "metadata": c.metadata} for c in chunks]
+    canonical, _, expected_report = dedup_records(records, DEDUP_CFG)
+
+    with open(pipeline_env / "chunks" / "chunks.jsonl", encoding="utf-8") as f:
+        written = [json.loads(line) for line in f]
+    assert written == canonical
+    assert report["removed_chunks"] == expected_report["removed_chunks"] > 0
+    assert len((pipeline_env / "pages" / "pages.jsonl").read_text().splitlines()) == len(PAGES)
+
+    embeddings = np.load(pipeline_env / "embeddings" / "embeddings.npy")
+    assert np.array_equal(embeddings, HashModel().encode([c["text"] for c in canonical]))
+    # Chunks rejected on arrival are never sent to the model.
+    assert len(model.encoded) == len(canonical)
+
+
+def test_stage_failure_is_raised_by_the_consumer(pipeline_env, mocker):
+    mocker.patch("src.pipeline.stream.iter_pages", side_effect=OSError("corrupt pdf"))
+
+    with pytest.raises(RuntimeError, match="corrupt pdf"):
+        StreamingPipeline(PIPELINE_CFG, EMBEDDING_CFG, DEDUP_CFG, model=HashModel()).run(
+            pipeline_env / "chunks", pipeline_env / "embeddings"
+        )
@@ -0,0 +1,33 @@
+from src.benchmarks.prefix_cache import run_layout
+from src.benchmarks.stub_llm import StubLLMConfig
+from src.rag.prompt import MEDICAL_SYSTEM_PROMPT, build_medical_messages
+
+
+def test_messages_layout_keeps_history_prefix_stable():
+    history = [
+        {"role": "user", "content": "What is asthma?"},
+        {"role": "assistant", "content": "Asthma narrows the airways."},
+    ]
+    second = build_medical_messages("How is it treated?", "[1] Inhalers.", history)
+    history += [
+        {"role": "user", "content": "How is it treated?"},
+        {"role": "assistant", "content": "With inhalers."},
+    ]
+    third = build_medical_messages("Is it curable?", "[1] No cure.", history)
+
+    assert second[0] == {"role": "system", "content": MEDICAL_SYSTEM_PROMPT}
+    assert third[: len(second) - 1] == second[:-1]
+    assert second[-1]["content"].startswith("Question:\nHow is it treated?")
+
+
+def test_messages_layout_reuses_more_prefix_on_stub_server():
+    queries = ["definition of asthma", "treatment of asthma", "causes of gout", "symptoms of gout"]
+    cfg = StubLLMConfig(load_ms=0, prefill_ms_per_token=0.0, tokens_per_second=1000, output_tokens=5,
+                        max_parallel=1, cache_slots=1)
+
+    single = run_layout("single", queries, sessions=2, turns=2, stub_cfg=cfg)
+    messages = run_layout("messages", queries, sessions=2, turns=2, stub_cfg=cfg)
+
+    assert single["requests"] == messages["requests"] == 4
+    assert messages["reused_tokens"] > 0
+    assert messages["reuse_ratio"] > single["reuse_ratio"]
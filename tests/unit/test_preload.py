@@ -0,0 +1,52 @@
+import gc
+
+import pytest
+
+from src.services.rag_Service import RagService
+from src.utils.procstats import memory_usage
+
+
+@pytest.fixture
+def fresh_singleton():
+    RagService._instance = None
+    yield
+    RagService._instance = None
+    gc.unfreeze()
+
+
+def test_preload_loads_assets_only(mocker, fresh_singleton):
+    load_assets = mocker.patch.object(RagService, "_load_assets")
+    init_state = mocker.patch.object(RagService, "_init_process_state")
+
+    instance = RagService.preload()
+
+    assert load_assets.call_count == 1
+    assert init_state.call_count == 0
+    assert RagService._instance is instance
+
+
+def test_forked_worker_rebuilds_process_state(mocker, fresh_singleton):
+    mocker.patch.object(RagService, "_load_assets")
+
+    def init_state(self):
+        self._pid = 4242
+
+    init_state_mock = mocker.patch.object(
+        RagService, "_init_process_state", autospec=True, side_effect=init_state
+    )
+    mocker.patch("src.services.rag_Service.os.getpid", return_value=4242)
+
+    parent = RagService.preload()
+    worker = RagService()
+    again = RagService()
+
+    assert worker is parent is again
+    assert init_state_mock.call_count == 1
+
+
+def test_memory_usage_reports_rss():
+    usage = memory_usage()
+
+    if usage:
+        assert usage["rss_mb"] > 0
+        assert "pss_mb" in usage
@@ -0,0 +1,70 @@
+import numpy as np
+
+from src.retrieval.hybrid import HybridRetriever
+from src.retrieval.priors import ChunkPriors, centrality_prior, dup_prior, length_prior
+
+CFG = {
+    "target_chars": 100,
+    "default_section_weight": 0.5,
+    "section_weights": {"definition": 1.0, "key terms": 0.2},
+    "weights": {"section": 0.4, "length": 0.3, "dup": 0.2, "centrality": 0.1},
+}
+METADATAS = [
+    {"topic": "asthma", "section": "definition", "dup_count": 1},
+    {"topic": "asthma", "section": "key terms", "dup_count": 1},
+    {"topic": "asthma", "section": "resources", "dup_count": 20},
+]
+TEXTS = ["a" * 300, "b" * 30, "c" * 100]
+
+
+def test_components():
+    assert np.allclose(length_prior(TEXTS, 100), [1.0, 0.3, 1.0])
+    assert dup_prior(METADATAS)[0] == 1.0
+    assert dup_prior(METADATAS)[2] < 0.3
+
+    embeddings = np.array([[1.0, 0.0], [1.0, 0.1], [-1.0, 0.0]], dtype=np.float32)
+    centrality = centrality_prior(METADATAS, embeddings)
+    assert centrality[2] < centrality[0]
+    assert centrality_prior(METADATAS, None).tolist() == [1.0, 1.0, 1.0]
+
+
+def test_compute_orders_chunks_and_round_trips(tmp_path):
+    priors = ChunkPriors.compute(METADATAS, TEXTS, CFG)
+
+    assert priors.prior[0] == 1.0
+    assert priors.prior[0] > priors.prior[2] > priors.prior[1]
+    assert priors.of({"id": "id_1"}) == float(priors.prior[1])
+    assert priors.of({"text": "no id"}) == 1.0
+
+    path = tmp_path / "priors.npz"
+    priors.save(path)
+    loaded = ChunkPriors.from_config({"enabled": True, "path": "priors.npz"}, tmp_path)
+    assert np.array_equal(loaded.prior, priors.prior)
+    assert set(loaded.components) == {"section", "length", "dup", "centrality"}
+    assert ChunkPriors.from_config({"enabled": True, "path": "missing.npz"}, tmp_path) is None
+
+
+class ListRetriever:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def retrieve(self, *args, **kwargs):
+        return self.docs
+
+
+def test_fusion_adds_priors_and_prunes_low_prior_chunks():
+    priors = ChunkPriors(np.array([1.0, 0.1, 0.5], dtype=np.float32))
+    dense = ListRetriever([
+        {"id": "id_0", "text": "zero", "score": 0.5},
+        {"id": "id_1", "text": "one", "score": 0.4},
+        {"id": "id_2", "text": "two", "score": 0.45},
+    ])
+    hybrid = HybridRetriever(dense, ListRetriever([]), alpha=1.0, priors=priors, prior_weight=0.2)
+
+    assert [d["id"] for d in hybrid.retrieve("q", [0.1], 3, 0)] == ["id_0", "id_2", "id_1"]
+
+    hybrid.min_prior = 0.3
+    assert [d["id"] for d in hybrid.retrieve("q", [0.1], 3, 0)] == ["id_0", "id_2"]
+
+    hybrid.min_prior = 2.0
+    assert len(hybrid.retrieve("q", [0.1], 3, 0)) == 3
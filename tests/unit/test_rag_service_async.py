@@ -0,0 +1,291 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.rag.chain import RagChain
+from src.rag.context import ContextPacker
+from src.rag.memory import SessionStore
+from src.rag.schema import RAGResult
+from src.retrieval.bundles import IndexVersion, VersionedIndex
+from src.services.rag_Service import RagService
+
+
+class DummyEmbedder:
+    def __init__(self):
+        self.threads = set()
+
+    def encode(self, query, normalize_embeddings=True):
+        self.threads.add(threading.current_thread().name)
+        return [0.1, 0.2]
+
+
+class DummyHybrid:
+    def retrieve(self, query, query_embedding, dense_k, sparse_k, timings=None):
+        return [{"text": "Asthma narrows the airways.", "score": 0.9}]
+
+
+class DummyReranker:
+    def rerank(self, query, docs, top_k):
+        for d in docs:
+            d["rerank_score"] = 0.8
+        return docs[:top_k]
+
+
+class DummyChain:
+    def __init__(self):
+        self.prompts = []
+
+    async def agenerate(self, query, docs, prompt, timings=None):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        return (
+            RAGResult(
+                answer="Asthma narrows the airways [1].",
+                citations=[1],
+                confidence=0.8,
+                refusal=False,
+                explanation="ok",
+                retrieved_chunks=[],
+            ),
+            0.01,
+        )
+
+
+def make_service():
+    service = object.__new__(RagService)
+    service.retrieval_cfg = {
+        "dense": {"top_k": 5},
+        "sparse": {"top_k": 5},
+        "reranker": {"top_k": 2},
+    }
+    service.embedder = DummyEmbedder()
+    service.indexes = VersionedIndex(IndexVersion("test", DummyHybrid()))
+    service.reranker = DummyReranker()
+    service.packer = ContextPacker()
+    service.prompt_layout = "single"
+    service.memory = SessionStore()
+    service.caches = {}
+    service.chain = DummyChain()
+    service.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-cpu")
+    service.stage_limits = {
+        "embed": asyncio.Semaphore(1),
+        "retrieve": asyncio.Semaphore(1),
+        "rerank": asyncio.Semaphore(1),
+    }
+    return service
+
+
+def test_aask_runs_cpu_stages_in_executor():
+    service = make_service()
+
+    async def run():
+        return await asyncio.gather(*[service.aask("What is asthma?") for _ in range(4)])
+
+    results = asyncio.run(run())
+
+    assert len(results) == 4
+    assert results[0]["response"]["citations"] == [1]
+    assert set(results[0]["timing"]) == {"retrieval_time", "llm_time", "total_time", "stages"}
+    assert {"embed", "rerank", "prompt_build"} <= set(results[0]["timing"]["stages"])
+    assert all(name.startswith("rag-cpu") for name in service.embedder.threads)
+    assert "[1] Asthma narrows the airways." in service.chain.prompts[0]
+
+
+class StubLLMClient:
+    async def stream(self, messages, timings=None):
+        for token in ["Asthma ", "narrows ", "the airways [1]."]:
+            yield token
+
+
+def test_astream_yields_tokens_then_guarded_response():
+    service = make_service()
+    service.chain = RagChain(
+        model="stub",
+        temperature=0.0,
+        guardrail_cfg={
+            "medical_guardrails": {
+                "confidence_threshold": 0.3,
+                "emergency_keywords": ["heart attack"],
+            },
+            "explainability": {"include_retrieved_chunks": True, "include_scores": True},
+        },
+        llm_client=StubLLMClient(),
+    )
+
+    async def run(query):
+        return [event async for event in service.astream(query)]
+
+    events = asyncio.run(run("What is asthma?"))
+
+    assert [e["type"] for e in events] == ["token", "token", "token", "final"]
+    final = events[-1]["response"]
+    assert final["answer"] == "Asthma narrows the airways [1]."
+    assert final["refusal"] is False
+    assert final["retrieved_chunks"][0]["chunk_id"] == 1
+
+    emergency = asyncio.run(run("Am I having a heart attack?"))
+    assert [e["type"] for e in emergency] == ["final"]
+    assert emergency[0]["response"]["refusal"] is True
+
+
+def test_astream_skips_generation_for_low_confidence_docs():
+    service = make_service()
+    service.reranker.rerank = lambda query, docs, top_k: [{**d, "rerank_score": 0.1} for d in docs]
+    service.chain = RagChain(
+        model="stub",
+        temperature=0.0,
+        guardrail_cfg={
+            "medical_guardrails": {
+                "confidence_threshold": 0.3,
+                "emergency_keywords": ["heart attack"],
+            },
+        },
+        llm_client=StubLLMClient(),
+    )
+
+    async def run():
+        return [event async for event in service.astream("What is asthma?")]
+
+    events = asyncio.run(run())
+
+    assert [e["type"] for e in events] == ["final"]
+    assert events[0]["response"]["refusal"] is True
+    assert events[0]["response"]["answer"] == "The available evidence is insufficient to provide a confident answer."
+
+
+def test_aask_keeps_history_per_session():
+    service = make_service()
+
+    asyncio.run(service.aask("What is asthma?", session_id="a"))
+    asyncio.run(service.aask("And its treatment?", session_id="a"))
+    asyncio.run(service.aask("What is gout?", session_id="b"))
+    asyncio.run(service.aask("Stateless question"))
+
+    prompts = service.chain.prompts
+    assert "USER: What is asthma?" in prompts[1]
+    assert "ASSISTANT: Asthma narrows the airways." in prompts[1]
+    assert "asthma" not in prompts[2].split("Context:")[0]
+    assert "USER:" not in prompts[3]
+    assert len(service.memory) == 2
+
+
+def test_messages_history_keeps_bare_questions_and_skips_refusals():
+    service = make_service()
+    service.prompt_layout = "messages"
+
+    asyncio.run(service.aask("What is asthma?", session_id="a"))
+    asyncio.run(service.aask("And its treatment?", session_id="a"))
+
+    history = service.chain.prompts[1][1:-1]
+    assert history == [
+        {"role": "user", "content": "What is asthma?"},
+        {"role": "assistant", "content": "Asthma narrows the airways."},
+    ]
+
+    async def refused(query, docs, prompt, timings=None):
+        result, _ = await DummyChain().agenerate(query, docs, prompt)
+        result.refusal = True
+        return result, 0.0
+
+    service.chain.agenerate = refused
+    asyncio.run(service.aask("Another question?", session_id="b"))
+    assert service.memory.get_messages("b") == []
+
+
+class CountingEmbedder(DummyEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def encode(self, query, normalize_embeddings=True):
+        self.calls += 1
+        return super().encode(query, normalize_embeddings)
+
+
+def test_stateless_answers_and_stages_are_cached():
+    from src.utils.cache import LRUCache
+
+    service = make_service()
+    service.embedder = CountingEmbedder()
+    service.caches = {name: LRUCache(8) for name in ("embedding", "retrieval", "rerank", "answer")}
+
+    first = asyncio.run(service.aask("What is asthma?"))
+    second = asyncio.run(service.aask("what is  ASTHMA?"))
+
+    assert "cached" not in first
+    assert second["cached"] is True
+    assert second["response"] == first["response"]
+    assert len(service.chain.prompts) == 1
+
+    # With a session the prompt carries history, so only the stages are reused.
+    asyncio.run(service.aask("What is asthma?", session_id="a"))
+    assert len(service.chain.prompts) == 2
+    assert service.embedder.calls == 1
+    assert service.caches["rerank"].stats()["hits"] == 1
+    assert "rerank_score" not in service.caches["retrieval"].get(("test", "what is asthma?"))[1][0]
+
+
+class CountingHybrid:
+    def __init__(self, text):
+        self.text = text
+        self.queries = []
+
+    @property
+    def calls(self):
+        return len(self.queries)
+
+    def retrieve(self, query, query_embedding, dense_k, sparse_k, timings=None):
+        self.queries.append(query)
+        return [{"text": self.text, "score": 0.9}]
+
+
+def make_reloadable_service(mocker, hybrid):
+    from src.utils.cache import LRUCache
+
+    service = make_service()
+    service.caches = {name: LRUCache(8) for name in ("embedding", "retrieval", "rerank", "answer")}
+    service.retrieval_cfg["bundles"] = {"prewarm": 8}
+    service._reload_lock = threading.Lock()
+    service._failed_version = None
+    mocker.patch.object(service, "_bundle_root", return_value=("v2", None))
+    mocker.patch.object(service, "_load_shards", return_value=[])
+    mocker.patch.object(service, "_build_index", return_value=IndexVersion("v2", hybrid))
+    return service
+
+
+def test_reload_prewarms_new_version_and_drops_old_entries(mocker):
+    hybrid = CountingHybrid("Asthma is a chronic airway disease.")
+    service = make_reloadable_service(mocker, hybrid)
+    asyncio.run(service.aask("What is Asthma?"))
+
+    old = service.indexes.current
+    assert service.reload() == "v2"
+    assert service.index_version() == "v2"
+    assert old.freed
+    # Recent retrievals were re-run on the new version, with the query as sent.
+    assert hybrid.queries == ["What is Asthma?"]
+    assert service.caches["retrieval"].keys() == [("v2", "what is asthma?")]
+    assert len(service.caches["answer"]) == 0
+
+    result = asyncio.run(service.aask("What is asthma?"))
+    assert "cached" not in result
+    assert hybrid.calls == 1
+    assert "chronic airway disease" in service.chain.prompts[-1]
+
+    assert service.reload() is None
+
+
+def test_request_finishing_after_reload_does_not_cache_old_version(mocker):
+    service = make_reloadable_service(mocker, CountingHybrid("Asthma is a chronic airway disease."))
+    generate = service.chain.agenerate
+
+    async def reload_while_generating(*args, **kwargs):
+        service.reload()
+        return await generate(*args, **kwargs)
+
+    service.chain.agenerate = reload_while_generating
+    asyncio.run(service.aask("What is asthma?"))
+
+    assert service.index_version() == "v2"
+    assert len(service.caches["answer"]) == 0
+    assert all(key[0] == "v2" for key in service.caches["retrieval"].keys())
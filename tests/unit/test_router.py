@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+
+from src.cleaning.topics import build_topic_index
+from src.embeddings.compress import CompressedVectors, shortlist_and_rescore
+from src.retrieval.bm25 import BM25Index
+from src.retrieval.hybrid import HybridRetriever
+from src.retrieval.router import TopicRouter, TopicScope
+from src.retrieval.sparse import SparseRetriever
+
+METADATAS = (
+    [{"topic": "Anemia"}] * 2
+    + [{"topic": "Anemia, iron deficiency"}] * 2
+    + [{"topic": "Diabetes mellitus"}] * 3
+    + [{"topic": "Gout"}] * 2
+)
+TEXTS = [
+    "anemia low red cells",
+    "anemia fatigue",
+    "iron deficiency anemia fatigue",
+    "iron supplements",
+    "diabetes insulin fatigue",
+    "diabetes glucose",
+    "diabetes diet",
+    "gout uric acid",
+    "gout joint fatigue",
+]
+
+
+def make_router(**kwargs):
+    return TopicRouter(build_topic_index(METADATAS), **kwargs)
+
+
+def test_route_prefers_longest_alias():
+    scope = make_router().route("Is iron-deficiency anemia hereditary?")
+
+    assert scope.topics == ["Anemia, iron deficiency"]
+    assert scope.ranges == [[2, 4]]
+    assert scope.rows().tolist() == [2, 3]
+
+
+def test_route_falls_back_without_match_or_when_too_broad():
+    router = make_router(max_topics=1)
+
+    assert router.route("what causes fatigue") is None
+    assert router.route("anemia and gout") is None
+
+
+def test_fuzzy_match_catches_misspellings():
+    assert make_router().route("diabetis mellitus diet") is None
+    scope = make_router(fuzzy=True).route("diabetis melitus diet")
+
+    assert scope.topics == ["Diabetes mellitus"]
+
+
+def test_from_config_missing_index_disables_routing(tmp_path):
+    assert TopicRouter.from_config({"enabled": True, "index_path": "missing.json"}, tmp_path) is None
+
+    (tmp_path / "topics.json").write_text(json.dumps(build_topic_index(METADATAS)))
+    router = TopicRouter.from_config({"enabled": True, "index_path": "topics.json"}, tmp_path)
+    assert router.route("gout").topics == ["Gout"]
+
+
+def test_bm25_ranges_match_masked_full_scores():
+    bm25 = BM25Index([t.split() for t in TEXTS])
+    ranges = [[0, 2], [7, 9]]
+
+    top, scores = bm25.top_k(["fatigue"], 3, ranges)
+    full = bm25.get_scores(["fatigue"])
+
+    assert top.tolist() == [1, 8, 0]
+    assert np.allclose(scores[[0, 1, 7, 8]], full[[0, 1, 7, 8]])
+    assert scores[[2, 4]].tolist() == [0.0, 0.0]
+
+
+def test_sparse_retrieve_stays_in_scope():
+    sparse = SparseRetriever(texts=TEXTS)
+    scope = TopicScope(["Gout"], [[7, 9]])
+
+    docs = sparse.retrieve("fatigue", 5, scope=scope)
+
+    assert {d["id"] for d in docs} == {"id_7", "id_8"}
+
+
+def test_shortlist_restricted_to_rows():
+    rng = np.random.default_rng(0)
+    full = rng.normal(size=(50, 8)).astype(np.float32)
+    full /= np.linalg.norm(full, axis=1, keepdims=True)
+    compressed = CompressedVectors.compress(full, "int8")
+    rows = np.arange(10, 20)
+
+    idx, sims = shortlist_and_rescore(compressed, full, full[3], 3, rescore_factor=2, rows=rows)
+
+    assert set(idx.tolist()) <= set(rows.tolist())
+    assert np.allclose(sims, full[idx] @ full[3])
+
+
+class ScopedDense:
+    def __init__(self):
+        self.scopes = []
+
+    def retrieve(self, query_embedding, top_k, scope=None):
+        self.scopes.append(scope)
+        return []
+
+
+def test_hybrid_passes_scope_and_times_routing():
+    dense = ScopedDense()
+    hybrid = HybridRetriever(dense, SparseRetriever(texts=TEXTS), alpha=0.5, router=make_router())
+    timings = {}
+
+    docs = hybrid.retrieve("gout fatigue", [0.1], 5, 5, timings)
+    hybrid.retrieve("fatigue", [0.1], 5, 5)
+
+    assert [d["id"] for d in docs] == ["id_8", "id_7"]
+    assert dense.scopes[0].topics == ["Gout"]
+    assert dense.scopes[1] is None
+    assert "route" in timings
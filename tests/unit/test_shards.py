@@ -0,0 +1,158 @@
+import json
+import threading
+
+from src.retrieval.adaptive import AdaptiveRetriever
+from src.retrieval.neighbors import NeighborExpander, NeighborIndex
+from src.retrieval.shards import Shard, ShardedExpander, ShardedRetriever
+from src.retrieval.sparse import SparseRetriever
+
+
+class DummyDense:
+    def __init__(self, docs, delay=0.0, release=None):
+        self.docs = docs
+        self.delay = delay
+        self.release = release
+        self.calls = 0
+
+    def retrieve(self, query_embedding, top_k):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(self.delay)
+        return [{"id": f"id_{i}", "text": t, "score": s} for i, (t, s) in enumerate(self.docs)][:top_k]
+
+
+class EmptySparse:
+    def retrieve(self, query, top_k):
+        return []
+
+    def max_score(self, query):
+        return 10.0
+
+
+class DummySparse:
+    def __init__(self, docs, bound=10.0):
+        self.docs = docs
+        self.bound = bound
+
+    def retrieve(self, query, top_k):
+        return [{"id": f"id_{i}", "text": t, "score": s} for i, (t, s) in enumerate(self.docs)][:top_k]
+
+    def max_score(self, query):
+        return self.bound
+
+
+def make_shard(name, docs, route=None, **kwargs):
+    return Shard(name, dense=DummyDense(docs, **kwargs), sparse=EmptySparse(), route=route)
+
+
+def test_route_by_keyword_and_fallback_to_all():
+    general = make_shard("general", [])
+    cardio = make_shard("cardio", [], route=["heart", "cardiac"])
+    derm = make_shard("derm", [], route=["skin"])
+    retriever = ShardedRetriever([cardio, derm], alpha=1.0)
+
+    assert [s.name for s in retriever.route("cardiac arrest")] == ["cardio"]
+    assert [s.name for s in retriever.route("fever")] == ["cardio", "derm"]
+
+    retriever = ShardedRetriever([general, cardio, derm], alpha=1.0)
+    assert [s.name for s in retriever.route("skin rash")] == ["general", "derm"]
+
+
+def test_merge_orders_by_fused_score_across_shards():
+    a = make_shard("a", [("a0", 0.1), ("a1", 0.6)])
+    b = make_shard("b", [("b0", 0.3), ("b1", 0.9)])
+    retriever = ShardedRetriever([a, b], alpha=1.0)
+    timings = {}
+
+    docs = retriever.retrieve("query", [0.1], 2, 1, timings)
+
+    assert [d["text"] for d in docs] == ["a0", "b0", "a1"]
+    assert [d["shard"] for d in docs] == ["a", "b", "a"]
+    assert {"dense", "sparse", "fuse", "merge"} <= set(timings)
+
+
+def test_merge_scales_bm25_by_each_shards_bound():
+    # Shard a's corpus statistics give it much larger BM25 scores.
+    a = Shard("a", dense=DummyDense([]), sparse=DummySparse([("a0", 20.0), ("a1", 10.0)], bound=40.0))
+    b = Shard("b", dense=DummyDense([]), sparse=DummySparse([("b0", 3.0), ("b1", 1.0)], bound=4.0))
+    retriever = ShardedRetriever([a, b], alpha=0.0)
+
+    docs = retriever.retrieve("query", [0.1], 2, 2)
+
+    assert [d["text"] for d in docs] == ["b0", "a0", "a1", "b1"]
+    assert [d["score"] for d in docs] == [0.75, 0.5, 0.25, 0.25]
+
+
+def test_irrelevant_shard_does_not_tie_the_relevant_one():
+    main = Shard(
+        "main",
+        dense=DummyDense([("asthma airways", 0.2), ("asthma triggers", 0.3)]),
+        sparse=DummySparse([("asthma airways", 8.0), ("asthma triggers", 6.0)]),
+    )
+    # Searched on every query, but only matches a stop word.
+    other = Shard(
+        "other",
+        dense=DummyDense([("tax forms", 0.9), ("tax dates", 0.95)]),
+        sparse=DummySparse([("tax forms", 0.5)]),
+    )
+    retriever = ShardedRetriever([main, other], alpha=0.6)
+
+    docs = retriever.retrieve("what is asthma", [0.1], 2, 2)
+
+    assert [d["shard"] for d in docs] == ["main", "main", "other", "other"]
+    assert docs[2]["score"] < 0.1
+    # The head is no longer a 1.0 tie, so a clear leader keeps the shallow pass.
+    assert AdaptiveRetriever(retriever, min_gap=0.1).assess(docs)[0] == "score_gap"
+
+
+def test_slow_shard_is_dropped_after_timeout():
+    release = threading.Event()
+    fast = make_shard("fast", [("fast doc", 0.2)])
+    slow = make_shard("slow", [("slow doc", 0.0)], delay=5.0, release=release)
+    slow.timeout = 0.05
+    retriever = ShardedRetriever([fast, slow], alpha=1.0, timeout=1.0)
+
+    try:
+        docs = retriever.retrieve("query", [0.1], 5, 5)
+        # The timed-out search still holds a worker, so it is not resubmitted.
+        again = retriever.retrieve("query", [0.1], 5, 5)
+        assert slow.dense.calls == 1
+    finally:
+        release.set()
+
+    assert [d["text"] for d in docs] == [d["text"] for d in again] == ["fast doc"]
+
+
+def test_sharded_expander_uses_each_shards_index():
+    metadatas = [{"pdf": "x", "topic": "t", "section": "s"}] * 3
+    texts_a = ["a0", "a1", "a2"]
+    texts_b = ["b0", "b1", "b2"]
+    a = Shard("a", expander=NeighborExpander(NeighborIndex.build(metadatas), texts_a, max_section_chunks=1))
+    b = Shard("b", expander=NeighborExpander(NeighborIndex.build(metadatas), texts_b, max_section_chunks=1))
+    c = Shard("c")
+
+    docs = [
+        {"id": "id_2", "text": "b2", "shard": "b"},
+        {"id": "id_0", "text": "c0", "shard": "c"},
+        {"id": "id_0", "text": "a0", "shard": "a"},
+    ]
+    expanded = ShardedExpander([a, b, c]).expand(docs)
+
+    assert [d["text"] for d in expanded] == ["b1 b2", "c0", "a0 a1"]
+
+
+def test_shard_from_config_resolves_paths_under_root(tmp_path):
+    chunks = tmp_path / "data" / "chunks.jsonl"
+    chunks.parent.mkdir()
+    chunks.write_text(json.dumps({"text": "shard text"}) + "\n")
+    cfg = {
+        "dense": {"collection_name": "document_embeddings"},
+        "sparse": {"chunks_path": "data/chunks.jsonl"},
+    }
+
+    shard = Shard.from_config({"name": "extra", "root": tmp_path, "collection_name": "extra"}, cfg)
+
+    assert isinstance(shard.sparse, SparseRetriever)
+    assert shard.sparse.texts == ["shard text"]
+    assert shard.collection_name == "extra"
+    assert shard.load_expander({"enabled": False}) is None
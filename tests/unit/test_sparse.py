@@ -32,4 +32,57 @@ def test_sparse_returns_docs():
 
     assert isinstance(docs, list)
     assert len(docs) > 0
-    assert "text" in docs[0]
\ No newline at end of file
+    assert "text" in docs[0]
+
+
+EXPANDED_TEXTS = [
+    "Myocardial infarction damages the cardiac muscle.",
+    "A heart murmur is an extra sound.",
+    "Asthma attack symptoms include wheezing.",
+]
+
+
+def write_corpus(root, expansions=None):
+    chunks = root / "chunks.jsonl"
+    chunks.write_text("".join(json.dumps({"text": t}) + "\n" for t in EXPANDED_TEXTS), encoding="utf-8")
+    if expansions is not None:
+        (root / "expansion.jsonl").write_text(
+            "".join(json.dumps({"id": f"id_{i}", "terms": terms}) + "\n" for i, terms in expansions.items()),
+            encoding="utf-8",
+        )
+    return {"chunks_path": "chunks.jsonl", "backend": "expanded", "expansion": {"path": "expansion.jsonl"}}
+
+
+def test_expanded_backend_matches_lexical_variants(tmp_path):
+    cfg = write_corpus(tmp_path, {0: {"heart": 2, "attack": 2}})
+
+    plain = SparseRetriever.from_config({**cfg, "backend": "bm25"}, tmp_path)
+    expanded = SparseRetriever.from_config(cfg, tmp_path)
+
+    assert plain.retrieve("heart attack", top_k=1)[0]["id"] != "id_0"
+    top = expanded.retrieve("heart attack", top_k=1)[0]
+    assert top["id"] == "id_0"
+    # Expansion terms are only indexed; the chunk text is unchanged.
+    assert top["text"] == EXPANDED_TEXTS[0]
+
+
+def test_expanded_backend_normalises_case_and_punctuation(tmp_path):
+    cfg = write_corpus(tmp_path, {0: {"heart": 2, "attack": 2}})
+    expanded = SparseRetriever.from_config(cfg, tmp_path)
+    both = expanded.bm25.get_scores(["heart", "attack"])[0]
+
+    assert both > expanded.bm25.get_scores(["heart"])[0]
+    for query in ("What is a Heart Attack?", "Heart attack symptoms"):
+        # Both expansion terms match the chunk despite case and punctuation.
+        assert expanded.bm25.get_scores(expanded.tokenize(query))[0] == pytest.approx(both)
+    assert expanded.retrieve("Myocardial infarction?", top_k=1)[0]["id"] == "id_0"
+
+
+def test_expanded_backend_falls_back_without_expansion(tmp_path):
+    cfg = write_corpus(tmp_path)
+
+    retriever = SparseRetriever.from_config(cfg, tmp_path)
+
+    assert retriever.bm25.vocab.keys() == SparseRetriever(texts=EXPANDED_TEXTS).bm25.vocab.keys()
+    with pytest.raises(ValueError):
+        SparseRetriever.from_config({**cfg, "backend": "splade"}, tmp_path)
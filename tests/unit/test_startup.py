@@ -0,0 +1,38 @@
+from src.benchmarks.startup import _eager_heavy_imports
+from src.utils.logging import setup_logging
+from src.utils.tracing import trace, traceable
+
+
+def test_serving_path_defers_heavy_imports():
+    assert _eager_heavy_imports("src.services.rag_Service") == []
+    assert _eager_heavy_imports("src.api.app") == []
+
+
+def test_setup_logging_does_not_duplicate_handlers(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.utils.logging.LOG_DIR", tmp_path / "logs")
+
+    first = setup_logging("test-startup-logger")
+    second = setup_logging("test-startup-logger")
+
+    assert first is second
+    assert len(second.handlers) == 2
+    assert not (tmp_path / "logs").exists()
+
+    second.info("hello")
+    assert (tmp_path / "logs" / "app.log").exists()
+
+    for handler in list(second.handlers):
+        handler.close()
+        second.removeHandler(handler)
+
+
+def test_tracing_is_noop_when_disabled(monkeypatch):
+    monkeypatch.delenv("LANGSMITH_TRACING", raising=False)
+    monkeypatch.delenv("LANGCHAIN_TRACING_V2", raising=False)
+
+    @traceable(name="test")
+    def add(a, b):
+        with trace("inner"):
+            return a + b
+
+    assert add(1, 2) == 3
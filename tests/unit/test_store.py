@@ -1,39 +1,71 @@
+import json
+
+import numpy as np
 import pytest
 from unittest.mock import MagicMock, patch
 from src.embeddings.store import store_embeddings
 
-# We patch Path.exists globally within the store module
-@patch("src.embeddings.store.Path.exists") 
+
+def write_inputs(tmp_path, num_records, dim=8):
+    emb_path = tmp_path / "embeddings.npy"
+    np.save(emb_path, np.random.rand(num_records, dim).astype(np.float32))
+
+    chunks_file = tmp_path / "chunks.jsonl"
+    with open(chunks_file, "w", encoding="utf-8") as f:
+        for i in range(num_records):
+            f.write(json.dumps({"text": f"chunk {i}", "metadata": {"page": i}}) + "\n")
+    return emb_path, chunks_file
+
+
+def mock_client(max_batch_size):
+    client = MagicMock()
+    client.get_max_batch_size.return_value = max_batch_size
+    collection = MagicMock()
+    client.get_or_create_collection.return_value = collection
+    return client, collection
+
+
 @patch("src.embeddings.store.get_vector_store")
-@patch("src.embeddings.store.np.load")
-@patch("builtins.open")
-@patch("json.load")
-def test_store_embeddings_batching(mock_json_load, mock_open, mock_np_load, mock_get_client, mock_exists):
-    """Verifies that large datasets are split into chunks of 5000."""
-    # Force the file check to pass
-    mock_exists.return_value = True
-
-    # Setup mock data (6000 items to trigger 2 batches)
+def test_store_embeddings_batching(mock_get_client, tmp_path):
+    """Batches follow the client's max batch size and carry arrays, not lists."""
     num_records = 6000
-    mock_np_load.return_value = MagicMock(tolist=lambda: [[0.1]*384] * num_records)
-    mock_json_load.return_value = [{"meta": "data"}] * num_records
-    
-    # Mock reading the chunks file
-    mock_file = mock_open.return_value.__enter__.return_value
-    mock_file.__iter__.return_value = ['{"text": "test content"}'] * num_records
-    
-    # Setup mock Chroma client
-    mock_client = MagicMock()
-    mock_collection = MagicMock()
-    mock_get_client.return_value = mock_client
-    mock_client.get_or_create_collection.return_value = mock_collection
-
-    # Run the function
-    store_embeddings()
-
-    # Assertions
-    assert mock_collection.upsert.call_count == 2
-    
-    # Verify the first batch size is exactly 5000
-    args, kwargs = mock_collection.upsert.call_args_list[0]
-    assert len(kwargs['ids']) == 5000
\ No newline at end of file
+    emb_path, chunks_file = write_inputs(tmp_path, num_records)
+    client, collection = mock_client(5000)
+    mock_get_client.return_value = client
+
+    store_embeddings(emb_path, chunks_file, cfg={"max_workers": 2})
+
+    assert collection.upsert.call_count == 2
+
+    calls = sorted(collection.upsert.call_args_list, key=lambda c: c.kwargs["ids"][0] != "id_0")
+    first = calls[0].kwargs
+    assert len(first["ids"]) == 5000
+    assert isinstance(first["embeddings"], np.ndarray)
+    assert first["embeddings"].dtype == np.float32
+    assert calls[1].kwargs["ids"][0] == "id_5000"
+    assert calls[1].kwargs["documents"][-1] == "chunk 5999"
+    assert calls[1].kwargs["metadatas"][0] == {"page": 5000}
+    np.testing.assert_array_equal(calls[1].kwargs["embeddings"], np.load(emb_path)[5000:])
+
+
+@patch("src.embeddings.store.get_vector_store")
+def test_configured_batch_size_is_capped(mock_get_client, tmp_path):
+    emb_path, chunks_file = write_inputs(tmp_path, 25)
+    client, collection = mock_client(10)
+    mock_get_client.return_value = client
+
+    store_embeddings(emb_path, chunks_file, cfg={"batch_size": 50, "max_workers": 1})
+
+    assert [len(c.kwargs["ids"]) for c in collection.upsert.call_args_list] == [10, 10, 5]
+
+
+@patch("src.embeddings.store.get_vector_store")
+def test_row_count_mismatch_raises(mock_get_client, tmp_path):
+    emb_path, chunks_file = write_inputs(tmp_path, 5)
+    with open(chunks_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"text": "extra", "metadata": {}}) + "\n")
+    client, _ = mock_client(100)
+    mock_get_client.return_value = client
+
+    with pytest.raises(ValueError):
+        store_embeddings(emb_path, chunks_file, cfg={})
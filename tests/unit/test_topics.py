@@ -0,0 +1,45 @@
+import json
+
+from src.cleaning.topics import build_topic_index, normalize_topic, run_topic_index, topic_aliases, topic_ranges
+
+
+def test_normalize_topic():
+    assert normalize_topic("Alzheimer's Disease") == "alzheimers disease"
+    assert normalize_topic("  Anemia, iron-deficiency ") == "anemia iron deficiency"
+
+
+def test_aliases_cover_parentheticals_inversions_and_possessives():
+    assert topic_aliases("Acquired immune deficiency syndrome (AIDS)") == {
+        "acquired immune deficiency syndrome aids",
+        "acquired immune deficiency syndrome",
+        "aids",
+    }
+    assert "iron deficiency anemia" in topic_aliases("Anemia, iron deficiency")
+    assert {"alzheimers disease", "alzheimer disease"} <= topic_aliases("Alzheimer's disease")
+    assert topic_aliases("Flu (TB)") == {"flu tb"}
+
+
+def test_topic_ranges_are_contiguous_runs():
+    metadatas = [
+        {"topic": None},
+        {"topic": "Asthma"},
+        {"topic": "Asthma"},
+        {"topic": "Gout"},
+        {"topic": "Asthma"},
+    ]
+
+    assert topic_ranges(metadatas) == {"Asthma": [[1, 3], [4, 5]], "Gout": [[3, 4]]}
+
+
+def test_run_topic_index_round_trip(tmp_path):
+    chunks = tmp_path / "chunks.jsonl"
+    with open(chunks, "w", encoding="utf-8") as f:
+        for topic in ["Asthma", "Asthma", "Heart attack"]:
+            f.write(json.dumps({"text": "x", "metadata": {"topic": topic}}) + "\n")
+    out = tmp_path / "topics.json"
+
+    index = run_topic_index(chunks, out)
+
+    assert json.loads(out.read_text()) == index
+    assert index == build_topic_index([{"topic": "Asthma"}] * 2 + [{"topic": "Heart attack"}])
+    assert index["aliases"]["heart attack"] == ["Heart attack"]
@@ -0,0 +1,98 @@
+import asyncio
+
+import numpy as np
+
+from src.services.warmup import replay, top_queries, touch_pages, warm_up_from_log
+from src.utils.cache import LRUCache
+
+
+class StubService:
+    def __init__(self, arrays=(), fail_on=None):
+        self.arrays = arrays
+        self.fail_on = fail_on
+        self.caches = {"answer": LRUCache(8)}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.asked = []
+        self.retrieved = []
+
+    async def aask(self, query, session_id=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if query == self.fail_on:
+            raise RuntimeError("boom")
+        self.asked.append(query)
+        self.caches["answer"].put(query, "answer")
+
+    async def aretrieve(self, query, timings=None):
+        self.retrieved.append(query)
+
+    def mapped_arrays(self):
+        return iter(self.arrays)
+
+    def cache_stats(self):
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+
+def test_top_queries_counts_normalised_queries():
+    log = ["What is gout?", "what is  gout?", "asthma", "Asthma", "asthma", "anemia"]
+
+    assert top_queries(log, 2) == ["asthma", "What is gout?"]
+
+
+def test_touch_pages_reads_memmaps_only(tmp_path):
+    path = tmp_path / "codes.npy"
+    np.save(path, np.ones((100, 64), dtype=np.int8))
+
+    assert touch_pages(np.load(path, mmap_mode="r")) == 6400
+    assert touch_pages(np.ones(10)) == 0
+
+
+def test_replay_bounds_concurrency_and_counts_failures():
+    service = StubService(fail_on="q3")
+    queries = [f"q{i}" for i in range(10)]
+
+    report = asyncio.run(replay(service, queries, concurrency=3))
+
+    assert service.max_in_flight <= 3
+    assert report == {"completed": 9, "failed": 1, "timed_out": False}
+
+
+def test_replay_without_answers_stops_at_retrieval():
+    service = StubService()
+
+    asyncio.run(replay(service, ["q1", "q2"], answers=False))
+
+    assert service.retrieved == ["q1", "q2"]
+    assert service.asked == []
+
+
+def test_warm_up_from_log_reports_time_and_cache_fill(tmp_path):
+    log = tmp_path / "query_log.jsonl"
+    log.write_text('{"query": "asthma"}\n{"query": "asthma"}\ngout\n\nanemia\n', encoding="utf-8")
+    np.save(tmp_path / "codes.npy", np.zeros(5000, dtype=np.float32))
+    service = StubService(arrays=[np.load(tmp_path / "codes.npy", mmap_mode="r")])
+
+    report = asyncio.run(
+        warm_up_from_log(service, {"query_log": str(log), "top_n": 2, "concurrency": 2})
+    )
+
+    assert service.asked[0] == "asthma"
+    assert report["queries"] == 2
+    assert report["completed"] == 2
+    assert report["mapped_bytes"] == 20000
+    assert report["caches"]["answer"]["size"] == 2
+    assert report["seconds"] >= 0
+
+
+def test_warm_up_without_log_still_reports(tmp_path):
+    service = StubService()
+
+    report = asyncio.run(
+        warm_up_from_log(service, {"query_log": str(tmp_path / "missing.jsonl"), "top_n": 5, "concurrency": 2})
+    )
+
+    assert report["queries"] == 0
+    assert report["caches"]["answer"]["size"] == 0